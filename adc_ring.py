@@ -0,0 +1,106 @@
+# Author: Oleksandr Teteria
+# v1.0.0
+# 17.10.2026
+# Implemented and tested on Pi Pico with RP2040
+# Released under the MIT license
+
+'''
+Безперервний захват ADC у кільцевий буфер по DMA (без пауз між кадрами).
+
+ADC RP2040 у режимі START_MANY тактується дільником DIV (Fs = 48 МГц / (1 + DIV)), кожен семпл
+з FIFO (DREQ_ADC) канал DMA пише в кільце buf. Апаратний ring_size каналу загортає адресу запису,
+тож захват не зупиняється між кадрами і процесор у ньому не бере участі. Кільце - size семплів
+u16 (12 біт, size - степінь двійки), адреса вирівняна на розмір кільця в байтах.
+
+  start(fs)  - запуск з позиції 0 кільця (total() - з нуля)
+  total()    - скільки семплів записано від start(): семпл t лежить у buf[t & (size - 1)]
+  stop()     - зупинка ADC і DMA (кільце лишається читабельним)
+  close()    - звільнення каналу DMA
+
+Читач має встигати: семпли, старші за size від total(), уже перезаписані. Лічильник передач DMA -
+COUNT семплів (≈ 7.4 год при 40 кГц), після чого захват зупиняється і потрібен новий start().
+'''
+
+import array
+import machine
+
+ADC_BASE = 0x4004C000
+ADC_CS = ADC_BASE + 0x00
+ADC_FCS = ADC_BASE + 0x08
+ADC_FIFO = ADC_BASE + 0x0C
+ADC_DIV = ADC_BASE + 0x10
+CS_EN = 0x01
+CS_START_MANY = 0x08
+CS_READY = 0x100
+FCS_EN = 0x01
+FCS_DREQ_EN = 0x08
+FCS_ERR_CLR = 0x0C00      # OVER | UNDER (запис 1 скидає)
+FCS_LEVEL = 0x000F0000
+FCS_THRESH_1 = 1 << 24    # DREQ на кожен семпл
+DREQ_ADC = 36
+ADC_CLK = 48_000_000
+COUNT = 0x3FFFFFFF        # найбільший small int MicroPython
+
+
+class AdcRing:
+    '''
+    Кільце size семплів каналу ch (0..3 -> GPIO26..29), заповнюване DMA безперервно.
+    buf - memoryview 'H' на кільце (вирівняне вікно в удвічі більшому масиві).
+    '''
+    def __init__(self, ch=0, size=2048):
+        # rp2 / uctypes - лише тут: модуль імпортується і без заліза (як PioDmaOutput у neo_matrix)
+        import rp2
+        import uctypes
+
+        if size & (size - 1) or not 2 <= size <= 16384:
+            raise ValueError("size must be a power of 2, 2..16384")
+        self.ch = ch
+        self.size = size
+        self.mask = size - 1
+        machine.ADC(26 + ch)  # пін - аналоговий вхід, ADC увімкнено
+        # DMA загортає адресу за молодшими log2(2 * size) бітами: вікно, вирівняне на 2 * size байтів
+        self._arr = array.array('H', [0] * (2 * size))
+        nbytes = 2 * size
+        addr = uctypes.addressof(self._arr)
+        off = (-addr) & (nbytes - 1)
+        self.addr = addr + off
+        self.buf = memoryview(self._arr)[off >> 1:(off >> 1) + size]
+        ring = 0
+        while (1 << ring) < nbytes:
+            ring += 1
+        self.dma = rp2.DMA()
+        self._ctrl = self.dma.pack_ctrl(size=1, inc_read=False, inc_write=True,
+                                        ring_size=ring, ring_sel=True, treq_sel=DREQ_ADC)
+        self.running = False
+
+    def start(self, fs):
+        m = machine.mem32
+        self.stop()
+        m[ADC_CS] = CS_EN | (self.ch << 12)
+        m[ADC_DIV] = ADC_CLK * 256 // fs - 256   # INT.FRAC (8 біт дробової частини)
+        m[ADC_FCS] = FCS_EN | FCS_DREQ_EN | FCS_THRESH_1 | FCS_ERR_CLR
+        while m[ADC_FCS] & FCS_LEVEL:
+            m[ADC_FIFO]
+        self.dma.config(read=ADC_FIFO, write=self.addr, count=COUNT, ctrl=self._ctrl, trigger=True)
+        m[ADC_CS] = CS_EN | CS_START_MANY | (self.ch << 12)
+        self.running = True
+
+    def total(self):
+        return COUNT - self.dma.count
+
+    def stop(self):
+        if not self.running:
+            return
+        m = machine.mem32
+        m[ADC_CS] = CS_EN | (self.ch << 12)
+        while not m[ADC_CS] & CS_READY:
+            pass
+        self.dma.active(0)
+        m[ADC_FCS] = FCS_ERR_CLR
+        while m[ADC_FCS] & FCS_LEVEL:
+            m[ADC_FIFO]
+        self.running = False
+
+    def close(self):
+        self.stop()
+        self.dma.close()
@@ -0,0 +1,155 @@
+# Author: Oleksandr Teteria
+# v1.0.0
+# 17.10.2026
+# Implemented and tested on Pi Pico with RP2040
+# Released under the MIT license
+
+'''
+Плани смуг (розбиття FFT-бінів на смуги) для довільних Fs / N / кількості смуг.
+
+Шкали:
+  'octave' - рівний крок в октавах між fmin і fmax (як utils/make_bands_octaves.py)
+  'third'  - крок 1/3 октави від fmin (fmax = fmin * 2**(bands/3), не вище Nyquist)
+  'mel'    - рівний крок у мелах
+  'bark'   - рівний крок у барках (Traunmüller)
+
+План - це межі смуг у бінах: array('H') довжини bands+1, строго зростаючі;
+смуга b займає біни [edges[b], edges[b+1]).
+load_plan() кешує межі у бінарному файлі, щоб не рахувати їх при кожному старті
+(save=False - лише читання кешу; записати пізніше - save_plan()).
+'''
+
+import math
+import array
+import struct
+
+SCALES = ('octave', 'third', 'mel', 'bark')
+
+PLAN_FILE = 'band_plan.bin'
+_MAGIC = b'BPL1'
+# magic, Fs, N, bands, scale, k_start, fmin, fmax
+_HDR = '<4sIHHBBHH'
+
+
+def _warp(f, scale):
+    # Гц -> шкала, у якій смуги мають рівну ширину
+    if scale == 'mel':
+        return 2595.0 * math.log10(1.0 + f / 700.0)
+    if scale == 'bark':
+        return 26.81 * f / (1960.0 + f) - 0.53
+    return math.log(f) / math.log(2)
+
+
+def _unwarp(v, scale):
+    if scale == 'mel':
+        return 700.0 * (10.0 ** (v / 2595.0) - 1.0)
+    if scale == 'bark':
+        return 1960.0 * (v + 0.53) / (26.28 - v)
+    return 2.0 ** v
+
+
+def make_plan(Fs, N, fmin=40, fmax=16000, bands=16, scale='octave', k_start=1):
+    '''
+    Межі смуг у бінах (array('H'), довжина bands+1).
+    k_start - мінімальний бін (типово 1, щоб ігнорувати DC)
+    '''
+    if scale not in SCALES:
+        raise ValueError("unknown scale")
+    df = Fs / N
+    nyq = Fs / 2
+    if scale == 'third':
+        fmax = fmin * 2.0 ** (bands / 3)
+    fmax = min(fmax, nyq)
+    if fmin <= 0 or fmax <= fmin:
+        raise ValueError("Invalid fmin/fmax")
+
+    # запитані межі: рівний крок у шкалі scale
+    w0 = _warp(fmin, scale)
+    w1 = _warp(fmax, scale)
+    step = (w1 - w0) / bands
+
+    # фактичні межі в бінах (після round + строго зростаючі)
+    edges = array.array('H', [0] * (bands + 1))
+    k = int(fmin / df + 0.5)
+    edges[0] = k if k > k_start else k_start
+    for b in range(1, bands + 1):
+        f = fmax if b == bands else _unwarp(w0 + step * b, scale)
+        k = int(f / df + 0.5)
+        if k <= edges[b - 1]:
+            k = edges[b - 1] + 1
+        if k > N // 2:
+            raise ValueError("Too many bands for given N/Fs/f-range (ran out of FFT bins)")
+        edges[b] = k
+    return edges
+
+
+def widths(edges):
+    # межі -> ширини смуг у бінах (формат IND_BANDS)
+    return tuple(edges[b + 1] - edges[b] for b in range(len(edges) - 1))
+
+
+def resample(table, bands):
+    # перенесення по-смугових налаштувань (NOISE_THRESHOLD, BAND_GAIN_DB) на іншу кількість смуг
+    n = len(table)
+    if n == bands:
+        return tuple(table)
+    return tuple(table[b * n // bands] for b in range(bands))
+
+
+def _plan_key(Fs, N, fmin, fmax, bands, scale, k_start):
+    return struct.pack(_HDR, _MAGIC, Fs, N, bands, SCALES.index(scale), k_start,
+                       int(fmin), int(fmax))
+
+
+def _read_plan(path, key, bands):
+    # межі з кешу path або None (немає файла / інші параметри)
+    edges = array.array('H', [0] * (bands + 1))
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(key)) == key and f.readinto(edges) == 2 * (bands + 1):
+                return edges
+    except OSError:
+        pass
+    return None
+
+
+def load_plan(Fs, N, fmin=40, fmax=16000, bands=16, scale='octave', k_start=1,
+              path=PLAN_FILE, save=True):
+    '''
+    Межі смуг з кешу path, якщо він зібраний з тими самими параметрами;
+    інакше - make_plan() і (save=True) запис у кеш.
+    '''
+    edges = _read_plan(path, _plan_key(Fs, N, fmin, fmax, bands, scale, k_start), bands)
+    if edges is None:
+        edges = make_plan(Fs, N, fmin, fmax, bands, scale, k_start)
+        if save:
+            save_plan(edges, Fs, N, fmin, fmax, bands, scale, k_start, path)
+    return edges
+
+
+def save_plan(edges, Fs, N, fmin=40, fmax=16000, bands=16, scale='octave', k_start=1,
+              path=PLAN_FILE):
+    '''
+    Запис меж у кеш path (параметри - як у load_plan()); той самий кеш не перезаписується.
+    Вертає True, якщо файл записано.
+    '''
+    key = _plan_key(Fs, N, fmin, fmax, bands, scale, k_start)
+    if _read_plan(path, key, bands) == edges:
+        return False
+    try:
+        with open(path, 'wb') as f:
+            f.write(key)
+            f.write(edges)
+    except OSError:
+        return False
+    return True
+
+
+def print_plan(edges, Fs, N):
+    # діапазони смуг у Гц (як utils/band_ranges.py)
+    df = Fs / N
+    print("df =", df, "Hz/bin")
+    for b in range(len(edges) - 1):
+        lo = edges[b]
+        hi = edges[b + 1]
+        print("%2d: %8.2f .. %8.2f Hz   (bins [%d..%d) )" % (b + 1, lo * df, hi * df, lo, hi))
@@ -0,0 +1,659 @@
+# Author: Oleksandr Teteria
+# v1.0.0
+# 17.10.2026
+# Implemented and tested on Pi Pico with RP2040
+# Released under the MIT license
+
+'''
+Бенчмарк усього конвеєра ADC -> FFT -> смуги -> рендер на записаному
+або синтетичному аудіо (без ADC і без другого ядра).
+
+Використовує модулі проєкту без змін (neo_spectr, neo_matrix, fastfft),
+тому запускається на Pico або на порті MicroPython, де є ці модулі.
+Сигнал замість adc_dma.buffer_i16() береться з генератора:
+  'sine'  - синус (частота f)
+  'sweep' - синус із частотою, що росте від кадра до кадра
+  'pink'  - рожевий шум (Voss-McCartney)
+  'music' - синтетичний фрагмент: бас, акорди і ударні (MusicTrack)
+  'wav'   - файл WAV (mono, 16 біт PCM), кадри по FFT_SIZE семплів
+
+Звіт: p50/p95/max по етапах (мкс), алокації на кадр (байт),
+оцінка FPS для 2-ядерної схеми: max(T_cap + T_fft + T_copy + T_bass, T_core1)
+(T_bass - CIC3-проріджування і rfft() низів, лише з neo_spectr.BASS_DECIM).
+report_engines(): час рендеру кожного рушія NeoMatrixFast відносно _apply_spec_viper2().
+bench_delta(): повний і delta-рендер стовпців на записаних рівнях смуг музики / рожевого шуму.
+report_profiles(): T_cap / T_fft / T_core1 / FPS для кожного профілю захвату neo_spectr.PROFILES.
+report_band_spectr(): агрегація смуг і T_core1 до / після таблиці BAND_EDGES для кожного профілю.
+compare_analysis(): час і похибка рівнів смуг банку DFT (neo_spectr.ANALYSIS) або цілочисельного
+конвеєра (neo_spectr.INT_PIPELINE) відносно rfft().
+bench_front_end(): час вхідного каскаду neo_spectr.FRONT_END на блок FFT_SIZE сирих семплів.
+bench_onset(): точність темпу і час OnsetDetector.update() на синтетичних клік-треках.
+'''
+
+import time
+import array
+import math
+import gc
+import random
+import fastfft
+import neo_spectr as ns
+from neo_matrix import NeoMatrixFast
+from envelope import Envelope
+from onset import OnsetDetector
+
+# етапи, що вимірюються (індекси у таблиці часів)
+STAGES = ('fft', 'copy', 'bass', 'bands', 'peaks', 'fill', 'write')
+ST_FFT, ST_COPY, ST_BASS, ST_BANDS, ST_PEAKS, ST_FILL, ST_WRITE = range(len(STAGES))
+
+AMP = 10_000  # амплітуда синтетичного сигналу (як target peak у buffer_i16('auto', 10_000))
+
+
+# ---------------- джерела сигналу ----------------
+def make_sine(buf, f, phase=0.0, amp=AMP):
+    # заповнює buf синусом частоти f, вертає фазу для наступного кадра
+    w = 2.0 * math.pi * f / ns.SAMPLE_FREQ
+    for k in range(len(buf)):
+        buf[k] = int(amp * math.sin(phase + w * k))
+    return (phase + w * len(buf)) % (2.0 * math.pi)
+
+
+class PinkNoise:
+    # рожевий шум Voss-McCartney: сума 8 генераторів, що оновлюються з частотою 1/2^k
+    def __init__(self, amp=AMP, seed=1):
+        random.seed(seed)
+        self.rows = [random.getrandbits(12) - 2048 for _ in range(8)]
+        self.total = sum(self.rows)
+        self.n = 0
+        self.scale = amp / (8 * 2048)
+
+    def fill(self, buf):
+        for k in range(len(buf)):
+            self.n += 1
+            # номер генератора = кількість молодших нульових бітів лічильника
+            i = 0
+            c = self.n
+            while not c & 1 and i < 7:
+                c >>= 1
+                i += 1
+            self.total -= self.rows[i]
+            self.rows[i] = random.getrandbits(12) - 2048
+            self.total += self.rows[i]
+            buf[k] = int(self.total * self.scale)
+
+
+class ClickTrack:
+    # клік-трек: сплеск шуму на кожну долю (спад tau_ms) поверх тихого шуму, час семплів - від t_us
+    def __init__(self, bpm, amp=AMP, tau_ms=20, noise=0.003, seed=1):
+        random.seed(seed)
+        self.period = 60_000_000 // bpm
+        self.amp = amp
+        self.tau = tau_ms * 1000
+        self.noise = noise
+
+    def fill(self, buf, t_us):
+        dt = 1_000_000 / ns.SAMPLE_FREQ
+        for k in range(len(buf)):
+            age = (t_us + k * dt) % self.period
+            g = math.exp(-age / self.tau) + self.noise
+            buf[k] = int(self.amp * g * (random.getrandbits(12) - 2048) / 2048)
+
+
+class MusicTrack:
+    # синтетичний музичний фрагмент: бас + тризвук (акорд змінюється кожні 2 долі, атака на кожній
+    # долі і спад) поверх клік-треку ударних; час семплів - від t_us
+    CHORDS = ((55.0, 220.0, 277.2, 329.6), (73.4, 293.7, 370.0, 440.0),
+              (61.7, 246.9, 311.1, 370.0), (49.0, 196.0, 246.9, 293.7))
+
+    def __init__(self, bpm=120, amp=AMP, seed=1):
+        self.period = 60_000_000 // bpm
+        self.amp = amp
+        self.drums = ClickTrack(bpm, amp // 2, seed=seed)
+
+    def fill(self, buf, t_us):
+        self.drums.fill(buf, t_us)
+        dt = 1_000_000 / ns.SAMPLE_FREQ
+        w = 2.0 * math.pi / 1_000_000
+        a = self.amp / 8
+        for k in range(len(buf)):
+            t = t_us + k * dt
+            beat = int(t // self.period)
+            chord = self.CHORDS[(beat >> 1) % len(self.CHORDS)]
+            g = a * math.exp(-2.0 * (t % self.period) / self.period)
+            s = 2.0 * math.sin(w * chord[0] * t)   # бас удвічі гучніший за голоси акорду
+            for f in chord[1:]:
+                s += math.sin(w * f * t)
+            buf[k] += int(g * s)
+
+
+class WavReader:
+    # mono 16 біт PCM, читання по кадрах; на кінці файла - з початку
+    def __init__(self, path):
+        self.f = open(path, 'rb')
+        hdr = self.f.read(12)
+        if hdr[0:4] != b'RIFF' or hdr[8:12] != b'WAVE':
+            raise ValueError("not a WAV file")
+        # пошук чанка 'data'
+        while True:
+            ch = self.f.read(8)
+            if len(ch) < 8:
+                raise ValueError("no data chunk")
+            size = ch[4] | (ch[5] << 8) | (ch[6] << 16) | (ch[7] << 24)
+            if ch[0:4] == b'data':
+                break
+            self.f.seek(size, 1)
+        self.data_pos = self.f.tell()
+
+    def fill(self, buf):
+        n = self.f.readinto(buf)
+        if n < len(buf) * 2:
+            self.f.seek(self.data_pos)
+            self.f.readinto(buf)
+
+    def close(self):
+        self.f.close()
+
+
+# ---------------- статистика ----------------
+def _percentile(sorted_vals, p):
+    return sorted_vals[(len(sorted_vals) - 1) * p // 100]
+
+
+def summarize(times, frames):
+    # times: array('i') frames*len(STAGES), рядок на кадр -> {етап: (p50, p95, max)}
+    res = {}
+    col = array.array('i', [0] * frames)
+    for s, name in enumerate(STAGES):
+        for k in range(frames):
+            col[k] = times[k * len(STAGES) + s]
+        v = sorted(col)
+        res[name] = (_percentile(v, 50), _percentile(v, 95), v[-1])
+    return res
+
+
+# ---------------- прогін конвеєра ----------------
+def _build_band_spectr_ref(spec, out_buf, dt_us):
+    # попередній build_band_spectr(): сума бінів кожної смуги окремим циклом у Python (як band_dbfs())
+    edges = ns.BAND_EDGES
+    for b in range(ns.NUM_BAND):
+        e = 0.0
+        for k in range(edges[2 * b], edges[2 * b + 1]):
+            e += spec[k]
+        ns.band_e[b] = e
+    ns.map_band_spectr(out_buf, dt_us)
+
+
+def run(signal='sine', frames=200, f=1000, path=None, fixed=None, nm=None, dft=None, fx_int=None,
+        ref_bands=False):
+    '''
+    Проганяє frames кадрів сигналу signal через конвеєр neo_spectr.
+    fixed - None: як у neo_spectr.DSP_FIXED, True/False: примусово fixed/float шлях
+    nm    - NeoMatrixFast для рендеру (None - створюється на neo_pin=20)
+    dft   - None: як вибрано для профілю (neo_spectr.USE_DFT), True/False: банк DFT / rfft()
+    fx_int - None: як у neo_spectr.INT_PIPELINE, True: цілочисельний FFT -> dB смуг (fixed, dft ігноруються)
+    ref_bands - True: смуги попереднім build_band_spectr() (цикл по бінах кожної смуги, float; fixed ігнорується)
+    Вертає (stats, alloc_per_frame, fps)
+    '''
+    if fixed is None:
+        fixed = ns.DSP_FIXED
+    if dft is None:
+        dft = ns.USE_DFT
+    if fx_int is None:
+        fx_int = ns.INT_PIPELINE
+    if fx_int:
+        db = array.array('i', [0] * ns.NUM_BAND)
+    if nm is None:
+        nm = NeoMatrixFast(row=16, col=ns.M, neo_pin=20)
+        nm.clear()
+
+    buf = array.array('h', [0] * ns.FFT_SIZE)
+    # слот як у neo_spectr: основний спектр + bass-спектр з біна SPEC_MAX (BASS_DECIM)
+    slot = array.array('f', [0.0] * (ns.SPEC_MAX + ns.BASS_LEN))
+    bass = memoryview(slot)[ns.SPEC_MAX:]
+    spec_work = bytearray(ns.M)
+    env = Envelope(ns.M, ns.BAR_ATTACK_MS, ns.BAR_RELEASE_MS,
+                   ns.PEAK_HOLD_MS, ns.PEAK_FALL_LPS)
+    dt = ns.DT_NOMINAL_US
+    times = array.array('i', [0] * (frames * len(STAGES)))
+
+    src = None
+    if signal == 'pink':
+        src = PinkNoise()
+    elif signal == 'wav':
+        src = WavReader(path)
+    phase = 0.0
+    f_sweep = 40.0
+
+    gc.collect()
+    gc.disable()
+    alloc = 0
+    try:
+        for k in range(frames):
+            # джерело сигналу не входить у виміри
+            if signal == 'sine':
+                phase = make_sine(buf, f, phase)
+            elif signal == 'sweep':
+                phase = make_sine(buf, f_sweep, phase)
+                f_sweep *= 1.02
+                if f_sweep > ns.SAMPLE_FREQ / 2:
+                    f_sweep = 40.0
+            else:
+                src.fill(buf)
+
+            a0 = gc.mem_alloc()
+            t0 = time.ticks_us()
+            if fx_int:
+                shift = ns.fx_analyze(buf)
+            elif dft:
+                ns.dft_analyze(buf)
+            else:
+                spectr = fastfft.rfft(buf, True)
+            t1 = time.ticks_us()
+            if fx_int:
+                ns._fx_bands(db, ns.fx_re, ns.fx_im, shift)
+            elif dft:
+                ns.dft_spectrum(slot)
+            else:
+                ns._copy32(slot, spectr, ns.SPEC_LEN)
+            t2 = time.ticks_us()
+            if ns.BASS_LEN:
+                ns.bass_capture(buf, 0)
+                ns.bass_spectrum(bass)
+            t2b = time.ticks_us()
+            if fx_int:
+                ns.take_band_db(db)
+                ns.map_band_db_fx(spec_work, dt)
+            elif ref_bands:
+                _build_band_spectr_ref(slot, spec_work, dt)
+            elif fixed:
+                ns.build_band_spectr_fx(slot, spec_work, dt)
+            else:
+                ns.build_band_spectr(slot, spec_work, dt)
+            t3 = time.ticks_us()
+            env.update(ns.band_lvl_q8, dt)
+            t4 = time.ticks_us()
+            changed = nm.fill_spectrum_buf(env.lvl, env.peak, True, env.lvl_q8)
+            t5 = time.ticks_us()
+            if changed:
+                nm.np.write()
+                nm.wait()
+            t6 = time.ticks_us()
+            alloc += gc.mem_alloc() - a0
+
+            row = k * len(STAGES)
+            times[row + ST_FFT] = time.ticks_diff(t1, t0)
+            times[row + ST_COPY] = time.ticks_diff(t2, t1)
+            times[row + ST_BASS] = time.ticks_diff(t2b, t2)
+            times[row + ST_BANDS] = time.ticks_diff(t3, t2b)
+            times[row + ST_PEAKS] = time.ticks_diff(t4, t3)
+            times[row + ST_FILL] = time.ticks_diff(t5, t4)
+            times[row + ST_WRITE] = time.ticks_diff(t6, t5)
+    finally:
+        gc.enable()
+        if signal == 'wav':
+            src.close()
+
+    stats = summarize(times, frames)
+    t_cap = ns.FFT_SIZE * 1_000_000 // ns.SAMPLE_FREQ
+    t_core0 = t_cap + stats['fft'][0] + stats['copy'][0] + stats['bass'][0]
+    t_core1 = (stats['bands'][0] + stats['peaks'][0]
+               + stats['fill'][0] + stats['write'][0])
+    fps = 1_000_000 / max(t_core0, t_core1)
+    return stats, alloc // frames, fps
+
+
+def report(signal='sine', frames=200, **kw):
+    stats, alloc, fps = run(signal, frames, **kw)
+    print('signal:', signal, '| frames:', frames)
+    print('stage      p50     p95     max  (us)')
+    for name in STAGES:
+        p50, p95, mx = stats[name]
+        print('%-6s %7d %7d %7d' % (name, p50, p95, mx))
+    print('alloc/frame: %d B | FPS (2 cores): %.1f' % (alloc, fps))
+    return stats, alloc, fps
+
+
+def bench_front_end(frames=100, f=1000, amp=1000):
+    '''
+    Час вхідного каскаду neo_spectr._front_end() (зміщення + пік/RMS + підсилення, один прохід)
+    на FFT_SIZE сирих 12-бітних семплах синуса навколо середини шкали ADC. Вертає (p50, p95, max), мкс
+    '''
+    raw = array.array('H', [2048 + int(amp * math.sin(2.0 * math.pi * f * k / ns.SAMPLE_FREQ))
+                            for k in range(ns.FFT_SIZE)])
+    out = array.array('h', [0] * ns.FFT_SIZE)
+    st = array.array('i', ns.front_st)
+    col = array.array('i', [0] * frames)
+    for k in range(frames):
+        t0 = time.ticks_us()
+        ns._front_end(out, raw, st, ns.FFT_SIZE)
+        col[k] = time.ticks_diff(time.ticks_us(), t0)
+    v = sorted(col)
+    res = (_percentile(v, 50), _percentile(v, 95), v[-1])
+    print('front end (%d samples): p50 %d  p95 %d  max %d us' % ((ns.FFT_SIZE,) + res))
+    return res
+
+
+def _spectrum(buf, slot, bass):
+    # rfft() кадра -> слот як у core0_main_loop(): біни основного спектра і (BASS_DECIM) bass-спектр
+    # з біна SPEC_MAX, на які вказують перенаправлені межі низьких смуг BAND_EDGES
+    # (кадри бенчмарка не суміжні: кільце низів склеює окремі блоки)
+    ns._copy32(slot, fastfft.rfft(buf, True), ns.SPEC_LEN)
+    if ns.BASS_LEN:
+        ns.bass_capture(buf, 0)
+        ns.bass_spectrum(bass)
+
+
+def bench_onset(bpms=(90, 120, 150), seconds=30, frame_us=None, jitter_us=5000):
+    '''
+    Клік-треки bpms через rfft() (+ bass-спектр) -> band_energies() -> _bands_db_q8() -> OnsetDetector.update().
+    Кадри беруться з періодом frame_us (None - DT_NOMINAL_US) з випадковим відхиленням
+    ±jitter_us (як нерівний період кадра Core1). Для кожного темпу: оцінка темпу та похибка, %,
+    кількість онсетів / кліків, час update() p50 / max (мкс) і алокації update() за весь прогін (байт).
+    '''
+    if frame_us is None:
+        frame_us = ns.DT_NOMINAL_US
+    buf = array.array('h', [0] * ns.FFT_SIZE)
+    slot = array.array('f', [0.0] * (ns.SPEC_MAX + ns.BASS_LEN))
+    bass = memoryview(slot)[ns.SPEC_MAX:]
+    e = array.array('f', [0.0] * ns.NUM_BAND)
+    db = array.array('i', [0] * ns.NUM_BAND)
+    frames = seconds * 1_000_000 // frame_us
+    col = array.array('i', [0] * frames)
+    res = {}
+    for bpm in bpms:
+        src = ClickTrack(bpm)
+        det = OnsetDetector(ns.NUM_BAND, noise_db=ns.NOISE_THRESHOLD)
+        t = 0
+        dt = frame_us
+        alloc = 0
+        for k in range(frames):
+            src.fill(buf, t)
+            _spectrum(buf, slot, bass)
+            ns.band_energies(slot, ns.BAND_EDGES, e, ns.NUM_BAND)
+            ns._bands_db_q8(e, db, ns.NUM_BAND)
+            gc.collect()
+            a0 = gc.mem_alloc()
+            t0 = time.ticks_us()
+            det.update(db, dt)
+            col[k] = time.ticks_diff(time.ticks_us(), t0)
+            alloc += gc.mem_alloc() - a0
+            dt = frame_us + random.randint(-jitter_us, jitter_us)
+            t += dt
+        v = sorted(col)
+        est = det.tempo() / 10
+        err = 100.0 * (est - bpm) / bpm
+        clicks = t // src.period + 1    # перший клік - на t = 0
+        res[bpm] = (est, err, det.beats(), clicks, _percentile(v, 50), v[-1], alloc)
+        print('%3d BPM: tempo %5.1f (%+5.1f%%)  onsets %d / clicks %d  update p50 %d max %d us  alloc %d B'
+              % ((bpm,) + res[bpm]))
+    return res
+
+
+def compare_analysis(signal='sine', frames=20, f=1000, mode='dft', range_db=60):
+    '''
+    Точність і час банку DFT (mode='dft') або цілочисельного конвеєра (mode='int': FFT int32 ->
+    dB смуг) відносно rfft() на однакових кадрах поточного профілю: max |різниця| рівня смуги в dB
+    (смуги вище -90 dBFS і не нижче range_db від найгучнішої смуги кадра) і p50 часу
+    аналізу + запису в слот / dB смуг, мкс. Смуги низів (BASS_DECIM) обидва слоти беруть з одного
+    bass-спектра, як у core0_main_loop(), і в похибку не входять
+    '''
+    if mode == 'int' and ns.BASS_LEN:
+        raise ValueError("mode 'int' needs BASS_DECIM = 0")
+    buf = array.array('h', [0] * ns.FFT_SIZE)
+    s_fft = array.array('f', [0.0] * (ns.SPEC_MAX + ns.BASS_LEN))
+    s_dft = array.array('f', [0.0] * (ns.SPEC_MAX + ns.BASS_LEN))
+    b_fft = memoryview(s_fft)[ns.SPEC_MAX:]
+    b_dft = memoryview(s_dft)[ns.SPEC_MAX:]
+    e_fft = array.array('f', [0.0] * ns.NUM_BAND)
+    db = array.array('i', [0] * ns.NUM_BAND)
+    src = PinkNoise() if signal == 'pink' else None
+    t_fft = array.array('i', [0] * frames)
+    t_dft = array.array('i', [0] * frames)
+    err = [0.0] * ns.NUM_BAND
+    phase = 0.0
+    fk = f
+    for k in range(frames):
+        if src:
+            src.fill(buf)
+        else:
+            phase = make_sine(buf, fk, phase)
+            if signal == 'sweep':
+                fk *= 1.2
+                if fk > ns.SAMPLE_FREQ / 2:
+                    fk = 40.0
+        t0 = time.ticks_us()
+        ns._copy32(s_fft, fastfft.rfft(buf, True), ns.SPEC_LEN)
+        t1 = time.ticks_us()
+        if mode == 'int':
+            ns._fx_bands(db, ns.fx_re, ns.fx_im, ns.fx_analyze(buf))
+        else:
+            ns.dft_analyze(buf)
+            ns.dft_spectrum(s_dft)
+        t2 = time.ticks_us()
+        t_fft[k] = time.ticks_diff(t1, t0)
+        t_dft[k] = time.ticks_diff(t2, t1)
+        if ns.BASS_LEN:
+            ns.bass_capture(buf, 0)
+            ns.bass_spectrum(b_fft)
+            ns._copy32(b_dft, b_fft, ns.BASS_LEN)
+        ns.band_energies(s_fft, ns.BAND_EDGES, e_fft, ns.NUM_BAND)
+        ns.band_energies(s_dft, ns.BAND_EDGES, ns.band_e, ns.NUM_BAND)
+        floor = max(-90, ns.energy_dbfs(max(e_fft)) - range_db)
+        for b in range(ns.NUM_BAND):
+            if ns.BAND_EDGES[2 * b] >= ns.SPEC_MAX:
+                continue  # bass-смуга: не з основного аналізу
+            a = ns.energy_dbfs(e_fft[b])
+            if a > floor:
+                if mode == 'int':
+                    v = db[b] / 256
+                else:
+                    v = ns.energy_dbfs(ns.band_e[b])
+                err[b] = max(err[b], abs(a - v))
+    p_fft = sorted(t_fft)[frames // 2]
+    p_dft = sorted(t_dft)[frames // 2]
+    if mode == 'int':
+        print('profile %s: rfft %d us, int FFT + bands %d us | max band error %.2f dB' % (
+            ns.PROFILE, p_fft, p_dft, max(err)))
+    else:
+        print('profile %s: %d DFT bins | rfft %d us, DFT %d us | max band error %.2f dB' % (
+            ns.PROFILE, len(ns.DFT_BINS), p_fft, p_dft, max(err)))
+    return p_fft, p_dft, err
+
+
+def report_profiles(frames=100, signal='sine', **kw):
+    '''
+    Конвеєр для кожного профілю neo_spectr.PROFILES: T_cap, T_fft, T_core1 (p50, мкс) і FPS.
+    Після прогону повертається профіль, що був активним.
+    '''
+    prev = ns.PROFILE
+    res = {}
+    print('profile         Fs     N   T_cap   T_fft  T_core1 (us)   FPS')
+    try:
+        for name in ns.PROFILES:
+            ns._use_profile(name)
+            stats, alloc, fps = run(signal, frames, **kw)
+            t_cap = ns.FFT_SIZE * 1_000_000 // ns.SAMPLE_FREQ
+            t_core1 = (stats['bands'][0] + stats['peaks'][0]
+                       + stats['fill'][0] + stats['write'][0])
+            res[name] = (t_cap, stats['fft'][0], t_core1, fps)
+            print('%-12s %6d %5d %7d %7d %8d      %5.1f' % (
+                name, ns.SAMPLE_FREQ, ns.FFT_SIZE, t_cap, stats['fft'][0], t_core1, fps))
+    finally:
+        ns._use_profile(prev)
+    return res
+
+
+def report_band_spectr(frames=100, signal='pink', **kw):
+    '''
+    Агрегація смуг до / після таблиці BAND_EDGES для кожного профілю neo_spectr.PROFILES:
+    neo_spectr.bench_band_spectr() на спектрі кадра signal (band_dbfs() по смугах / band_energies(),
+    середнє на кадр) і T_core1 (p50) конвеєра run() з попереднім і поточним build_band_spectr()
+    (float шлях), мкс. Після прогону повертається профіль, що був активним.
+    '''
+    prev = ns.PROFILE
+    res = {}
+    print('profile      bands: ref     new   T_core1: ref     new (us)  ref/new')
+    try:
+        for name in ns.PROFILES:
+            ns._use_profile(name)
+            buf = array.array('h', [0] * ns.FFT_SIZE)
+            slot = array.array('f', [0.0] * (ns.SPEC_MAX + ns.BASS_LEN))
+            if signal == 'pink':
+                PinkNoise().fill(buf)
+            else:
+                make_sine(buf, 1000)
+            _spectrum(buf, slot, memoryview(slot)[ns.SPEC_MAX:])
+            ref_us, new_us, full_us, fx_us = ns.bench_band_spectr(slot, frames)
+            t_core1 = []
+            for ref in (True, False):
+                stats, alloc, fps = run(signal, frames, fixed=False, ref_bands=ref, **kw)
+                t_core1.append(stats['bands'][0] + stats['peaks'][0]
+                               + stats['fill'][0] + stats['write'][0])
+            res[name] = (ref_us, new_us, t_core1[0], t_core1[1])
+            print('%-12s %10d %7d %12d %7d          %5.2f' % (
+                (name,) + res[name] + (t_core1[0] / t_core1[1] if t_core1[1] else 0,)))
+    finally:
+        ns._use_profile(prev)
+    return res
+
+
+def band_traces(signal='music', frames=200, path=None):
+    '''
+    Рівні стовпців і піків по кадрах signal ('music', 'pink', 'sine', 'wav' з path) через
+    rfft() -> build_band_spectr() -> Envelope (як Core1 на DT_NOMINAL_US): список пар
+    (lvl, peak) - bytearray(M) - для повтору рендеру без DSP
+    '''
+    buf = array.array('h', [0] * ns.FFT_SIZE)
+    slot = array.array('f', [0.0] * (ns.SPEC_MAX + ns.BASS_LEN))
+    bass = memoryview(slot)[ns.SPEC_MAX:]
+    spec_work = bytearray(ns.M)
+    env = Envelope(ns.M, ns.BAR_ATTACK_MS, ns.BAR_RELEASE_MS,
+                   ns.PEAK_HOLD_MS, ns.PEAK_FALL_LPS)
+    dt = ns.DT_NOMINAL_US
+    if signal == 'music':
+        src = MusicTrack()
+    elif signal == 'pink':
+        src = PinkNoise()
+    elif signal == 'wav':
+        src = WavReader(path)
+    phase = 0.0
+    t = 0
+    res = []
+    try:
+        for k in range(frames):
+            if signal == 'music':
+                src.fill(buf, t)
+            elif signal == 'sine':
+                phase = make_sine(buf, 1000, phase)
+            else:
+                src.fill(buf)
+            _spectrum(buf, slot, bass)
+            ns.build_band_spectr(slot, spec_work, dt)
+            env.update(ns.band_lvl_q8, dt)
+            res.append((bytearray(env.lvl), bytearray(env.peak)))
+            t += dt
+    finally:
+        if signal == 'wav':
+            src.close()
+    return res
+
+
+def bench_delta(frames=200, signal='music', nm=None, path=None):
+    '''
+    Повний (_apply_spec_viper2()) і delta-рендер (fill_spectrum_delta()) кожного кадра
+    band_traces(signal) через NeoMatrixFast.apply_spectrum_delta_timed().
+    Вертає (p50 повного fill, p50 delta fill, p50 зекономленого, мкс; кадрів без змін)
+    '''
+    if nm is None:
+        nm = NeoMatrixFast(row=16, col=ns.M, neo_pin=20, delta=True)
+        nm.clear()
+    traces = band_traces(signal, frames, path)
+    col_full = array.array('i', [0] * frames)
+    col_delta = array.array('i', [0] * frames)
+    col_saved = array.array('i', [0] * frames)
+    same = 0
+    prev = None
+    for k, (lvl, peak) in enumerate(traces):
+        total_us, fill_us, write_us, saved_us = nm.apply_spectrum_delta_timed(lvl, peak)
+        col_delta[k] = fill_us
+        col_full[k] = fill_us + saved_us
+        col_saved[k] = saved_us
+        if prev == (lvl, peak):
+            same += 1      # np.write() пропущено
+        prev = (lvl, peak)
+    res = (_percentile(sorted(col_full), 50), _percentile(sorted(col_delta), 50),
+           _percentile(sorted(col_saved), 50), same)
+    print('%-6s full fill p50 %d us | delta p50 %d us (saved %d us) | unchanged %d / %d frames'
+          % ((signal,) + res + (frames,)))
+    return res
+
+
+def bench_engines(frames=200, nm=None, seed=1):
+    '''
+    Час рендеру (fill, без np.write()) для кожного рушія NeoMatrixFast на тих самих
+    випадкових кадрах рівнів; еталон - повний _apply_spec_viper2() (бюджет bars).
+    Вертає {рушій: (p50, p95, max)}, мкс
+    '''
+    if nm is None:
+        nm = NeoMatrixFast(row=16, col=ns.M, neo_pin=20)
+    random.seed(seed)
+    n = nm.n
+    spec = [bytearray(random.randint(0, n) for _ in range(nm.m)) for _ in range(16)]
+    peaks = [bytearray(min(n, v + 2) for v in s) for s in spec]
+    col = array.array('i', [0] * frames)
+
+    def measure(fn, levels=spec):
+        for k in range(frames):
+            s = levels[k & 15]
+            p = peaks[k & 15]
+            t0 = time.ticks_us()
+            fn(s, p)
+            col[k] = time.ticks_diff(time.ticks_us(), t0)
+        v = sorted(col)
+        return _percentile(v, 50), _percentile(v, 95), v[-1]
+
+    res = {'viper2 (ref)': measure(nm._apply_spec_viper2)}
+    engine = nm.engine
+    for name in nm.ENGINES:
+        nm.set_engine(name)
+        res[name] = measure(nm.fill_spectrum_buf)
+    nm.set_engine(engine)
+
+    # sub-pixel стовпці на тих самих кадрах з дробовими рівнями 8.8
+    q8 = [array.array('i', [(v << 8) - random.randint(0, 255) if v else 0 for v in s])
+          for s in spec]
+    subpixel = nm.subpixel
+    nm.set_subpixel(True)
+    res['subpixel'] = measure(nm._render_subpixel, q8)
+    nm.set_subpixel(subpixel)
+    return res
+
+
+def report_engines(frames=200, **kw):
+    res = bench_engines(frames, **kw)
+    ref = res['viper2 (ref)'][0]
+    print('engine          p50     p95     max  (us)  p50/ref')
+    for name, (p50, p95, mx) in res.items():
+        print('%-12s %7d %7d %7d     %5.2f' % (name, p50, p95, mx, p50 / ref if ref else 0))
+    return res
+
+
+if __name__ == '__main__':
+    nm = NeoMatrixFast(row=16, col=ns.M, neo_pin=20, delta=True)
+    nm.clear()
+    for sig in ('sine', 'sweep', 'pink'):
+        report(sig, 200, nm=nm)
+        print()
+    report_engines(200, nm=nm)
+    print()
+    for sig in ('music', 'pink'):
+        bench_delta(200, sig, nm=nm)
+    print()
+    report_profiles(100, nm=nm)
+    print()
+    report_band_spectr(100, nm=nm)
+    print()
+    bench_front_end()
+    bench_onset()
+    for sig in ('sine', 'sweep', 'pink'):
+        compare_analysis(sig)
+        compare_analysis(sig, mode='int')
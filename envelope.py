@@ -0,0 +1,146 @@
+# Author: Oleksandr Teteria
+# v1.0.0
+# 17.10.2026
+# Implemented and tested on Pi Pico with RP2040
+# Released under the MIT license
+
+import array
+import math
+import micropython
+
+
+class Envelope:
+    '''
+    Огинаюча рівнів смуг: згладжування стовпців (окремо attack / release)
+    і peak-hold з утриманням та спадом. Сталі часу задаються в мс і
+    застосовуються за виміряним часом кадра dt, тому вигляд не залежить від FPS.
+
+    Стан по смугах - передвиділені масиви, рівні у форматі Q8 (1 рівень = 256).
+    update() - один viper-прохід по всіх смугах, без алокацій. Коефіцієнт згладжування
+    інтерполюється між мілісекундами таблиці, а дробова частина спаду піку переноситься
+    на наступний кадр, тож і при кадрах у кілька мс рівні в спільні моменти часу ті самі.
+    Вхід - рівні смуг у форматі 8.8 (neo_spectr.band_lvl_q8), тож дробова частина
+    рівня не губиться до рендеру.
+    Результат: self.lvl (bytearray, 0..16), self.peak (bytearray, 0..16),
+    self.lvl_q8 (array('i'), дробові рівні 8.8 для sub-pixel рендеру).
+
+      attack_ms  - стала часу наростання стовпця (0 - миттєво)
+      release_ms - стала часу спаду стовпця (0 - миттєво)
+      hold_ms    - утримання піку перед спадом
+      fall_lps   - швидкість спаду піку, рівнів/с
+    '''
+    DT_MAX_MS = 255  # довші кадри рахуються як 255 мс
+
+    def __init__(self, bands, attack_ms=0, release_ms=0, hold_ms=0, fall_lps=8.0):
+        self.bands = bands
+        self.lvl_q8 = array.array('i', [0] * bands)
+        self.peak_q8 = array.array('i', [0] * bands)
+        self.hold = array.array('i', [0] * bands)    # залишок утримання піку, мкс
+        self.fall_rem = array.array('i', [0] * bands)   # неврахований спад піку, Q8 / 1e6
+        self.lvl = bytearray(bands)
+        self.peak = bytearray(bands)
+
+        # коефіцієнти згладжування 1 - exp(-dt/tau) у Q15 для dt = 0..256 мс (між ними - лінійно)
+        self.k_att = array.array('i', [0] * (self.DT_MAX_MS + 2))
+        self.k_rel = array.array('i', [0] * (self.DT_MAX_MS + 2))
+        # [hold_us, fall (Q8 рівня за секунду); fall * DT_MAX_MS * 1000 < 2^31]
+        self.prm = array.array('i', [0, 0])
+        self.set_times(attack_ms, release_ms, hold_ms, fall_lps)
+
+    @staticmethod
+    def _fill_k(k, tau_ms):
+        for dt in range(len(k)):
+            if tau_ms <= 0:
+                k[dt] = 32768
+            else:
+                k[dt] = int(32768 * (1.0 - math.exp(-dt / tau_ms)) + 0.5)
+
+    def set_times(self, attack_ms, release_ms, hold_ms, fall_lps):
+        # перебудова таблиць (поза циклом кадрів)
+        self._fill_k(self.k_att, attack_ms)
+        self._fill_k(self.k_rel, release_ms)
+        if fall_lps * 256 * self.DT_MAX_MS * 1000 >= 1 << 31:
+            raise ValueError("fall_lps must be below 32 levels/s")
+        self.prm[0] = int(hold_ms * 1000)
+        self.prm[1] = int(fall_lps * 256)
+
+    @micropython.viper
+    def update(self, lvl_in, dt_us: int):
+        # lvl_in: array('H') рівнів 8.8 поточного кадра, dt_us: час від попереднього кадра
+        src = ptr16(lvl_in)
+        lq = ptr32(self.lvl_q8)
+        pq = ptr32(self.peak_q8)
+        hold = ptr32(self.hold)
+        rem = ptr32(self.fall_rem)
+        out = ptr8(self.lvl)
+        outp = ptr8(self.peak)
+        prm = ptr32(self.prm)
+        nb = int(self.bands)
+
+        dt_ms = dt_us // 1000
+        if dt_ms > 255:
+            dt_ms = 255
+            dt_us = 255_000
+        if dt_ms < 0:
+            dt_ms = 0
+            dt_us = 0
+        frac = dt_us - dt_ms * 1000   # мкс понад цілі мс: лінійно між k[dt_ms] і k[dt_ms + 1]
+        k = ptr32(self.k_att)
+        ka = k[dt_ms] + ((k[dt_ms + 1] - k[dt_ms]) * frac) // 1000
+        k = ptr32(self.k_rel)
+        kr = k[dt_ms] + ((k[dt_ms + 1] - k[dt_ms]) * frac) // 1000
+        hold_us = prm[0]
+        fall = prm[1]  # Q8 рівня за секунду
+
+        for i in range(nb):
+            # --- стовпець: attack / release ---
+            t = int(src[i])
+            v = lq[i]
+            rise = t > v
+            # крок не менше 1/256 рівня: стовпець доходить до цілі точно, а не зависає поруч через округлення
+            if t > v:
+                d = ((t - v) * ka + 16384) >> 15
+                if d == 0 and ka > 0:
+                    d = 1
+                v += d
+            elif t < v:
+                d = ((v - t) * kr + 16384) >> 15
+                if d == 0 and kr > 0:
+                    d = 1
+                v -= d
+            lq[i] = v
+            lv = (v + 128) >> 8
+            out[i] = lv
+
+            # --- пік: утримання, далі спад (з моменту кінця утримання всередині кадра) ---
+            p = pq[i]
+            top = v   # пік стежить за дробовим рівнем стовпця, а не за округленим lv
+            # новий максимум: стовпець вище піку або ще росте до цілі (наближення до неї асимптотичне,
+            # і останній крок у 1/256 рівня інакше припадав би на різні кадри при різному FPS)
+            if top > p or (rise and top == p):
+                p = top
+                hold[i] = hold_us
+                rem[i] = 0
+            else:
+                tf = dt_us
+                h = hold[i]
+                if h >= dt_us:
+                    hold[i] = h - dt_us
+                    tf = 0
+                elif h > 0:
+                    hold[i] = 0
+                    tf = dt_us - h
+                # спад за tf мкс у Q8 / 1e6; ціла частина - з піку, залишок - на наступний кадр
+                acc = rem[i] + fall * tf
+                q = acc // 1_000_000
+                p -= q
+                rem[i] = acc - q * 1_000_000
+                if p < top:
+                    # пік і стовпець зустрілись: стовпець, що росте, ставить нове утримання,
+                    # а до стовпця, що спадає, пік просто опускається і далі йде разом з ним
+                    p = top
+                    rem[i] = 0
+                    if rise:
+                        hold[i] = hold_us
+            pq[i] = p
+            outp[i] = (p + 128) >> 8
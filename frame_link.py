@@ -0,0 +1,174 @@
+# Author: Oleksandr Teteria
+# v1.0.0
+# 17.10.2026
+# Implemented and tested on Pi Pico with RP2040
+# Released under the MIT license
+
+'''
+Бінарний канал кадрів (рівні + піки смуг) через UART на хост (utils/frame_receiver.py).
+
+Пакет:
+  0xA5 0x5A | seq | flags | n | len | payload[len] | crc16 (старший байт першим)
+    seq     - номер кадра 0..255 (по колу)
+    flags   - FL_KEY: ключовий кадр (без посилання на попередній), FL_BEAT: онсет на цьому кадрі
+    n       - кількість значень кадра (рівні смуг, далі піки: 2 * bands)
+    payload - токени: 0..127 - нове значення наступного елемента,
+              0x80 | (k - 1) - k елементів (1..128) без змін відносно попереднього кадра
+    crc16   - CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF) від seq до кінця payload
+Ключовий кадр - лише значення (без пропусків); решта - лише змінені елементи (delta + RLE),
+тож незмінний кадр - 9 байт.
+'''
+
+import array
+
+SYNC0 = 0xA5
+SYNC1 = 0x5A
+FL_KEY = 0x01
+FL_BEAT = 0x02
+HDR_LEN = 6   # sync, sync, seq, flags, n, len
+RUN = 0x80    # біт токена пропуску
+
+# таблиця CRC-16/CCITT-FALSE
+CRC_TABLE = array.array('H', [0] * 256)
+for _i in range(256):
+    _c = _i << 8
+    for _ in range(8):
+        _c = ((_c << 1) ^ 0x1021) if _c & 0x8000 else (_c << 1)
+    CRC_TABLE[_i] = _c & 0xFFFF
+
+
+def crc16(data, crc=0xFFFF):
+    # CRC-16/CCITT-FALSE для bytes / bytearray / memoryview
+    t = CRC_TABLE
+    for b in data:
+        crc = ((crc << 8) & 0xFFFF) ^ t[((crc >> 8) ^ b) & 0xFF]
+    return crc
+
+
+class FrameLink:
+    '''
+    Вихід кадрів спектра в UART без блокування Core1.
+
+    send() кодує кадр одразу в кільце (bytearray, розмір - степінь 2) і дописує CRC,
+    без алокацій; якщо в кільці немає місця на найбільший пакет - кадр пропускається
+    (drops) без зсуву seq, і наступний кодується відносно останнього відправленого.
+    poll() віддає в UART наступний безперервний шматок кільця, лише коли UART завершив
+    попередню передачу (txdone()) і не більше txbuf байт - write() не чекає
+    (алокація - лише зріз memoryview на виклик write()).
+    Кодер - чистий Python без viper: той самий модуль працює на хості (utils/frame_receiver.py).
+
+      uart      - machine.UART (write(), txdone()) або будь-що з тими ж методами
+      bands     - кількість смуг (кадр: bands рівнів + bands піків, значення 0..127)
+      ring_size - розмір кільця, байт (степінь 2)
+      txbuf     - розмір буфера передачі UART (txbuf= при створенні UART)
+      key_every - ключовий кадр кожні key_every кадрів (відновлення після втрат на лінії)
+    '''
+    def __init__(self, uart, bands, ring_size=1024, txbuf=256, key_every=32):
+        if ring_size & (ring_size - 1):
+            raise ValueError("ring_size must be a power of 2")
+        n = 2 * bands
+        if n > 255 or HDR_LEN + n + 2 > ring_size:
+            raise ValueError("too many bands for the frame link")
+        self.uart = uart
+        self.bands = bands
+        self.n = n
+        self.ring = bytearray(ring_size)
+        self.mask = ring_size - 1
+        self._mv = memoryview(self.ring)
+        self.head = 0    # позиція запису
+        self.tail = 0    # позиція наступного байта для UART
+        self.txbuf = txbuf
+        self.key_every = key_every
+        self.prev = bytearray(n)   # останній відправлений кадр (рівні, далі піки)
+        self.seq = 0
+        self._key_cnt = 0          # 0 - наступний кадр ключовий
+        self.frames = 0
+        self.drops = 0
+
+    def pending(self):
+        # байт у кільці, що ще не віддані в UART
+        return (self.head - self.tail) & self.mask
+
+    def send(self, lvl, peak, beat=False):
+        '''
+        Кодування кадра в кільце: lvl, peak - bytearray(bands) (напр. Envelope.lvl / .peak).
+        Вертає False, якщо кадр пропущено (кільце заповнене).
+        '''
+        ring = self.ring
+        mask = self.mask
+        n = self.n
+        if self.mask - self.pending() < HDR_LEN + n + 2:
+            self.drops += 1
+            return False
+        key = self._key_cnt == 0
+        prev = self.prev
+        bands = self.bands
+        t = CRC_TABLE
+
+        # заголовок (len - після payload)
+        h = self.head
+        ring[h] = SYNC0
+        ring[(h + 1) & mask] = SYNC1
+        ring[(h + 2) & mask] = self.seq
+        ring[(h + 3) & mask] = (FL_KEY if key else 0) | (FL_BEAT if beat else 0)
+        ring[(h + 4) & mask] = n
+
+        # payload: значення змінених елементів, пропуски незмінних
+        p = h + HDR_LEN
+        run = 0
+        for i in range(n):
+            v = lvl[i] if i < bands else peak[i - bands]
+            if v > 127:
+                v = 127
+            if not key and v == prev[i]:
+                run += 1
+                if run == 128:
+                    ring[p & mask] = RUN | 127
+                    p += 1
+                    run = 0
+                continue
+            if run:
+                ring[p & mask] = RUN | (run - 1)
+                p += 1
+                run = 0
+            ring[p & mask] = v
+            p += 1
+            prev[i] = v
+        if run:
+            ring[p & mask] = RUN | (run - 1)
+            p += 1
+        ring[(h + 5) & mask] = p - h - HDR_LEN
+
+        # CRC: від seq до кінця payload
+        crc = 0xFFFF
+        q = h + 2
+        while q < p:
+            crc = ((crc << 8) & 0xFFFF) ^ t[((crc >> 8) ^ ring[q & mask]) & 0xFF]
+            q += 1
+        ring[p & mask] = crc >> 8
+        ring[(p + 1) & mask] = crc & 0xFF
+        self.head = (p + 2) & mask
+
+        self.seq = (self.seq + 1) & 0xFF
+        self._key_cnt += 1
+        if self._key_cnt >= self.key_every:
+            self._key_cnt = 0
+        self.frames += 1
+        return True
+
+    def force_key(self):
+        # наступний кадр - ключовий (напр. після перепідключення хоста)
+        self._key_cnt = 0
+
+    def poll(self):
+        # віддати в UART наступний шматок кільця, якщо UART вільний; вертає кількість байт
+        if self.head == self.tail or not self.uart.txdone():
+            return 0
+        end = self.head if self.head > self.tail else self.mask + 1
+        if end - self.tail > self.txbuf:
+            end = self.tail + self.txbuf
+        w = self.uart.write(self._mv[self.tail:end])
+        if w:
+            self.tail = (self.tail + w) & self.mask
+            return w
+        return 0
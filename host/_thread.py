@@ -0,0 +1,46 @@
+"""
+Хост-заміна _thread для збірок MicroPython (unix) без потоків. CPython і збірки з потоками
+беруть вбудований _thread: вбудований модуль має пріоритет над sys.path.
+Lock без суперництва (потік один); другого ядра немає - start_new_thread() кидає OSError,
+а бенчмарк і тести виконують етапи Core0 / Core1 по черзі в одному потоці.
+"""
+
+
+class LockType:
+    def __init__(self):
+        self.held = False
+
+    def acquire(self, waitflag=1, timeout=-1):
+        if self.held and not waitflag:
+            return False
+        self.held = True
+        return True
+
+    def release(self):
+        if not self.held:
+            raise RuntimeError("release unlocked lock")
+        self.held = False
+
+    def locked(self):
+        return self.held
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def allocate_lock():
+    return LockType()
+
+
+def start_new_thread(func, args, kwargs=None):
+    raise OSError("no threads on this port")
+
+
+def get_ident():
+    return 1
+
+
+def stack_size(size=0):
+    return 0
@@ -0,0 +1,80 @@
+"""
+Хост-заміна C-модуля adc_dma (захват ADC у RAM по DMA) з тим самим задокументованим інтерфейсом
+(сирі семпли для FRONT_END / 'stream' - з adc_ring.AdcRing, у заміні rp2.DMA - той самий source і clock):
+
+  start(ch, fs, n)        - захват n семплів з частотою fs (на хості - одразу)
+  busy()                  - True, поки триває захват (на хості - ніколи)
+  buffer_i16(mode, peak)  - семпли int16: mode 'auto' - мінус середнє блока, масштаб до піку peak;
+                            вертає (memoryview 'h', пік до масштабування)
+  close()                 - звільнення буфера захвату
+
+Сигнал - source(t, fs): код ADC 0..4095 для семпла з абсолютним номером t (за замовчуванням
+синус 1 кГц, амплітуда 1000 кодів навколо 2048). Кожен start() продовжує з семпла, на якому
+зупинився попередній захват, плюс gap семплів (пауза між one-shot захватами на платі).
+realtime > 0: busy() - True протягом n / fs * realtime с після start() (тривалість захвату в
+масштабі часу хост-симуляції); 0 - захват миттєвий.
+"""
+
+import array
+import math
+import time
+
+
+def _sine(t, fs):
+    return 2048 + int(1000 * math.sin(2 * math.pi * 1000 * t / fs))
+
+
+source = _sine
+gap = 0          # семплів, втрачених між захватами
+realtime = 0.0   # масштаб часу захвату (0 - миттєво)
+clock = 0        # абсолютний номер наступного семпла
+captures = 0
+
+_raw = array.array('H')
+_i16 = array.array('h')
+_n = 0
+_t_end = 0.0
+
+
+def reset(src=_sine, lost=0):
+    # новий сигнал з семпла 0; lost - семплів між захватами (gap)
+    global source, gap, clock, captures
+    source = src
+    gap = lost
+    clock = 0
+    captures = 0
+
+
+def start(ch, fs, n):
+    global clock, captures, _raw, _i16, _n, _t_end
+    if len(_raw) < n:
+        _raw = array.array('H', [0] * n)
+        _i16 = array.array('h', [0] * n)
+    if captures:
+        clock += gap
+    for k in range(n):
+        v = source(clock + k, fs)
+        _raw[k] = 0 if v < 0 else 4095 if v > 4095 else v
+    clock += n
+    captures += 1
+    _n = n
+    _t_end = time.perf_counter() + n / fs * realtime
+
+
+def busy():
+    return realtime > 0 and time.perf_counter() < _t_end
+
+
+def buffer_i16(mode='auto', peak=10_000):
+    n = _n
+    mean = sum(_raw[k] for k in range(n)) // n if mode == 'auto' and n else 0
+    pk = max((abs(_raw[k] - mean) for k in range(n)), default=0)
+    g = peak / pk if pk else 1.0
+    for k in range(n):
+        v = int((_raw[k] - mean) * g)
+        _i16[k] = -32768 if v < -32768 else 32767 if v > 32767 else v
+    return memoryview(_i16)[:n], pk
+
+
+def close():
+    pass
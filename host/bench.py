@@ -0,0 +1,46 @@
+"""
+Бенчмарк bench_spectr.py на хості без плати: модулі прошивки (adc_dma, fastfft) і заліза
+(machine, neopixel, rp2, _thread, micropython) беруться з цієї теки. Нічого не пише у файли.
+Час етапів - час інтерпретатора хоста: придатний для порівняння варіантів між собою, а не з платою.
+
+  python3 host/bench.py [кадрів на сигнал]
+"""
+
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+for _p in (ROOT, HERE):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+import micropython  # noqa: E402,F401  ptr8/16/32, time.ticks_* - до модулів проєкту
+import bench_spectr as bs  # noqa: E402
+import neo_spectr as ns  # noqa: E402
+from neo_matrix import NeoMatrixFast  # noqa: E402
+
+
+def main(frames=20):
+    nm = NeoMatrixFast(row=16, col=ns.M, neo_pin=20, delta=True)
+    nm.clear()
+    for sig in ('sine', 'sweep', 'pink'):
+        bs.report(sig, frames, nm=nm)
+        print()
+    bs.report_engines(frames, nm=nm)
+    print()
+    for sig in ('music', 'pink'):
+        bs.bench_delta(frames, sig, nm=nm)
+    print()
+    bs.report_profiles(frames, nm=nm)
+    print()
+    bs.report_band_spectr(frames, nm=nm)
+    print()
+    bs.bench_front_end(frames)
+    for sig in ('sine', 'pink'):
+        bs.compare_analysis(sig, frames)
+        bs.compare_analysis(sig, frames, mode='int')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
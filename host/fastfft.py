@@ -0,0 +1,66 @@
+"""
+Хост-заміна C-модуля fastfft: rfft(buf, window) - радикс-2 FFT на Python з тією ж нормалізацією,
+що й модуль прошивки: spec[k] = |X[k]|^2 / (N * sum(w^2)), k = 0..N/2, вікно Ханна (періодичне)
+або прямокутне. Вертає memoryview на єдиний внутрішній буфер ('f'), який перезаписує наступний виклик.
+"""
+
+import array
+import cmath
+import math
+
+_tables = {}     # N -> (перестановка бітів, поворотні множники, вікно, sum(w^2))
+_out = array.array('f')
+
+
+def _table(n):
+    t = _tables.get(n)
+    if t is None:
+        if n < 2 or n & (n - 1):
+            raise ValueError("FFT size must be a power of 2")
+        bits = n.bit_length() - 1
+        rev = [int(format(i, '0%db' % bits)[::-1], 2) for i in range(n)]
+        tw = [cmath.exp(-2j * math.pi * k / n) for k in range(n // 2)]
+        w = [0.5 - 0.5 * math.cos(2 * math.pi * i / n) for i in range(n)]
+        t = _tables[n] = (rev, tw, w, sum(v * v for v in w))
+    return t
+
+
+def fft(x):
+    # комплексний FFT на місці (список довжини 2^k)
+    n = len(x)
+    rev, tw, _, _ = _table(n)
+    for i in range(n):
+        j = rev[i]
+        if j > i:
+            x[i], x[j] = x[j], x[i]
+    size = 2
+    while size <= n:
+        half = size // 2
+        step = n // size
+        for s in range(0, n, size):
+            for k in range(half):
+                a = x[s + k]
+                b = x[s + k + half] * tw[k * step]
+                x[s + k] = a + b
+                x[s + k + half] = a - b
+        size *= 2
+    return x
+
+
+def rfft(buf, window=True):
+    global _out
+    n = len(buf)
+    _, _, w, s2 = _table(n)
+    if window:
+        x = [complex(buf[i] * w[i]) for i in range(n)]
+    else:
+        x = [complex(buf[i]) for i in range(n)]
+        s2 = float(n)
+    fft(x)
+    if len(_out) < n // 2 + 1:
+        _out = array.array('f', [0.0] * (n // 2 + 1))
+    norm = 1.0 / (n * s2)
+    for k in range(n // 2 + 1):
+        v = x[k]
+        _out[k] = (v.real * v.real + v.imag * v.imag) * norm
+    return memoryview(_out)[:n // 2 + 1]
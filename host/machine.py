@@ -0,0 +1,77 @@
+"""
+Хост-заміна machine: Pin (значення задається з тесту, IRQ - виклик handler через fire()),
+ADC (стала середина шкали), UART (байти write() накопичуються в .out), mem32 (регістри - словник
+адреса -> значення; CS ADC завжди READY: перетворення на хості миттєве).
+"""
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, pin, mode=-1, pull=-1, value=1):
+        self.pin = pin
+        self.v = value
+        self.handler = None
+
+    def value(self, v=None):
+        if v is None:
+            return self.v
+        self.v = v
+
+    def irq(self, handler=None, trigger=IRQ_FALLING):
+        self.handler = handler
+
+    def fire(self):
+        # натискання кнопки на хості
+        if self.handler:
+            self.handler(self)
+
+
+class ADC:
+    def __init__(self, pin):
+        self.pin = pin
+
+    def read_u16(self):
+        return 32768
+
+
+class UART:
+    def __init__(self, id, baudrate=115200, tx=None, rx=None, txbuf=256, **kw):
+        self.baudrate = baudrate
+        self.out = bytearray()
+
+    def write(self, buf):
+        self.out += bytes(buf)
+        return len(buf)
+
+    def txdone(self):
+        return True
+
+    def read(self, n=-1):
+        return None
+
+
+class _Mem32:
+    def __init__(self):
+        self.regs = {}
+
+    def __getitem__(self, addr):
+        v = self.regs.get(addr, 0)
+        if addr == 0x4004C000:
+            v |= 0x100
+        return v
+
+    def __setitem__(self, addr, v):
+        self.regs[addr] = v & 0xFFFFFFFF
+
+
+mem32 = _Mem32()
+
+
+def freq(f=None):
+    return 125_000_000
@@ -0,0 +1,92 @@
+"""
+Хост-заміна модуля micropython (CPython): декоратори emitter-ів виконують функцію як звичайний
+Python, а вбудовані засоби viper і MicroPython-розширення time / gc додаються при імпорті.
+
+  ptr8 / ptr16 / ptr32 - доступ до буфера як у viper: запис обрізається до розрядності
+                         (ptr32 - зі знаком, ptr8 / ptr16 - без знака), читання ptr8 / ptr16 без знака
+  uint                 - int
+  time.ticks_us / ticks_ms / ticks_diff / ticks_add / sleep_us / sleep_ms
+  gc.mem_alloc / mem_free - за tracemalloc (якщо ввімкнено), інакше 0
+
+На порті MicroPython (unix) модуль не використовується: micropython там вбудований.
+"""
+
+import builtins
+import gc
+import time
+import tracemalloc
+
+
+def viper(f):
+    return f
+
+
+def native(f):
+    return f
+
+
+def const(x):
+    return x
+
+
+def schedule(f, arg):
+    f(arg)
+    return True
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+class _Ptr:
+    # вказівник viper на буфер: значення при записі обрізаються як у 32-бітному регістрі RP2040
+    __slots__ = ('m', 'mask', 'half')
+
+    def __init__(self, m, bits, signed):
+        self.m = m
+        self.mask = (1 << bits) - 1
+        self.half = 1 << (bits - 1) if signed else 0
+
+    def __getitem__(self, i):
+        return self.m[i]
+
+    def __setitem__(self, i, v):
+        v &= self.mask
+        if self.half and v >= self.half:
+            v -= self.mask + 1
+        self.m[i] = v
+
+    def __len__(self):
+        return len(self.m)
+
+
+def ptr8(buf):
+    return _Ptr(memoryview(buf).cast('B'), 8, False)
+
+
+def ptr16(buf):
+    return _Ptr(memoryview(buf).cast('B').cast('H'), 16, False)
+
+
+def ptr32(buf):
+    return _Ptr(memoryview(buf).cast('B').cast('i'), 32, True)
+
+
+builtins.ptr8 = ptr8
+builtins.ptr16 = ptr16
+builtins.ptr32 = ptr32
+builtins.uint = int
+
+if not hasattr(time, 'ticks_us'):
+    _t0 = time.perf_counter_ns()
+    time.ticks_us = lambda: (time.perf_counter_ns() - _t0) // 1000
+    time.ticks_ms = lambda: (time.perf_counter_ns() - _t0) // 1_000_000
+    time.ticks_diff = lambda a, b: a - b
+    time.ticks_add = lambda a, b: a + b
+    time.sleep_us = lambda us: time.sleep(us / 1e6)
+    time.sleep_ms = lambda ms: time.sleep(ms / 1e3)
+
+if not hasattr(gc, 'mem_alloc'):
+    # CPython звільняє тимчасові об'єкти одразу, тож це лише утримана пам'ять, а не всі алокації
+    gc.mem_alloc = lambda: tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+    gc.mem_free = lambda: 0
@@ -0,0 +1,33 @@
+"""
+Хост-заміна neopixel: write() зберігає копію buf (last) і лічить кадри (frames) замість передачі на матрицю.
+"""
+
+
+class NeoPixel:
+    def __init__(self, pin, n, bpp=3, timing=1):
+        self.pin = pin
+        self.n = n
+        self.bpp = bpp
+        self.buf = bytearray(n * bpp)
+        self.frames = 0
+        self.last = None
+
+    def __len__(self):
+        return self.n
+
+    def __setitem__(self, i, v):
+        o = i * self.bpp
+        for k in range(self.bpp):
+            self.buf[o + k] = v[k]
+
+    def __getitem__(self, i):
+        o = i * self.bpp
+        return tuple(self.buf[o:o + self.bpp])
+
+    def fill(self, v):
+        for i in range(self.n):
+            self[i] = v
+
+    def write(self):
+        self.last = bytes(self.buf)
+        self.frames += 1
@@ -0,0 +1,147 @@
+"""
+Хост-заміна rp2: PIO-програма не асемблюється, StateMachine нічого не робить, а DMA.config(trigger=True)
+бере count байт з read: копія - у last, лічильник - frames (як neopixel.NeoPixel на хості). Передача в PIO
+триває count * byte_us мкс (WS2812B, 800 кбіт/с): стільки active() - True, моменти початку й кінця кожної
+передачі (time.ticks_us()) - у log. Якщо read змінився до кінця передачі, torn += 1 (на платі DMA
+відправив би частково новий кадр).
+
+DMA з FIFO ADC (read = 0x4004C00C, як в adc_ring.AdcRing) - безперервний захват: поки в machine.mem32
+встановлено START_MANY, кожне читання count дописує нові семпли в буфер write (з загортанням ring_size).
+Сигнал і вісь часу - спільні з заміною adc_dma (source(t, fs), clock, gap), Fs - з регістра DIV.
+adc_dma.realtime > 0: семплів записано стільки, скільки минуло часу від trigger (у масштабі realtime);
+0 - кожне читання count дає ще step семплів.
+"""
+
+import time
+
+import adc_dma
+import machine
+import uctypes
+
+ADC_CS = 0x4004C000
+ADC_FIFO = 0x4004C00C
+ADC_DIV = 0x4004C010
+
+step = 64   # семплів ADC на читання count при adc_dma.realtime = 0
+byte_us = 10   # мкс на байт передачі в PIO (8 біт по 1.25 мкс); 0 - передача завершується одразу
+
+
+class PIO:
+    OUT_LOW = 0
+    OUT_HIGH = 1
+    SHIFT_LEFT = 0
+    SHIFT_RIGHT = 1
+
+
+def asm_pio(**kw):
+    return lambda prog: prog
+
+
+class StateMachine:
+    def __init__(self, sm_id, prog=None, freq=-1, **kw):
+        self.sm_id = sm_id
+        self.on = 0
+
+    def active(self, v=None):
+        if v is None:
+            return self.on
+        self.on = v
+
+    def tx_fifo(self):
+        return 0
+
+    def put(self, v, shift=0):
+        pass
+
+
+class DMA:
+    def __init__(self):
+        self.frames = 0
+        self.last = None
+        self.log = []       # (початок, кінець) кожної передачі, мкс
+        self.torn = 0       # передач, під час яких джерело змінилося
+        self._src = None    # джерело поточної передачі в PIO
+        self._end = 0
+        self._left = 0
+        self._adc = None
+
+    def pack_ctrl(self, **kw):
+        return kw
+
+    def config(self, read=None, write=None, count=-1, ctrl=0, trigger=False):
+        if read == ADC_FIFO:
+            self.active(0)
+            rs = ctrl.get('ring_size', 0)
+            rb = 1 << rs if rs else 0
+            base = write & ~(rb - 1) if rb else write
+            buf, off = uctypes.find(base)
+            if adc_dma.captures:
+                adc_dma.clock += adc_dma.gap
+            adc_dma.captures += 1
+            div = machine.mem32[ADC_DIV]
+            # [семпли u16 буфера, зсув кільця, зсув запису в кільці, розмір кільця (0 - лінійно), fs,
+            #  перший семпл, записано, момент старту]
+            self._adc = [memoryview(buf).cast('B').cast('H'), off >> 1, (write - base) >> 1, rb >> 1,
+                         round(48_000_000 * 256 / (div + 256)), adc_dma.clock, 0, time.perf_counter()]
+            self._left = count
+            return
+        if trigger:
+            self._finish()
+            now = time.ticks_us()
+            self.last = bytes(read[:count])
+            self.frames += 1
+            self._src = read
+            self._end = now + int(count * byte_us)
+            self.log.append((now, self._end))
+
+    def _finish(self):
+        # кінець передачі: джерело не мало змінюватись, поки DMA його читав
+        if self._src is not None and bytes(self._src[:len(self.last)]) != self.last:
+            self.torn += 1
+        self._src = None
+
+    def _adc_run(self):
+        a = self._adc
+        mem, base, pos, rs, fs, t0, done, ts = a
+        if not machine.mem32[ADC_CS] & 0x08:
+            return
+        if adc_dma.realtime > 0:
+            n = int((time.perf_counter() - ts) * fs / adc_dma.realtime) - done
+        else:
+            n = step
+        n = max(0, min(n, self._left))
+        src = adc_dma.source
+        for k in range(done, done + n):
+            v = src(t0 + k, fs)
+            i = pos + k
+            if rs:
+                i &= rs - 1
+            mem[base + i] = 0 if v < 0 else 4095 if v > 4095 else v
+        a[6] = done + n
+        self._left -= n
+
+    @property
+    def count(self):
+        if self._adc:
+            self._adc_run()
+        return self._left
+
+    def active(self, v=None):
+        if v is None:
+            if self._adc:
+                return self._left > 0
+            if self._src is not None:
+                if time.ticks_us() < self._end:
+                    return True
+                self._finish()
+            return False
+        if not v and self._src is not None:
+            self._finish()
+        if not v and self._adc:
+            # зупинка захвату ADC: наступний start() продовжує вісь часу adc_dma
+            self._adc_run()
+            adc_dma.clock = self._adc[5] + self._adc[6]
+            self._adc = None
+
+    def close(self):
+        self.active(0)
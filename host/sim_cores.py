@@ -0,0 +1,147 @@
+"""
+Хост-прогін обох ядер neo_spectr: справжні core0_main_loop() і core1_dsp_led_worker() у двох потоках,
+справжні _copy32(), _wait_slot(), lock і slot_full. Час етапів задають заміни з host/:
+
+  T_cap   - adc_dma.realtime: захват триває FFT_SIZE / Fs (у масштабі scale)
+  T_fft   - rfft() з затримкою; спектр кадра k - усі біни = k, у єдиному внутрішньому буфері
+            (як fastfft: наступний rfft() перезаписує його)
+  T_hold  - band_energies() з затримкою посередині читання слота: перевіряє, що всі біни
+            належать одному кадру (не "розірваний") і що кадри йдуть підряд (без повторів і пропусків)
+  T_core1 - решта кадра Core1: вивід на матрицю (BufferOutput з затримкою write())
+
+Часи - у мс моделі; scale - множник реального часу (0.2: 1 мс моделі = 0.2 мс).
+load(**cfg) - свіжий екземпляр neo_spectr з іншими значеннями конфігурації (ZERO_COPY, CAPTURE_MODE, ...).
+"""
+
+import array
+import os
+import re
+import sys
+import threading
+import time
+import types
+
+import adc_dma
+import machine
+from neo_matrix import NeoMatrixFast, BufferOutput
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load(**cfg):
+    """
+    Завантажує neo_spectr.py заново (sys.modules['neo_spectr']) з рядками конфігурації
+    "NAME = ..." верхнього рівня, заміненими на NAME = repr(значення).
+    """
+    path = os.path.join(ROOT, 'neo_spectr.py')
+    with open(path, encoding='utf-8') as f:
+        src = f.read()
+    for name, value in cfg.items():
+        src, n = re.subn(r'^%s = [^\n]*' % name, '%s = %r' % (name, value), src, count=1, flags=re.M)
+        if not n:
+            raise KeyError(name)
+    mod = types.ModuleType('neo_spectr')
+    mod.__file__ = path
+    sys.modules['neo_spectr'] = mod
+    exec(compile(src, path, 'exec'), mod.__dict__)
+    return mod
+
+
+class _SlowOutput(BufferOutput):
+    def __init__(self, num, bpp, delay):
+        super().__init__(num, bpp)
+        self.delay = delay
+
+    def write(self):
+        time.sleep(self.delay)
+        super().write()
+
+
+class _StampFFT:
+    # замість fastfft: спектр кадра k - усі біни = k (перший кадр - 1)
+    def __init__(self, n, delay):
+        self.out = array.array('f', [0.0] * n)
+        self.delay = delay
+        self.k = 0
+
+    def rfft(self, buf, window=True):
+        time.sleep(self.delay)
+        self.k += 1
+        out = self.out
+        v = float(self.k)
+        for i in range(len(out)):
+            out[i] = v
+        return memoryview(out)
+
+
+def run_cores(ns, frames=40, t_cap=None, t_fft=35.0, t_hold=1.0, t_core1=40.0, scale=0.2, timeout=2.0):
+    """
+    frames кадрів обох ядер. t_cap=None - FFT_SIZE / SAMPLE_FREQ профілю (adc_dma.realtime),
+    інакше - затримка захвату в мс моделі. t_hold = t_core1 - Core1 тримає слот увесь кадр
+    (як колишній обмін spectr_busy з одним буфером при ZERO_COPY = True).
+    timeout - скільки с чекати кадрів Core1 після виходу Core0.
+    Вертає dict: fps (кадрів Core1 за с моделі), wait_ms (середнє очікування Core0 на слот, мс моделі) -
+    обидва з телеметрії neo_spectr; torn, dup, skip - кадри, прочитані не цілими / повторно / після пропуску;
+    frames - кадрів, прочитаних Core1
+    """
+    res = {'torn': 0, 'dup': 0, 'skip': 0, 'frames': 0, 'last': 0}
+    k_scale = scale / 1000
+
+    def check_bands(spec, edges, out_e, nb):
+        # перший бін - до затримки, решта - після: запис Core0 у слот під час читання видно
+        first = spec[edges[0]]
+        time.sleep(t_hold * k_scale)
+        whole = True
+        for b in range(nb):
+            for k in range(edges[2 * b], edges[2 * b + 1]):
+                if spec[k] != first:
+                    whole = False
+        if not whole:
+            res['torn'] += 1
+        stamp = int(first)
+        if stamp == res['last']:
+            res['dup'] += 1
+        elif stamp != res['last'] + 1:
+            res['skip'] += 1
+        res['last'] = stamp
+        res['frames'] += 1
+        band_energies(spec, edges, out_e, nb)
+
+    band_energies = ns.band_energies
+    ns.band_energies = check_bands
+    ns.fastfft = _StampFFT(ns.FFT_MAX // 2 + 1, t_fft * k_scale)
+    if t_cap is None:
+        adc_dma.realtime = scale
+    else:
+        adc_dma.realtime = 0.0
+        ns.fastfft.delay += t_cap * k_scale
+    adc_dma.reset(lambda t, fs: 2048)
+    ns.nm = NeoMatrixFast(row=16, col=ns.M, neo_pin=20,
+                          output=_SlowOutput(16 * ns.M, 3, max(0.0, t_core1 - t_hold) * k_scale))
+    ns.button_peaks_en = machine.Pin(16, machine.Pin.IN, machine.Pin.PULL_UP)
+
+    th1 = threading.Thread(target=ns.core1_dsp_led_worker, args=(frames,))
+    th1.start()
+    try:
+        ns.core0_main_loop(frames)
+        th1.join(timeout)
+        if th1.is_alive():
+            # Core1 отримав не всі кадри (зламаний обмін): дочекатися його виходу на порожніх слотах,
+            # не рахуючи їх
+            stats = dict(res)
+            while th1.is_alive():
+                ns.lock.acquire()
+                for k in range(ns.NUM_SLOTS):
+                    ns.slot_full[k] = 1
+                ns.lock.release()
+                time.sleep(0.001)
+            res.update(stats)
+    finally:
+        adc_dma.realtime = 0.0
+        ns.band_energies = band_energies
+
+    wait = dict(ns.tm.summary()).get('wait', (0, 0, 0, 0))[1]
+    res['fps'] = ns.tm.fps() * scale
+    res['wait_ms'] = wait / 1000 / scale
+    del res['last']
+    return res
@@ -0,0 +1,26 @@
+"""
+Хост-заміна uctypes: addressof() видає кожному буферу сталу "адресу" в уявному SRAM (вирівнювання - лише
+на 4 байти, як у купи MicroPython), find() - зворотний пошук (буфер, зсув у байтах) для заміни rp2.DMA.
+"""
+
+_bufs = []            # (адреса, розмір у байтах, буфер)
+_next = 0x20000004
+
+
+def addressof(obj):
+    global _next
+    for addr, size, buf in _bufs:
+        if buf is obj:
+            return addr
+    size = memoryview(obj).nbytes
+    addr = _next
+    _bufs.append((addr, size, obj))
+    _next += (size + 7) & ~3
+    return addr
+
+
+def find(addr):
+    for base, size, buf in _bufs:
+        if base <= addr < base + size:
+            return buf, addr - base
+    raise ValueError('unknown address 0x%08x' % addr)
@@ -12,69 +12,599 @@ import array
 import micropython
 
 
+# ---------------- вивід кадра на WS2812B ----------------
+# Інтерфейс виводу для NeoMatrixFast:
+#   buf     - bytearray кадра (bpp байт на піксель у порядку NeoMatrixFast.order), у який рендерить viper
+#   write() - відправити buf на матрицю
+#   busy()  - True, поки триває передача попереднього кадра
+#   wait()  - дочекатися завершення передачі
+# rp2 імпортується лише в PioDmaOutput: решта модуля працює і без нього (хост, інші порти)
+
+class NeoPixelOutput:
+    '''Блокуючий вивід через neopixel.NeoPixel: write() повертається після передачі'''
+    def __init__(self, neo_pin, num, bpp=3):
+        self.np = neopixel.NeoPixel(machine.Pin(neo_pin), num, bpp=bpp)
+        self.buf = self.np.buf
+
+    def write(self):
+        self.np.write()
+
+    def busy(self):
+        return False
+
+    def wait(self):
+        pass
+
+
+class BufferOutput:
+    '''
+    Вивід без заліза (хост, тести, запис кадрів): write() копіює buf у last (без алокацій)
+    і лічить кадри у frames
+    '''
+    def __init__(self, num, bpp=3):
+        self.buf = bytearray(num * bpp)
+        self.last = bytearray(num * bpp)
+        self.frames = 0
+
+    def write(self):
+        self.last[:] = self.buf
+        self.frames += 1
+
+    def busy(self):
+        return False
+
+    def wait(self):
+        pass
+
+
+_ws2812 = None  # PIO-програма WS2812B (збирається при першому PioDmaOutput)
+
+
+def _ws2812_prog():
+    global _ws2812
+    if _ws2812 is None:
+        import rp2
+
+        @rp2.asm_pio(sideset_init=rp2.PIO.OUT_LOW, out_shiftdir=rp2.PIO.SHIFT_LEFT,
+                     autopull=True, pull_thresh=8)
+        def ws2812():
+            # 1 біт = 10 тактів при 8 МГц (1.25 мкс): "1" - 7 тактів high, "0" - 2 такти high
+            T1 = 2
+            T2 = 5
+            T3 = 3
+            wrap_target()
+            label("bitloop")
+            out(x, 1)               .side(0)    [T3 - 1]
+            jmp(not_x, "do_zero")   .side(1)    [T1 - 1]
+            jmp("bitloop")          .side(1)    [T2 - 1]
+            label("do_zero")
+            nop()                   .side(0)    [T2 - 1]
+            wrap()
+
+        _ws2812 = ws2812
+    return _ws2812
+
+
+class PioDmaOutput:
+    '''
+    Неблокуючий вивід WS2812B через PIO + DMA.
+    write() чекає завершення попередньої передачі, копіює buf у другий (tx) буфер,
+    запускає DMA і одразу повертається. Рендер кадра N+1 у buf іде паралельно
+    з передачею кадра N (~7.7 мс для 256 пікселів).
+    sm_id: 0..3 - PIO0, 4..7 - PIO1
+    bpp:   3 - RGB/GRB, 4 - RGBW/GRBW (PIO шле байти підряд, порядок задає buf)
+    '''
+    RESET_US = 60  # пауза "low" після кадра (latch WS2812B)
+
+    def __init__(self, neo_pin, num, sm_id=0, bpp=3):
+        import rp2
+
+        self.buf = bytearray(num * bpp)
+        self._tx = bytearray(num * bpp)
+
+        self.sm = rp2.StateMachine(sm_id, _ws2812_prog(), freq=8_000_000,
+                                   sideset_base=machine.Pin(neo_pin))
+        self.sm.active(1)
+
+        # адреса TX FIFO state machine та DREQ для DMA
+        pio = sm_id >> 2
+        sm = sm_id & 3
+        self._txf = (0x50300000 if pio else 0x50200000) + 0x10 + 4 * sm
+        self.dma = rp2.DMA()
+        self._ctrl = self.dma.pack_ctrl(size=0, inc_write=False,
+                                        treq_sel=8 * pio + sm)
+        self._sent = False    # чи була хоч одна передача
+        self._t_end = None    # момент, коли FIFO спорожнів (для RESET_US)
+
+    def busy(self):
+        if not self._sent:
+            return False
+        if self.dma.active() or self.sm.tx_fifo():
+            return True
+        if self._t_end is None:
+            self._t_end = time.ticks_us()
+        return time.ticks_diff(time.ticks_us(), self._t_end) < self.RESET_US
+
+    def wait(self):
+        while self.busy():
+            pass
+
+    def write(self):
+        self.wait()
+        self._tx[:] = self.buf
+        self._t_end = None
+        self._sent = True
+        self.dma.config(read=self._tx, write=self._txf, count=len(self._tx),
+                        ctrl=self._ctrl, trigger=True)
+
+
+def make_offsets(n, m, order='rows', serpentine=True, flip_x=True, flip_y=False,
+                 rotate=0, panel=None, bpp=3):
+    '''
+    Таблиця офсетів у buf: off[j*n + i] = bpp * pix_index для логічного пікселя
+    (рядок i зверху, стовпець j зліва) матриці n x m.
+
+    Розводка однієї панелі:
+      order      - 'rows': світлодіоди йдуть рядками, 'cols': стовпцями
+      serpentine - True: кожен наступний рядок/стовпець у зворотному напрямку ("змійка")
+      flip_x     - перший світлодіод панелі праворуч (дзеркало по горизонталі)
+      flip_y     - перший світлодіод панелі знизу (дзеркало по вертикалі)
+    Уся матриця:
+      rotate     - 0, 90, 180, 270: поворот зображення за годинниковою стрілкою
+                   (для 90/270 фізична матриця має розмір m x n)
+      panel      - (рядків, стовпців) однієї панелі; None - одна панель на всю матрицю.
+                   Панелі з'єднані послідовно: зліва направо, зверху вниз.
+
+    Значення за замовчуванням відповідають розводці 16x16 "змійка" по рядках.
+    Приклад: 32x16 з двох панелей 16x16 поруч - make_offsets(16, 32, panel=(16, 16))
+    '''
+    if rotate in (90, 270):
+        H, W = m, n
+    elif rotate in (0, 180):
+        H, W = n, m
+    else:
+        raise ValueError("rotate must be 0, 90, 180 or 270")
+
+    ph, pw = panel if panel else (H, W)
+    if H % ph or W % pw:
+        raise ValueError("matrix size must be a multiple of panel size")
+    tiles_x = W // pw
+
+    off = array.array('H', [0] * (n * m))
+    for j in range(m):
+        for i in range(n):
+            # логічна -> фізична позиція (r, c) з урахуванням повороту
+            if rotate == 0:
+                r, c = i, j
+            elif rotate == 90:
+                r, c = j, n - 1 - i
+            elif rotate == 180:
+                r, c = n - 1 - i, m - 1 - j
+            else:
+                r, c = m - 1 - j, i
+
+            # панель і позиція в ній
+            tile = (r // ph) * tiles_x + c // pw
+            lr = r % ph
+            lc = c % pw
+            if flip_x:
+                lc = pw - 1 - lc
+            if flip_y:
+                lr = ph - 1 - lr
+
+            if order == 'rows':
+                if serpentine and lr % 2:
+                    lc = pw - 1 - lc
+                pix = lr * pw + lc
+            else:
+                if serpentine and lc % 2:
+                    lr = ph - 1 - lr
+                pix = lc * ph + lr
+
+            off[j * n + i] = bpp * (tile * ph * pw + pix)
+    return off
+
+
 class NeoMatrixFast:
-    def __init__(self, row, col, neo_pin):
+    '''
+    Рендер спектра у buf для WS2812B / SK6812 через viper.
+
+    Кольори задаються палітрою повної яскравості (RGB 0..255) та індексами палітри
+    по рядках (row_idx) і для піку (peak_idx). Вихідні байти кожного каналу
+    проходять через LUT на 256 значень (яскравість × гамма), тож зміна яскравості
+    в роботі (set_brightness()) - це перебудова LUT і кольорів рядків, без float на піксель.
+
+      order      - порядок байтів пікселя: 'GRB', 'RGB', 'GRBW', 'RGBW'
+                   (для W-варіантів спільна біла частина min(R, G, B) йде в канал W)
+      brightness - 0..255, яскравість каналу 255 палітри (32 - як раніше)
+      gamma      - гамма LUT (1.0 - лінійно)
+
+    Обмеження струму (set_power_limit()): для bars струм кадра оцінюється аналітично з
+    висот стовпців (суфіксні суми байтів кольорів рядків, O(m)) до рендеру; якщо
+    бюджет перевищено, той самий прохід viper малює зменшеними кольорами рядків
+    (rowgrb = base * scale >> 8), тож другого проходу по buf немає. Інші рушії
+    рахують фактичну суму байтів намальованого кадра і перемальовують його
+    зменшеними кольорами лише тоді, коли бюджет перевищено.
+    '''
+    ORDERS = ('GRB', 'RGB', 'GRBW', 'RGBW')
+
+    # рушії рендеру (перемикаються set_engine() / next_engine(), спільні off/палітра):
+    #   bars      - стовпці знизу вгору + піки (delta-рендер)
+    #   mirror    - стовпці симетрично від середини по вертикалі
+    #   split     - "стерео": низькі частоти в центрі, половини дзеркальні
+    #   vu        - VU-метр по максимальному рівню смуг
+    #   waterfall - водоспад: історія рівнів, новий кадр зверху (кільце рядків)
+    ENGINES = ('bars', 'mirror', 'split', 'vu', 'waterfall')
+    ENG_BARS, ENG_MIRROR, ENG_SPLIT, ENG_VU, ENG_WATERFALL = range(5)
+
+    # базова палітра (RGB, повна яскравість); при brightness=32, gamma=1.0
+    # дає ті самі байти, що й колишні вшиті кольори
+    PALETTE = (
+        (0, 0, 0),        # 0 nothing
+        (255, 0, 0),      # 1 red
+        (192, 64, 0),     # 2 orange
+        (192, 128, 0),    # 3 yellow
+        (96, 160, 0),     # 4 green_yellow
+        (0, 255, 0),      # 5 green
+        (0, 128, 128),    # 6 blue_light
+        (176, 0, 80),     # 7 color_max
+    )
+    PEAK_IDX = 7
+
+    # колірна карта спектрограми (waterfall): опорні кольори RGB від рівня 0 до n,
+    # проміжні рівні - лінійна інтерполяція (далі той самий LUT яскравості)
+    CMAP = (
+        (0, 0, 0),
+        (0, 0, 160),
+        (0, 160, 160),
+        (0, 255, 0),
+        (255, 192, 0),
+        (255, 0, 0),
+    )
+
+    def __init__(self, row, col, neo_pin, delta=False, output=None, layout=None,
+                 order='GRB', brightness=32, gamma=1.0):
         self.n = row
         self.m = col
+        # delta=True: apply_spectrum_buf() перемальовує лише рядки між старою і новою
+        # висотою стовпців і пропускає np.write(), якщо кадр не змінився
+        self.delta = delta
 
-        self.np = neopixel.NeoPixel(machine.Pin(neo_pin), self.n * self.m)
+        if order not in self.ORDERS:
+            raise ValueError("order must be one of %s" % (self.ORDERS,))
+        self.order = order
+        self.bpp = len(order)
+
+        # вивід: за замовчуванням блокуючий NeoPixel, або PioDmaOutput(neo_pin, row*col, bpp=...)
+        if output is None:
+            output = NeoPixelOutput(neo_pin, self.n * self.m, self.bpp)
+        self.np = output
         self.buf = self.np.buf  # bytearray
+        if len(self.buf) != self.n * self.m * self.bpp:
+            raise ValueError("output buffer does not match row*col*bpp")
 
-        # WS2812 у MicroPython NeoPixel зазвичай в порядку GRB
-        def grb(rgb):
-            r, g, b = rgb
-            return (g, r, b)
-
-        self.nothing = grb((0, 0, 0))
-        self.red = grb((32, 0, 0))
-        self.orange = grb((24, 8, 0))
-        self.yellow = grb((24, 16, 0))
-        self.green_yellow = grb((12, 20, 0))
-        self.green = grb((0, 32, 0))
-        self.blue_light = grb((0, 16, 16))
-        self.color_max = grb((22, 0, 10))
-        
-        # офсети в buf (uint16), плоский масив: off[j*n + i] = 3*pix_index
-        self.off = array.array('H', [0] * (self.m * self.n))
-        for j in range(self.m):
-            base = j * self.n
-            for i in range(self.n):
-                # "змійка" по рядках
-                pix = (self.m * i + j) if (i % 2) else (self.m - j - 1 + self.m * i)
-                self.off[base + i] = 3 * pix
+        # офсети в buf (uint16), плоский масив: off[j*n + i] = bpp*pix_index
+        # layout - параметри make_offsets() (розводка, поворот, панелі); None - "змійка" по рядках
+        self.off = make_offsets(self.n, self.m, bpp=self.bpp, **(layout or {}))
 
-        # шаблон зводимо до кольору по рядку -> rowgrb[n*3]
-        self.rowgrb = bytearray(self.n * 3)
-        for i in range(self.n):
-            g, r, b = self._row_color_grb(i)
-            p = 3 * i
-            self.rowgrb[p] = g
-            self.rowgrb[p + 1] = r
-            self.rowgrb[p + 2] = b
+        # палітра та індекси: колір рядка i = palette[row_idx[i]], пік = palette[peak_idx]
+        self.palette = list(self.PALETTE)
+        self.row_idx = bytearray(self._row_zone(i) for i in range(self.n))
+        self.peak_idx = self.PEAK_IDX
+
+        # LUT яскравість × гамма: вихідний байт = lut[канал палітри]
+        self.lut = bytearray(256)
+        self.brightness = brightness
+        self.gamma = gamma
+
+        # кольори у порядку order після LUT: _row_base[n*bpp] (по рядку), _max_base[bpp] (пік)
+        self._row_base = bytearray(self.n * self.bpp)
+        self._max_base = bytearray(self.bpp)
+        # те, що малює viper: базові кольори, зменшені обмежувачем струму (scale, Q8)
+        self.rowgrb = bytearray(self.n * self.bpp)
+        self.color_max = bytearray(self.bpp)
+        # спалах піків (flash_peaks): частка білого в кольорі піка, Q8
+        self.flash = 0
+
+        # колірна карта спектрограми: колір рівня v = cmap[v*bpp : (v+1)*bpp], v = 0..n
+        self.cmap_stops = self.CMAP
+        self._cmap_base = bytearray((self.n + 1) * self.bpp)
+        self.cmap = bytearray((self.n + 1) * self.bpp)
+
+        # обмежувач струму: _rowsum[i] - сума байтів рядків i..n-1 (стовпець висотою n-i),
+        # _peaksum - сума байтів піка; budget - максимум суми байтів кадра (0 - вимкнено)
+        self._rowsum = array.array('i', [0] * (self.n + 1))
+        self._peaksum = 0
+        self.budget = 0
+        self.scale = 256
 
         # багаторазові буфери спектру (щоб не алокувати щораз)
         self.spec = bytearray(self.m)
         self.maxb = bytearray(self.m)
 
-    def _row_color_grb(self, i):
-        # Зонування шаблону за кольорами (за потреби підправити)
+        # стан delta-рендеру: що зараз намальовано в buf
+        self._prev_spec = bytearray(self.m)
+        self._prev_max = bytearray(self.m)
+        self._zero = bytearray(self.m)  # "без піків"
+        self._delta_valid = False       # False: buf не відповідає _prev_* (потрібен повний рендер)
+        self.unchanged = False          # True: останній кадр не змінив buf (np.write() пропущено)
+
+        # рушій рендеру і історія водоспаду: кільце з n+1 рядків рівнів (_head - найновіший;
+        # зайвий рядок - те, що минулого кадру було внизу, для порівняння при прокрутці)
+        self.engine = self.ENG_BARS
+        self._hist = bytearray((self.n + 1) * self.m)
+        self._head = 0
+
+        # sub-pixel стовпці (bars з рівнями 8.8): інтенсивність верхнього пікселя = ilut[дріб], Q8
+        self.subpixel = False
+        self.ilut = bytearray(256)
+        self.set_subpixel(False)
+
+        self.set_brightness(brightness, gamma)
+
+    def _row_zone(self, i):
+        # Зонування шаблону за кольорами (індекс палітри; за потреби підправити)
+        # межі зон задані для 16 рядків і масштабуються пропорційно до n
+        i = (i * 16) // self.n
         if 0 <= i < 3:
-            return self.red
+            return 1    # red
         elif 3 <= i < 6:
-            return self.orange
+            return 2    # orange
         elif 6 <= i < 9:
-            return self.yellow
+            return 3    # yellow
         elif 9 <= i < 12:
-            return self.green_yellow
+            return 4    # green_yellow
         elif 12 <= i < 15:
-            return self.green
+            return 5    # green
         else:
-            return self.blue_light
+            return 6    # blue_light
+
+    def _pack(self, rgb, dst, p):
+        # колір палітри -> bpp байт у порядку order через LUT
+        r, g, b = rgb
+        w = 0
+        if self.bpp == 4:
+            w = min(r, g, b)
+            r -= w
+            g -= w
+            b -= w
+        lut = self.lut
+        for k, c in enumerate(self.order):
+            if c == 'R':
+                v = r
+            elif c == 'G':
+                v = g
+            elif c == 'B':
+                v = b
+            else:
+                v = w
+            dst[p + k] = lut[v]
+
+    def _build_colors(self):
+        # базові кольори з палітри + суми для оцінки струму
+        bpp = self.bpp
+        for i in range(self.n):
+            self._pack(self.palette[self.row_idx[i]], self._row_base, i * bpp)
+        self._pack(self.palette[self.peak_idx], self._max_base, 0)
+        self._build_cmap()
+
+        acc = 0
+        self._rowsum[self.n] = 0
+        for i in range(self.n - 1, -1, -1):
+            p = i * bpp
+            acc += sum(self._row_base[p:p + bpp])
+            self._rowsum[i] = acc
+        self._peaksum = sum(self._max_base)
+        self._set_scale(self.scale)
+
+    def _build_cmap(self):
+        # рівні 0..n -> опорні кольори cmap_stops (лінійна інтерполяція), далі LUT
+        stops = self.cmap_stops
+        seg = len(stops) - 1
+        n = self.n
+        for v in range(n + 1):
+            x = v * seg * 256 // n          # позиція між опорними, Q8
+            k = x >> 8
+            f = x & 255
+            if k >= seg:
+                k = seg - 1
+                f = 256
+            c0 = stops[k]
+            c1 = stops[k + 1]
+            rgb = tuple(c0[c] + ((c1[c] - c0[c]) * f >> 8) for c in range(3))
+            self._pack(rgb, self._cmap_base, v * self.bpp)
+
+    def set_colormap(self, stops):
+        '''
+        Колірна карта спектрограми: >= 2 опорних кольорів (r, g, b) 0..255 від рівня 0 до n.
+        '''
+        if len(stops) < 2:
+            raise ValueError("colormap needs at least 2 colours")
+        self.cmap_stops = tuple(stops)
+        self._build_colors()
+
+    def _set_scale(self, scale):
+        # rowgrb / color_max = base * scale >> 8; buf малювався іншими кольорами -> повний рендер
+        base = self._row_base
+        row = self.rowgrb
+        for p in range(len(row)):
+            row[p] = (base[p] * scale) >> 8
+        for p in range(len(self.cmap)):
+            self.cmap[p] = (self._cmap_base[p] * scale) >> 8
+        self.scale = scale
+        self._set_peak()
+        self._delta_valid = False
+
+    def _set_peak(self):
+        # color_max = (колір піка, змішаний з білим на flash) * scale >> 8; _peaksum - для обмежувача
+        w = self.lut[255]
+        k = self.flash
+        acc = 0
+        for p in range(self.bpp):
+            b = self._max_base[p]
+            v = b + (((w - b) * k) >> 8)
+            acc += v
+            self.color_max[p] = (v * self.scale) >> 8
+        self._peaksum = acc
+
+    def flash_peaks(self, k):
+        '''
+        Спалах піків (напр. на онсетах onset.OnsetDetector): колір піків змішується з білим
+        тієї ж яскравості LUT, k - частка білого у Q8 (0 - колір палітри, 256 - білий).
+        Змінюється лише color_max; повний рендер - тільки в кадрах, де k змінився.
+        '''
+        if k < 0:
+            k = 0
+        elif k > 256:
+            k = 256
+        if k == self.flash:
+            return
+        self.flash = k
+        self._set_peak()
+        if self.engine != self.ENG_WATERFALL:  # водоспад піків не малює
+            self._delta_valid = False
+
+    def set_power_limit(self, budget_ma, ma_per_step=20 / 255, idle_ma=1.0):
+        '''
+        Бюджет струму матриці, мА (None - без обмеження).
+          ma_per_step - струм на 1 крок значення каналу (WS2812B: ~20 мА на канал при 255)
+          idle_ma     - струм спокою одного пікселя (живлення драйвера)
+        Оцінка кадра: idle_ma * n*m + ma_per_step * (сума байтів buf).
+        '''
+        if budget_ma is None:
+            self.budget = 0
+        else:
+            steps = int((budget_ma - idle_ma * self.n * self.m) / ma_per_step)
+            if steps <= 0:
+                raise ValueError("power budget is below the idle current of the matrix")
+            self.budget = steps
+        if self.scale != 256:
+            self._set_scale(256)
+
+    @micropython.viper
+    def _frame_steps(self, spec_ptr, max_ptr) -> int:
+        # сума байтів кадра з базовими кольорами (без рендеру): O(m)
+        suf = ptr32(self._rowsum)
+        n = int(self.n)
+        m = int(self.m)
+        pk = int(self._peaksum)
+        spec = ptr8(spec_ptr)
+        mx = ptr8(max_ptr)
+
+        total = 0
+        for j in range(m):
+            v = int(spec[j])
+            if v > n:
+                v = n
+            cutoff = n - v
+            total += suf[cutoff]
+            mv = int(mx[j])
+            if mv > n:
+                mv = n
+            if mv > 1:
+                r = n - mv
+                total += pk
+                if r >= cutoff:
+                    # пік замінює піксель стовпця
+                    total -= suf[r] - suf[r + 1]
+        return total
+
+    @micropython.viper
+    def _buf_steps(self) -> int:
+        # фактична сума байтів намальованого buf: O(n*m*bpp)
+        buf = ptr8(self.buf)
+        nb = int(self.n) * int(self.m) * int(self.bpp)
+        total = 0
+        for p in range(nb):
+            total += buf[p]
+        return total
+
+    def _limit(self, spec_buf, max_buf):
+        # bars: масштаб кольорів під бюджет до рендеру (з кроком 1/32, лише вниз від повного значення)
+        if not self.budget:
+            return
+        steps = self._frame_steps(spec_buf, max_buf)
+        scale = 256
+        if steps > self.budget:
+            scale = (self.budget * 256 // steps) & ~7
+        if scale != self.scale:
+            self._set_scale(scale)
+
+    def set_brightness(self, brightness, gamma=None):
+        '''
+        Перебудова LUT: lut[v] = round(brightness * (v/255) ** gamma), далі кольори рядків.
+        Викликати з того ж ядра, що рендерить (Core1), між кадрами.
+        '''
+        if gamma is not None:
+            self.gamma = gamma
+        if brightness < 0:
+            brightness = 0
+        elif brightness > 255:
+            brightness = 255
+        self.brightness = brightness
+        g = self.gamma
+        for v in range(256):
+            self.lut[v] = int(brightness * (v / 255) ** g + 0.5)
+        self._build_colors()
+
+    def set_palette(self, palette=None, row_idx=None, peak_idx=None):
+        '''
+        palette  - послідовність (r, g, b) 0..255 (повна яскравість)
+        row_idx  - індекс палітри для кожного з n рядків (рядок 0 - верх)
+        peak_idx - індекс палітри для піків
+        '''
+        if palette is not None:
+            self.palette = list(palette)
+        if row_idx is not None:
+            if len(row_idx) != self.n:
+                raise ValueError("row_idx must have n entries")
+            self.row_idx[:] = bytearray(row_idx)
+        if peak_idx is not None:
+            self.peak_idx = peak_idx
+        self._build_colors()
+
+    def set_subpixel(self, on, gamma=2.2):
+        '''
+        Sub-pixel стовпці для рушія bars: fill_spectrum_buf(..., spec_q8=рівні 8.8)
+        малює верхній піксель частковою яскравістю. gamma - корекція сприйняття:
+        ilut[f] = 255 * (f/255) ** gamma (1.0 - лінійна інтенсивність).
+        '''
+        self.subpixel = on
+        for f in range(256):
+            self.ilut[f] = int(255 * (f / 255) ** gamma + 0.5)
+        self._delta_valid = False
+
+    def set_engine(self, engine):
+        # engine: назва з ENGINES або індекс; наступний кадр - повний рендер
+        if isinstance(engine, str):
+            engine = self.ENGINES.index(engine)
+        if not 0 <= engine < len(self.ENGINES):
+            raise ValueError("unknown render engine")
+        self.engine = engine
+        self._delta_valid = False
+
+    def next_engine(self):
+        # циклічне перемикання рушіїв (кнопка)
+        self.set_engine((self.engine + 1) % len(self.ENGINES))
+        return self.ENGINES[self.engine]
+
+    def busy(self):
+        # True, поки вивід ще передає попередній кадр
+        return self.np.busy()
+
+    def wait(self):
+        self.np.wait()
 
     def clear(self):
         # швидке занулення всього буфера
         self.buf[:] = b"\x00" * len(self.buf)
         self.np.write()
+        # історія спектрограми теж порожня (buf їй відповідає)
+        self._hist[:] = b"\x00" * len(self._hist)
+        # порожній buf = усі стовпці 0, піків немає
+        self._prev_spec[:] = self._zero
+        self._prev_max[:] = self._zero
+        self._delta_valid = True
 
     @micropython.viper
     def _apply_spec_viper(self, spec_ptr):  # spec_ptr -> ptr8
@@ -84,6 +614,7 @@ class NeoMatrixFast:
 
         n = int(self.n)
         m = int(self.m)
+        bpp = int(self.bpp)  # 3 або 4 байти на піксель
 
         for j in range(m):
             v = int(ptr8(spec_ptr)[j])
@@ -98,14 +629,18 @@ class NeoMatrixFast:
                 buf[o] = 0
                 buf[o + 1] = 0
                 buf[o + 2] = 0
+                if bpp > 3:
+                    buf[o + 3] = 0
 
             # низ: pattern (колір залежить тільки від row=i)
             for i in range(cutoff, n):
                 o = int(off[base + i])
-                p = 3 * i
+                p = bpp * i
                 buf[o] = row[p]
                 buf[o + 1] = row[p + 1]
                 buf[o + 2] = row[p + 2]
+                if bpp > 3:
+                    buf[o + 3] = row[p + 3]
 
     @micropython.viper
     def _apply_spec_viper2(self, spec_ptr, max_ptr):
@@ -115,14 +650,16 @@ class NeoMatrixFast:
 
         n = int(self.n)
         m = int(self.m)
+        bpp = int(self.bpp)  # 3 або 4 байти на піксель
 
         spec = ptr8(spec_ptr)
         mx   = ptr8(max_ptr)
 
-        # color_max (GRB)
+        # color_max (порядок order)
         gmx = int(self.color_max[0])
         rmx = int(self.color_max[1])
         bmx = int(self.color_max[2])
+        wmx = int(self.color_max[bpp - 1])
 
         for j in range(m):
             v = int(spec[j])
@@ -137,14 +674,18 @@ class NeoMatrixFast:
                 buf[o] = 0
                 buf[o + 1] = 0
                 buf[o + 2] = 0
+                if bpp > 3:
+                    buf[o + 3] = 0
 
             # низ: pattern
             for i in range(cutoff, n):
                 o = int(off[base + i])
-                p = 3 * i
+                p = bpp * i
                 buf[o] = row[p]
                 buf[o + 1] = row[p + 1]
                 buf[o + 2] = row[p + 2]
+                if bpp > 3:
+                    buf[o + 3] = row[p + 3]
 
             # --- максимум: led_matrix[n - max_spectr[j]][j] = color_max, якщо max > 1 ---
             mv = int(mx[j])
@@ -156,6 +697,379 @@ class NeoMatrixFast:
                 buf[o] = gmx
                 buf[o + 1] = rmx
                 buf[o + 2] = bmx
+                if bpp > 3:
+                    buf[o + 3] = wmx
+
+    @micropython.viper
+    def _apply_spec_delta(self, spec_ptr, max_ptr) -> int:
+        # рендер лише змін відносно _prev_spec/_prev_max, вертає кількість змінених стовпців
+        buf = ptr8(self.buf)
+        off = ptr16(self.off)
+        row = ptr8(self.rowgrb)
+        ps = ptr8(self._prev_spec)
+        pm = ptr8(self._prev_max)
+
+        n = int(self.n)
+        m = int(self.m)
+        bpp = int(self.bpp)  # 3 або 4 байти на піксель
+
+        spec = ptr8(spec_ptr)
+        mx   = ptr8(max_ptr)
+
+        # color_max (порядок order)
+        gmx = int(self.color_max[0])
+        rmx = int(self.color_max[1])
+        bmx = int(self.color_max[2])
+        wmx = int(self.color_max[bpp - 1])
+
+        changed = 0
+        for j in range(m):
+            v = int(spec[j])
+            if v > n:
+                v = n
+            mv = int(mx[j])
+            if mv > n:
+                mv = n
+            pv = int(ps[j])
+            pmv = int(pm[j])
+            if v == pv and mv == pmv:
+                continue
+            changed += 1
+
+            cutoff = n - v
+            base = j * n
+
+            # стовпець виріс: рядки [n - v, n - pv) -> pattern
+            for i in range(cutoff, n - pv):
+                o = int(off[base + i])
+                p = bpp * i
+                buf[o] = row[p]
+                buf[o + 1] = row[p + 1]
+                buf[o + 2] = row[p + 2]
+                if bpp > 3:
+                    buf[o + 3] = row[p + 3]
+
+            # стовпець зменшився: рядки [n - pv, n - v) -> off
+            for i in range(n - pv, cutoff):
+                o = int(off[base + i])
+                buf[o] = 0
+                buf[o + 1] = 0
+                buf[o + 2] = 0
+                if bpp > 3:
+                    buf[o + 3] = 0
+
+            # старий пік: відновити піксель під ним (pattern або off)
+            if pmv > 1:
+                r = n - pmv
+                o = int(off[base + r])
+                if r >= cutoff:
+                    p = bpp * r
+                    buf[o] = row[p]
+                    buf[o + 1] = row[p + 1]
+                    buf[o + 2] = row[p + 2]
+                    if bpp > 3:
+                        buf[o + 3] = row[p + 3]
+                else:
+                    buf[o] = 0
+                    buf[o + 1] = 0
+                    buf[o + 2] = 0
+                    if bpp > 3:
+                        buf[o + 3] = 0
+
+            # новий пік
+            if mv > 1:
+                o = int(off[base + n - mv])
+                buf[o] = gmx
+                buf[o + 1] = rmx
+                buf[o + 2] = bmx
+                if bpp > 3:
+                    buf[o + 3] = wmx
+
+            ps[j] = v
+            pm[j] = mv
+        return changed
+
+    @micropython.viper
+    def _ceil_levels(self, q8_ptr, dst_ptr):
+        # рівні 8.8 -> цілі з округленням вгору (частково світлий піксель рахується повним)
+        q = ptr32(q8_ptr)
+        dst = ptr8(dst_ptr)
+        n = int(self.n)
+        for j in range(int(self.m)):
+            v = (q[j] + 255) >> 8
+            if v < 0:
+                v = 0
+            elif v > n:
+                v = n
+            dst[j] = v
+
+    @micropython.viper
+    def _render_subpixel(self, q8_ptr, max_ptr):
+        # стовпці з рівнів 8.8: floor(v) пікселів кольором рядка, наступний піксель -
+        # тим самим кольором з інтенсивністю ilut[дріб] (256 рівнів на стовпець)
+        buf = ptr8(self.buf)
+        off = ptr16(self.off)
+        row = ptr8(self.rowgrb)
+        cmx = ptr8(self.color_max)
+        ilut = ptr8(self.ilut)
+        n = int(self.n)
+        m = int(self.m)
+        bpp = int(self.bpp)
+        q = ptr32(q8_ptr)
+        mx = ptr8(max_ptr)
+
+        for j in range(m):
+            v = q[j]
+            if v < 0:
+                v = 0
+            elif v > (n << 8):
+                v = n << 8
+            cutoff = n - (v >> 8)
+            a = int(ilut[v & 255])
+            base = j * n
+
+            # верх: off
+            for i in range(cutoff - 1):
+                o = int(off[base + i])
+                buf[o] = 0
+                buf[o + 1] = 0
+                buf[o + 2] = 0
+                if bpp > 3:
+                    buf[o + 3] = 0
+
+            # частковий піксель над стовпцем
+            if cutoff > 0:
+                o = int(off[base + cutoff - 1])
+                p = bpp * (cutoff - 1)
+                buf[o] = (int(row[p]) * a) >> 8
+                buf[o + 1] = (int(row[p + 1]) * a) >> 8
+                buf[o + 2] = (int(row[p + 2]) * a) >> 8
+                if bpp > 3:
+                    buf[o + 3] = (int(row[p + 3]) * a) >> 8
+
+            # низ: pattern
+            for i in range(cutoff, n):
+                o = int(off[base + i])
+                p = bpp * i
+                buf[o] = row[p]
+                buf[o + 1] = row[p + 1]
+                buf[o + 2] = row[p + 2]
+                if bpp > 3:
+                    buf[o + 3] = row[p + 3]
+
+            mv = int(mx[j])
+            if mv > n:
+                mv = n
+            if mv > 1:
+                o = int(off[base + n - mv])
+                buf[o] = cmx[0]
+                buf[o + 1] = cmx[1]
+                buf[o + 2] = cmx[2]
+                if bpp > 3:
+                    buf[o + 3] = cmx[3]
+
+    # ---------------- інші рушії рендеру (повний рендер, без алокацій) ----------------
+    @micropython.viper
+    def _render_mirror(self, spec_ptr, max_ptr):
+        # стовпці симетрично від середини по вертикалі; колір - за відстанню від центру
+        buf = ptr8(self.buf)
+        off = ptr16(self.off)
+        row = ptr8(self.rowgrb)
+        cmx = ptr8(self.color_max)
+        n = int(self.n)
+        m = int(self.m)
+        bpp = int(self.bpp)
+        spec = ptr8(spec_ptr)
+        mx = ptr8(max_ptr)
+        c = n >> 1
+
+        for j in range(m):
+            v = int(spec[j])
+            if v > n:
+                v = n
+            h = (v + 1) >> 1
+            mv = int(mx[j])
+            if mv > n:
+                mv = n
+            hp = (mv + 1) >> 1
+            base = j * n
+            for i in range(n):
+                # відстань від центру
+                if i < c:
+                    d = c - 1 - i
+                else:
+                    d = i - c
+                o = int(off[base + i])
+                if mv > 1 and d == hp - 1:
+                    for k in range(bpp):
+                        buf[o + k] = cmx[k]
+                elif d < h:
+                    p = bpp * (n - 1 - 2 * d)
+                    for k in range(bpp):
+                        buf[o + k] = row[p + k]
+                else:
+                    for k in range(bpp):
+                        buf[o + k] = 0
+
+    @micropython.viper
+    def _render_split(self, spec_ptr, max_ptr):
+        # "стерео": низькі частоти в центрі, половини дзеркальні;
+        # на стовпець половини - max пари сусідніх смуг
+        buf = ptr8(self.buf)
+        off = ptr16(self.off)
+        row = ptr8(self.rowgrb)
+        cmx = ptr8(self.color_max)
+        n = int(self.n)
+        m = int(self.m)
+        bpp = int(self.bpp)
+        spec = ptr8(spec_ptr)
+        mx = ptr8(max_ptr)
+        half = m >> 1
+
+        for j in range(m):
+            if j < half:
+                q = half - 1 - j
+            else:
+                q = j - half
+            b = 2 * q
+            v = int(spec[b])
+            mv = int(mx[b])
+            if b + 1 < m:
+                if int(spec[b + 1]) > v:
+                    v = int(spec[b + 1])
+                if int(mx[b + 1]) > mv:
+                    mv = int(mx[b + 1])
+            if v > n:
+                v = n
+            if mv > n:
+                mv = n
+            cutoff = n - v
+            rp = n - mv
+            base = j * n
+            for i in range(n):
+                o = int(off[base + i])
+                if mv > 1 and i == rp:
+                    for k in range(bpp):
+                        buf[o + k] = cmx[k]
+                elif i >= cutoff:
+                    p = bpp * i
+                    for k in range(bpp):
+                        buf[o + k] = row[p + k]
+                else:
+                    for k in range(bpp):
+                        buf[o + k] = 0
+
+    @micropython.viper
+    def _render_vu(self, spec_ptr, max_ptr):
+        # VU-метр: горизонтальна смуга на всю висоту, довжина - максимальний рівень смуг;
+        # колір стовпця - як у рядків бару (зліва низ шкали, справа верх)
+        buf = ptr8(self.buf)
+        off = ptr16(self.off)
+        row = ptr8(self.rowgrb)
+        cmx = ptr8(self.color_max)
+        n = int(self.n)
+        m = int(self.m)
+        bpp = int(self.bpp)
+        spec = ptr8(spec_ptr)
+        mx = ptr8(max_ptr)
+
+        v = 0
+        mv = 0
+        for j in range(m):
+            if int(spec[j]) > v:
+                v = int(spec[j])
+            if int(mx[j]) > mv:
+                mv = int(mx[j])
+        if v > n:
+            v = n
+        if mv > n:
+            mv = n
+        w = v * m // n
+        wp = mv * m // n - 1
+
+        for j in range(m):
+            base = j * n
+            p = bpp * (n - 1 - j * n // m)
+            for i in range(n):
+                o = int(off[base + i])
+                if mv > 1 and j == wp:
+                    for k in range(bpp):
+                        buf[o + k] = cmx[k]
+                elif j < w:
+                    for k in range(bpp):
+                        buf[o + k] = row[p + k]
+                else:
+                    for k in range(bpp):
+                        buf[o + k] = 0
+
+    @micropython.viper
+    def _push_history(self, spec_ptr) -> int:
+        # новий рядок історії водоспаду: O(m), без зсуву попередніх рядків; вертає новий head
+        hist = ptr8(self._hist)
+        spec = ptr8(spec_ptr)
+        n = int(self.n)
+        m = int(self.m)
+        head = int(self._head) + 1
+        if head > n:
+            head = 0
+        base = head * m
+        for j in range(m):
+            v = int(spec[j])
+            if v > n:
+                v = n
+            hist[base + j] = v
+        return head
+
+    @micropython.viper
+    def _render_waterfall(self, scroll: int) -> int:
+        # спектрограма: рядок 0 (верх) - найновіший кадр; рядок історії = (head - i) mod (n+1),
+        # колір - cmap[рівень]. scroll=1: buf показує попередній кадр спектрограми, тож
+        # піксель (i, j) зараз має рівень hist[(head - 1 - i) mod (n+1)] - пишемо лише змінені.
+        # Вертає кількість записаних пікселів.
+        buf = ptr8(self.buf)
+        off = ptr16(self.off)
+        cmap = ptr8(self.cmap)
+        hist = ptr8(self._hist)
+        n = int(self.n)
+        m = int(self.m)
+        bpp = int(self.bpp)
+        head = int(self._head)
+
+        changed = 0
+        for i in range(n):
+            h = head - i
+            if h < 0:
+                h += n + 1
+            src = h * m
+            prv = h - 1
+            if prv < 0:
+                prv += n + 1
+            prv *= m
+            for j in range(m):
+                v = int(hist[src + j])
+                if scroll and v == int(hist[prv + j]):
+                    continue
+                changed += 1
+                o = int(off[j * n + i])
+                p = bpp * v
+                for k in range(bpp):
+                    buf[o + k] = cmap[p + k]
+        return changed
+
+    def fill_spectrum_delta(self, spec_buf, max_buf):
+        '''
+        Delta-рендер у buf (без np.write()).
+        spec_buf, max_buf: bytearray length m, значення 0..n (max_buf=self._zero - без піків)
+        Вертає кількість змінених стовпців (0 - buf не змінився).
+        '''
+        if not self._delta_valid:
+            # buf у невідомому стані - повний рендер і синхронізація стану
+            self._apply_spec_viper2(spec_buf, max_buf)
+            self._prev_spec[:] = spec_buf
+            self._prev_max[:] = max_buf
+            self._delta_valid = True
+            return self.m
+        return self._apply_spec_delta(spec_buf, max_buf)
 
     def apply_spectrum(self, spectrum, max_spectr):
         '''
@@ -190,20 +1104,98 @@ class NeoMatrixFast:
             elif mv > n: mv = n
             self.maxb[j] = mv
 
+        self._limit(self.spec, self.maxb)
         self._apply_spec_viper2(self.spec, self.maxb)
+        self._delta_valid = False
+        self.unchanged = False
         self.np.write()
     
+    def _render_engine(self, spec_buf, max_buf):
+        # не-bars рушії; вертає кількість записаних пікселів (0 - buf не змінився)
+        e = self.engine
+        if e == self.ENG_WATERFALL:
+            # спектрограма: якщо buf показує попередній кадр - лише пікселі, де рівень змінився
+            changed = self._render_waterfall(1 if self._delta_valid else 0)
+            self._delta_valid = True
+            return changed
+        if e == self.ENG_MIRROR:
+            self._render_mirror(spec_buf, max_buf)
+        elif e == self.ENG_SPLIT:
+            self._render_split(spec_buf, max_buf)
+        else:
+            self._render_vu(spec_buf, max_buf)
+        self._delta_valid = False
+        return self.n * self.m
+
+    def _fit(self, spec_buf, max_buf):
+        # не-bars рушії: фактична сума байтів намальованого кадра; понад бюджет - менший масштаб
+        # (з кроком 1/32) і повторний рендер, тож другий прохід - лише в кадрах понад бюджет
+        steps = self._buf_steps()
+        changed = 0
+        while steps > self.budget:
+            scale = (self.budget * self.scale // steps) & ~7
+            if scale >= self.scale:
+                scale = self.scale - 8
+            self._set_scale(scale)
+            changed += self._render_engine(spec_buf, max_buf)
+            steps = self._buf_steps()
+        return changed
+
+    def fill_spectrum_buf(self, spec_buf, max_buf, show_peaks=True, spec_q8=None):
+        '''
+        Рендер у buf без np.write() (для окремого виміру fill / write).
+        spec_buf, max_buf: bytearray length m, значення 0..n
+        spec_q8: array('i') рівнів 8.8 (напр. Envelope.lvl_q8) - для sub-pixel стовпців
+        Вертає True, якщо buf змінився (при delta=False - завжди True).
+        '''
+        if self.subpixel and spec_q8 is not None and self.engine == self.ENG_BARS:
+            if not show_peaks:
+                max_buf = self._zero
+            self._ceil_levels(spec_q8, self.spec)
+            self._limit(self.spec, max_buf)
+            self._render_subpixel(spec_q8, max_buf)
+            self._delta_valid = False
+            self.unchanged = False
+            return True
+        e = self.engine
+        if e != self.ENG_BARS:
+            if not show_peaks:
+                max_buf = self._zero
+            if self.budget and self.scale != 256:
+                # оцінка струму - з кадра повної яскравості
+                self._set_scale(256)
+            if e == self.ENG_WATERFALL:
+                self._head = self._push_history(spec_buf)
+            changed = self._render_engine(spec_buf, max_buf)
+            if self.budget:
+                changed += self._fit(spec_buf, max_buf)
+            self.unchanged = not changed
+            return changed > 0
+        if not show_peaks:
+            self._limit(spec_buf, self._zero)
+        else:
+            self._limit(spec_buf, max_buf)
+        if self.delta:
+            if not show_peaks:
+                max_buf = self._zero
+            self.unchanged = not self.fill_spectrum_delta(spec_buf, max_buf)
+        else:
+            if show_peaks: # відображати з піками чи без (viper2 або viper)
+                self._apply_spec_viper2(spec_buf, max_buf)
+            else:
+                self._apply_spec_viper(spec_buf)
+            self._delta_valid = False
+            self.unchanged = False
+        return not self.unchanged
+
     def apply_spectrum_buf(self, spec_buf, max_buf, show_peaks=True):
         '''
         Варіант, коли spec_buf та max_buf вже як bytearray(m) з клемпом 0..n.
         spec_buf, max_buf: bytearray length m, значення 0..n
+        При delta=True np.write() пропускається, якщо кадр не змінився (self.unchanged).
         '''
-        if show_peaks: # відображати з піками чи без (viper2 або viper)
-            self._apply_spec_viper2(spec_buf, max_buf)
-        else:
-            self._apply_spec_viper(spec_buf)
-            
-        self.np.write()
+        if self.fill_spectrum_buf(spec_buf, max_buf, show_peaks):
+            self.np.write()
         
     def apply_spectrum_timed(self, spectrum):
         t0 = time.ticks_us()
@@ -218,7 +1210,9 @@ class NeoMatrixFast:
                 v = n
             self.spec[j] = v
 
+        self._limit(self.spec, self._zero)
         self._apply_spec_viper(self.spec)
+        self._delta_valid = False
         t1 = time.ticks_us()
         # write
         self.np.write()
@@ -229,6 +1223,30 @@ class NeoMatrixFast:
         total_us = time.ticks_diff(t2, t0)
         return total_us, fill_us, write_us
 
+    def apply_spectrum_delta_timed(self, spec_buf, max_buf):
+        '''
+        Вимір delta-рендеру на тому ж кадрі, що й повний рендер.
+        spec_buf, max_buf: bytearray length m, значення 0..n
+        Вертає (total_us, fill_us, write_us, saved_us), де saved_us - скільки fill
+        зекономлено відносно повного _apply_spec_viper2() (write_us = 0, якщо кадр не змінився).
+        '''
+        t0 = time.ticks_us()
+        changed = self.fill_spectrum_delta(spec_buf, max_buf)
+        t1 = time.ticks_us()
+        if changed:
+            self.np.write()
+        t2 = time.ticks_us()
+
+        # повний рендер того ж кадра дає ідентичний buf - стан delta не порушується
+        self._apply_spec_viper2(spec_buf, max_buf)
+        t3 = time.ticks_us()
+
+        fill_us = time.ticks_diff(t1, t0)
+        write_us = time.ticks_diff(t2, t1)
+        total_us = time.ticks_diff(t2, t0)
+        saved_us = time.ticks_diff(t3, t2) - fill_us
+        return total_us, fill_us, write_us, saved_us
+
 
 class NeoMatrix:
     def __init__(self, row, col, neo_pin):
@@ -12,38 +12,293 @@ import micropython
 import _thread
 import math
 import adc_dma, fastfft
-from neo_matrix import NeoMatrixFast
-import os
+import adc_ring
+import band_plan
+import noise_cal
+from neo_matrix import NeoMatrixFast, PioDmaOutput
+from telemetry import Telemetry
+from envelope import Envelope
+from onset import OnsetDetector
+from frame_link import FrameLink
 
 
 # ======================================
 # Конфігурація ADC
 # ======================================
-SAMPLE_FREQ = 40_000  # Hz
 ADC0 = 0              # (GPIO26)
 
 # ===============================================================
 # Конфігурація FFT, DSP
 # ===============================================================
 
-# для модуля MAX9814 (Gain=40dB), ≈ 39 Гц … 15.55 кГц
+# для модуля MAX9814 (Gain=40dB), ≈ 39 Гц … 15.55 кГц (FFT_SIZE=1024, Fs=40 кГц)
 IND_BANDS = (2, 1, 1, 1, 1, 1, 1, 5, 6, 11, 15, 24, 35, 53, 80, 160)
+K_START = 1  # перший бін першої смуги
 
-NUM_BAND = 16 # кількість смуг
-FFT_SIZE = 1024
+# Профілі захвату: назва -> (SAMPLE_FREQ, FFT_SIZE, IND_BANDS або None - план смуг PROFILE_PLAN).
+# Буфери захвату, слотів і таблиці смуг усіх профілів виділяються один раз при старті
+# (під найбільший профіль), тому перемикання в роботі (кнопка PROFILE_PIN) не алокує.
+PROFILES = {
+    'low-latency': (20_000, 256, None),
+    'balanced':    (32_000, 512, None),
+    'hi-res':      (40_000, 1024, IND_BANDS),
+}
+PROFILE = 'hi-res'        # профіль при старті
+PROFILE_PIN = 19          # кнопка на GND: наступний профіль
+PROFILE_PLAN = dict(scale='octave', fmin=40, fmax=15500)   # band_plan для профілів без IND_BANDS
+
+# План смуг (band_plan.py) для всіх профілів: None - IND_BANDS профілю (або PROFILE_PLAN);
+# інакше параметри band_plan.load_plan(), наприклад:
+#   dict(scale='octave', fmin=40, fmax=15500, bands=16)
+#   dict(scale='third', fmin=50, bands=24)
+#   dict(scale='mel', fmin=40, fmax=12000, bands=8)
+# Межі смуг рахуються для Fs/N профілю і кешуються у band_plan_<профіль>.bin
+# (імпорт лише читає кеш, запис - save_band_plans() при старті)
+BAND_PLAN = None
+
+NUM_BAND = BAND_PLAN.get('bands', 16) if BAND_PLAN else len(IND_BANDS) # кількість смуг
+
+# Багатошвидкісний аналіз низів: блок захвату фільтрується CIC3 і проріджується у BASS_DECIM
+# разів у кільце з BASS_FFT семплів, окремий rfft() якого дає в BASS_FFT * BASS_DECIM / FFT_SIZE
+# разів вужчі біни. Смуги з верхньою межею до BASS_FMAX беруть енергію з нього (лише ZERO_COPY = False
+# і CAPTURE_MODE = 'stream': кільце низів - з безперервних семплів).
+BASS_DECIM = 0      # 0 - вимкнено; 2, 4, 8, 16
+BASS_FFT = 256      # розмір FFT проріджених семплів (вікно BASS_FFT * BASS_DECIM / Fs)
+BASS_FMAX = 400     # Гц
+
+
+def make_band_edges(ind_bands, k_start=1):
+    # ширини смуг -> плоска таблиця пар меж [lo, hi[ у бінах: edges[2*b], edges[2*b + 1]
+    edges = array.array('H', [0] * (2 * len(ind_bands)))
+    k = k_start
+    for b, w in enumerate(ind_bands):
+        edges[2 * b] = k
+        k += w
+        edges[2 * b + 1] = k
+    return edges
+
+
+class Profile:
+    '''
+    Профіль захвату: план смуг і передвиділені таблиці, які _use_profile() робить поточними.
+    Поля, що заповнюються далі при старті: thresholds, cal_key (калібрування шумового порогу),
+    fft_view (вікно rfft() режиму 'stream'), dft_bins, dft_wts, use_dft (банк DFT, select_analysis()).
+    '''
+    def __init__(self, fs, n, ind, k0):
+        self.fs = fs                # SAMPLE_FREQ
+        self.n = n                  # FFT_SIZE
+        self.ind = ind              # IND_BANDS
+        self.k0 = k0                # K_START
+        self.edges = make_band_edges(ind, k0)   # BAND_EDGES
+        self.spec_len = self.edges[-1]          # SPEC_LEN (до перенесення низів у bass-спектр)
+        self.thresholds = None      # NOISE_THRESHOLD
+        self.cal_key = None         # CAL_KEY
+        self.fft_view = None
+        self.dft_bins = None        # DFT_BINS
+        self.dft_wts = None         # DFT_WTS
+        self.use_dft = False        # USE_DFT
+
+
+# профілі за назвою
+_profiles = {}
+_plan_files = []   # (межі band_plan, Fs, N, файл кешу) - для save_band_plans()
+_plan = dict(PROFILE_PLAN)
+_plan['bands'] = NUM_BAND
+_plan.update(BAND_PLAN or {})
+for _name, (_fs, _n, _ind) in PROFILES.items():
+    if BAND_PLAN or _ind is None:
+        _path = 'band_plan_%s.bin' % _name
+        _edges = band_plan.load_plan(_fs, _n, path=_path, save=False, **_plan)
+        _plan_files.append((_edges, _fs, _n, _path))
+        _ind = band_plan.widths(_edges)
+        _k0 = _edges[0]
+    else:
+        _k0 = K_START
+    if len(_ind) != NUM_BAND:
+        raise ValueError("profile %s: band count differs" % _name)
+    _profiles[_name] = Profile(_fs, _n, _ind, _k0)
+FFT_MAX = max(p.n for p in _profiles.values())
+SPEC_MAX = max(p.spec_len for p in _profiles.values())
+
+
+def save_band_plans():
+    # кеш меж смуг профілів (band_plan_<профіль>.bin); пише лише відсутні або застарілі файли
+    for edges, fs, n, path in _plan_files:
+        band_plan.save_plan(edges, fs, n, path=path, **_plan)
+
+
+# низькі смуги -> біни bass-спектра, який Core0 дописує у слот після SPEC_MAX бінів основного:
+# межа k основного FFT = k * BASS_FFT * BASS_DECIM / FFT_SIZE біна bass-FFT
+BASS_LEN = 0  # скільки бінів bass-спектра читають смуги (найбільше серед профілів)
+if BASS_DECIM:
+    for _p in _profiles.values():
+        _fs, _n, _be = _p.fs, _p.n, _p.edges
+        # запас до Найквіста проріджених семплів (CIC3 лише послаблює аліаси)
+        _fmax = min(BASS_FMAX, 0.4 * _fs / BASS_DECIM)
+        for _b in range(NUM_BAND):
+            if _be[2 * _b + 1] * _fs / _n > _fmax:
+                break
+            for _j in (2 * _b, 2 * _b + 1):
+                _k = _be[_j] * BASS_FFT * BASS_DECIM // _n
+                _be[_j] = SPEC_MAX + _k
+                BASS_LEN = max(BASS_LEN, _k)
+
+# поточний профіль (встановлює _use_profile())
+_p = _profiles[PROFILE]
+SAMPLE_FREQ, FFT_SIZE, IND_BANDS, K_START = _p.fs, _p.n, _p.ind, _p.k0
+BAND_EDGES, SPEC_LEN = _p.edges, _p.spec_len
 # Опорна потужність повномасштабного синуса, берем за 0 dB (Standard AES17 Reference)
 FS_RMS2 = 32767**2 / 2
 
+# Режим захвату ADC:
+#  'burst'  - кожен кадр окремий one-shot захват FFT_SIZE семплів (T_cap = FFT_SIZE/Fs)
+#  'stream' - ковзне вікно: ADC безперервно пише в кільце по DMA (adc_ring.AdcRing), кожен новий семпл
+#             один раз проходить вхідний каскад (_front_end()) у кільце ring_buf; кадр бере кратне HOP
+#             число нових семплів (щонайменше HOP), FFT - по останніх FFT_SIZE (перекриття до 1 - HOP/FFT_SIZE)
+CAPTURE_MODE = 'burst'
+HOP_DIV = 4          # найменший крок вікна HOP = FFT_SIZE // HOP_DIV (2 -> 50%, 4 -> 75% перекриття)
+HOP = FFT_SIZE // HOP_DIV
+
+# Вхідний каскад: FRONT_END = True - сирі 12-бітні семпли (кільце adc_ring.AdcRing) за один прохід viper
+# (_front_end()): IIR постійної складової, трекери піку і RMS, програмне підсилення з обмеженням.
+# Замінює buffer_i16('auto', 10_000), який для кожного кадра заново рахує зміщення і пік по всьому блоку.
+# Стосується режиму 'burst': у 'stream' семпли завжди йдуть через вхідний каскад (зміщення і підсилення
+# безперервні між кадрами, без стрибків на межах HOP усередині вікна).
+FRONT_END = False
+FRONT_TARGET = 10_000   # цільовий пік після підсилення (як target peak у buffer_i16('auto', 10_000))
+FRONT_GAIN_MAX = 32     # максимальне програмне підсилення, разів
+FRONT_DC_SHIFT = 10     # IIR зміщення: a = 2^-10 на семпл (зріз ≈ Fs / (2π · 1024), 6 Гц при 40 кГц)
+FRONT_PEAK_SHIFT = 12   # спад трекера піку: 2^-12 на семпл (≈ 0.1 с при 40 кГц)
+FRONT_RMS_SHIFT = 10    # усереднення квадрата семпла: 2^-10 на семпл
+
+# ZERO_COPY = True: Core0 не копіює біни у слот, а публікує memoryview fastfft напряму;
+# Core1 за один прохід бере з нього енергії смуг (band_e) і одразу звільняє його - ще до
+# AGC, рендеру й np.write(). Core0 чекає звільнення лише перед наступним rfft().
+ZERO_COPY = False
+
+# Аналіз спектра у Core0:
+#  'fft'  - fastfft.rfft() усіх FFT_SIZE/2 бінів
+#  'dft'  - банк одно-бінових DFT (viper, Q15) лише для бінів, які читають смуги профілю
+#  'auto' - для кожного профілю при старті (__main__) вимірюється час обох, береться швидший;
+#           до виклику select_analysis() - як 'fft' (імпорт модуля нічого не вимірює)
+ANALYSIS = 'fft'
+DFT_BAND_BINS = 0   # 'dft': 0 - усі біни смуги; n - не більше n рівномірно розставлених бінів на смугу
+                    # (енергія кожного множиться на кількість бінів, які він заміщує)
+
+# INT_PIPELINE = True: цілочисельний конвеєр без float - Core0: вікно Ханна Q15, FFT int32 з блоковою
+# плаваючою комою, енергії смуг int64 (hi/lo) і dBFS у Q8 через log2; Core1 отримує лише dB смуг
+# і мапить їх fixed-point шляхом (ANALYSIS не використовується; несумісно з BASS_DECIM)
+INT_PIPELINE = False
+
 # ======================================
 # Буфери та синхронізація
 # ======================================
-M = 16
+M = NUM_BAND  # кількість стовпців індикатора = кількість смуг
+
+# скільки бінів спектра реально читає Core1 (0 .. k_max включно): SPEC_LEN профілю,
+# слоти - під найбільший профіль (SPEC_MAX)
+NUM_SLOTS = 1 if ZERO_COPY else 2  # кількість слотів кільця спектрів (>= 2; ZERO_COPY - 1)
 
 lock = _thread.allocate_lock()
 
-# 1-слотовий обмін спектром (memoryview від fastfft)
-spectr_front = None        # посилання на memoryview
-spectr_busy  = False       # True: Core1 ще НЕ завершив роботу зі spectr_front
+# Кільце слотів для обміну спектром між ядрами.
+# fastfft.rfft() повертає memoryview на свій єдиний внутрішній буфер, тому Core0
+# копіює потрібні біни у вільний слот і одразу може запускати наступний rfft(),
+# поки Core1 ще обробляє попередній кадр.
+# (ZERO_COPY: єдиний "слот" - посилання на memoryview, який повернув rfft())
+if ZERO_COPY:
+    if BASS_DECIM:
+        raise ValueError("BASS_DECIM needs ZERO_COPY = False")
+    spec_slots = [None]
+else:
+    spec_slots = [array.array('f', [0.0] * (SPEC_MAX + BASS_LEN)) for _ in range(NUM_SLOTS)]
+# bass-спектр слота: біни SPEC_MAX.. (memoryview без алокацій у циклі)
+bass_slots = [memoryview(sl)[SPEC_MAX:] for sl in spec_slots] if BASS_LEN else None
+# власник слота: 0 - вільний (пише Core0), 1 - заповнений (читає Core1)
+slot_full = bytearray(NUM_SLOTS)
+
+# режим 'stream': кільце DMA сирих семплів (AdcRing на ADC_RING семплів), кільце ring_buf семплів після
+# вхідного каскаду з тими самими індексами (семпл t - у [t & (ADC_RING - 1)]) і лінеаризоване вікно для rfft()
+# (fft_in під найбільший профіль; fft_view - перші FFT_SIZE семплів, memoryview для кожного профілю
+# створюється один раз при старті)
+ADC_RING = 2 * FFT_MAX
+ring_buf = array.array('h', [0] * ADC_RING) if CAPTURE_MODE == 'stream' else None
+fft_in = array.array('h', [0] * FFT_MAX)
+for _p in _profiles.values():
+    _p.fft_view = memoryview(fft_in)[:_p.n]
+fft_view = fft_in
+adc = None            # AdcRing (створює core0_main_loop(): канал DMA - лише при запуску)
+profile_req = False   # запит наступного профілю (з IRQ піна, виконує Core0 між кадрами)
+_profile_t = 0
+# скільки кадрів 'stream' узяли понад FFT_SIZE нових семплів: Core0 не встиг, і частина семплів
+# не потрапила в жодне вікно
+capture_overruns = 0
+
+# стан вхідного каскаду: [зміщення (x16, Q8), пік (Q8), середній квадрат (y/2)^2, підсилення (Q8), кліпінгів усього,
+# позиція в кільці] (x16 = сирий семпл << 4; старт - середина шкали ADC)
+front_st = array.array('i', [(2048 << 4) << 8, 0, 0, 256, 0, 0])
+
+# bass: проріджені семпли кадра, їх кільце і лінеаризоване вікно для rfft(); коефіцієнти CIC3
+# як FIR: (1 + z^-1 + ... + z^-(D-1))^3, сума D^3
+if BASS_DECIM:
+    if BASS_DECIM & (BASS_DECIM - 1):
+        raise ValueError("BASS_DECIM must be a power of 2")
+    # вікно низів - BASS_FFT * BASS_DECIM семплів, кілька кадрів: у 'burst' воно склеєне з окремих
+    # блоків з паузами між ними, і розділення сусідніх смуг падає (README)
+    if CAPTURE_MODE != 'stream':
+        raise ValueError("BASS_DECIM needs CAPTURE_MODE = 'stream'")
+    bass_dec = array.array('h', [0] * (FFT_MAX // BASS_DECIM))
+    bass_ring = array.array('h', [0] * BASS_FFT)
+    bass_in = array.array('h', [0] * BASS_FFT)
+    _h = [1]
+    for _ in range(3):
+        _h = [sum(_h[i - j] for j in range(BASS_DECIM) if 0 <= i - j < len(_h))
+              for i in range(len(_h) + BASS_DECIM - 1)]
+    BASS_FIR = array.array('H', _h)
+    bass_tail = array.array('h', [0] * (len(_h) - 1))
+    for _p in _profiles.values():
+        if (_p.n // HOP_DIV) % BASS_DECIM:
+            raise ValueError("HOP must be a multiple of BASS_DECIM")
+bass_pos = 0
+
+# ======================================
+# Телеметрія етапів кадра (без print() у циклі)
+# ======================================
+# Core0: capture, rfft, wait (очікування вільного слота), copy, bass (BASS_DECIM);
+# Core1: hold (слот зайнятий: енергії смуг), bands (AGC + мапінг), beat (BEAT), peaks, fill, write,
+# link (LINK)
+(TM_CAPTURE, TM_RFFT, TM_WAIT, TM_COPY, TM_BASS,
+ TM_HOLD, TM_BANDS, TM_BEAT, TM_PEAKS, TM_FILL, TM_WRITE, TM_LINK) = range(12)
+tm = Telemetry(('capture', 'rfft', 'wait', 'copy', 'bass', 'hold', 'bands', 'beat', 'peaks', 'fill', 'write',
+                'link'))
+TELEMETRY_PIN = 17  # кнопка на GND: друк зведення (min/avg/p95/max, FPS)
+
+# ======================================
+# Матриця: порядок байтів і яскравість (палітра NeoMatrixFast)
+# ======================================
+LED_ORDER = 'GRB'   # 'GRB' / 'RGB' (WS2812B), 'GRBW' / 'RGBW' (SK6812 RGBW)
+BRIGHTNESS = 32     # 0..255; у роботі - nm.set_brightness() (перебудова LUT)
+LED_GAMMA = 1.0     # гамма LUT яскравості
+POWER_BUDGET_MA = None  # бюджет струму матриці, мА (None - без обмеження), напр. 2000 для БЖ 5V/2.5A
+LED_MA_PER_STEP = 20 / 255  # мА на 1 крок значення каналу (WS2812B: ~20 мА на канал при 255)
+LED_IDLE_MA = 1.0   # струм спокою одного пікселя, мА
+ENGINE = 'bars'     # рушій рендеру при старті: NeoMatrixFast.ENGINES
+SUBPIXEL = False    # bars: верхній піксель стовпця частковою яскравістю за дробом рівня 8.8
+ENGINE_PIN = 18     # кнопка на GND: наступний рушій (bars -> mirror -> split -> vu -> waterfall)
+BUTTON_DEBOUNCE_MS = 250
+
+# Вихід кадрів на хост (frame_link.py -> utils/frame_receiver.py): рівні + піки смуг бінарними
+# пакетами з CRC через UART, delta/RLE відносно попереднього кадра, без блокування Core1
+LINK = False
+LINK_UART = 0       # UART0
+LINK_TX_PIN = 0     # GPIO0 - UART0 TX
+LINK_BAUD = 115_200
+LINK_TXBUF = 256    # буфер передачі UART, байт (один poll() віддає не більше)
+link = None
+
+engine_req = False      # запит перемикання рушія (з IRQ піна, обробляє Core1 між кадрами)
+_engine_t = 0
+
 
 # ===============================================================
 # Динамічний масштаб та шумовий поріг(в "dB над шумовим порогом")
@@ -51,12 +306,18 @@ spectr_busy  = False       # True: Core1 ще НЕ завершив роботу
 
 NOISE_THRESHOLD = (72, 80, 81, 81, 83, 86, 86, 74, 74, 72, 71, 69, 68, 68, 66, 63)
 
-# файл з поточним шумовим порогом (для вимірювання)
-filename = 'NOISE_THRESHOLD.txt'
+# Калібрування шумового порогу (noise_cal.py):
+# CALIBRATE = True - Core1 у тиші збирає статистику рівнів смуг за CAL_FRAMES кадрів,
+# пише noise_cal.bin і переходить у звичайний режим з новими порогами.
+# При старті пороги з noise_cal.bin (якщо він зроблений для того ж плану смуг)
+# замінюють вшитий NOISE_THRESHOLD.
+CALIBRATE = False
+CAL_FRAMES = 1000
 
 _scale_db = 20.0       # стартове значення 
 SCALE_MIN_DB = 6.0     # не даємо масштабу впасти нижче
-SCALE_DECAY_DB = 0.05  # release: на скільки dB/кадр зменшувати масштаб, якщо сигнал слабшає
+SCALE_DECAY_DB_S = 0.8 # release: на скільки dB/с зменшувати масштаб, якщо сигнал слабшає (≈0.05 dB/кадр при 16 FPS)
+AGC_PER_BAND = False   # True: окремий AGC-масштаб для кожної смуги (лише DSP_FIXED)
 HEADROOM_DB = 0.4      # “запас” зверху, щоб 16 не забивалось постійно
 GAMMA = 1.8            # <1 піднімає тихі смуги, >1 “стискає” низ
 # dB підсилення для кожної смуги (довжина = NUM_BAND)
@@ -66,61 +327,781 @@ BAND_GAIN_DB = (
     0, 0, 2, 6,
     4, 4, 6, 10
     )
+# Огинаюча рівнів (envelope.py): сталі часу в мс, застосовуються за виміряним часом кадра
+BAR_ATTACK_MS = 0       # наростання стовпця (0 - миттєво)
+BAR_RELEASE_MS = 0      # спад стовпця (0 - миттєво)
+PEAK_HOLD_MS = 0        # утримання піку
+PEAK_FALL_LPS = 8.0     # спад піку, рівнів/с (≈ 1 рівень за 2 кадри при 16 FPS)
+DT_NOMINAL_US = 60_000  # період кадра для викликів без виміряного dt (бенчмарки)
+# Онсети і темп (onset.py): спектральний потік по dBFS смуг, спалах піків на ударах
+BEAT = False
+BEAT_BPM = (60, 180)    # діапазон оцінки темпу, уд./хв
+BEAT_SENS = 1.5         # поріг онсету: mean + BEAT_SENS * dev потоку (більше - менше онсетів)
+BEAT_FLASH_MS = 150     # спад спалаху піків після онсету (0 - без спалаху)
+
+# таблиці вище підібрані для 16 смуг IND_BANDS; для іншого плану - найближча смуга
+NOISE_THRESHOLD = band_plan.resample(NOISE_THRESHOLD, NUM_BAND)
+BAND_GAIN_DB = band_plan.resample(BAND_GAIN_DB, NUM_BAND)
 
 _tmp_adj = array.array('f', [0.0] * NUM_BAND)  
 
 
-def core1_dsp_led_worker():
-    global spectr_front, spectr_busy
+def cal_path(name):
+    # файл калібрування шумового порогу для профілю name
+    return 'noise_cal_%s.bin' % name
+
+
+# енергії смуг поточного кадра (Core1); межі смуг - BAND_EDGES профілю
+band_e = array.array('f', [0.0] * NUM_BAND)
+# рівні смуг поточного кадра у форматі 8.8 (256 = рівень 1, 4096 = 16; 0 - нижче порогу):
+# дробова частина, яку відкидає out_buf (0..16), для згладжування і sub-pixel рендеру
+band_lvl_q8 = array.array('H', [0] * NUM_BAND)
+
+# пороги кожного профілю: з файла калібрування профілю (noise_cal_<профіль>.bin або
+# noise_cal.bin, якщо ключ плану смуг збігається), інакше вшитий NOISE_THRESHOLD
+for _name, _p in _profiles.items():
+    _key = (_p.fs, _p.n, sum(_p.edges))
+    _p.thresholds = (noise_cal.load(NUM_BAND, _key, cal_path(_name))
+                     or noise_cal.load(NUM_BAND, _key) or NOISE_THRESHOLD)
+    _p.cal_key = _key
+calibrator = noise_cal.NoiseCalibrator(NUM_BAND, CAL_FRAMES) if CALIBRATE else None
+
+# банк DFT: біни, які читають смуги кожного профілю (без bass-смуг), і їх ваги
+# (скільки бінів смуги заміщує кожен при DFT_BAND_BINS); прапорець 'dft' - select_analysis()
+for _p in _profiles.values():
+    _be = _p.edges
+    _bins = []
+    _wts = []
+    for _b in range(NUM_BAND):
+        _lo, _hi = _be[2 * _b], _be[2 * _b + 1]
+        if _lo >= SPEC_MAX:
+            continue
+        _st = 1
+        if DFT_BAND_BINS:
+            _st = -(-(_hi - _lo) // DFT_BAND_BINS)
+        for _k in range(_lo, _hi, _st):
+            _bins.append(_k)
+            _wts.append(min(_st, _hi - _k))
+    _p.dft_bins = array.array('H', _bins)
+    _p.dft_wts = array.array('H', _wts)
+    _p.use_dft = ANALYSIS == 'dft'
+DFT_MAX = max(len(p.dft_bins) for p in _profiles.values())
+# таблиця косинуса Q15 на FFT_MAX точок (для меншого FFT_SIZE - з кроком FFT_MAX / FFT_SIZE),
+# з неї ж вікно Ханна; вікно семплів кадра і накопичувачі re/im банку
+DFT_COS = array.array('h', [min(32767, int(32768 * math.cos(2 * math.pi * i / FFT_MAX) + 0.5))
+                            for i in range(FFT_MAX)])
+dft_xw = array.array('h', [0] * FFT_MAX)
+dft_acc = array.array('i', [0] * (2 * DFT_MAX))
+# ZERO_COPY: спектр банку DFT публікується з власного буфера (біни поза DFT_BINS - нулі)
+dft_spec = array.array('f', [0.0] * SPEC_MAX) if ZERO_COPY else None
+
+# цілочисельний FFT: z[n] = x[2n] + j*x[2n+1] (FFT_SIZE/2 комплексних точок; є завжди -
+# для bench_spectr); INT_PIPELINE: dB смуг кожного слота, Q8
+fx_re = array.array('i', [0] * (FFT_MAX // 2))
+fx_im = array.array('i', [0] * (FFT_MAX // 2))
+if INT_PIPELINE:
+    if BASS_LEN:
+        raise ValueError("INT_PIPELINE needs BASS_DECIM = 0")
+    db_slots = [array.array('i', [0] * NUM_BAND) for _ in range(NUM_SLOTS)]
+
+# ===============================================================
+# Цілочисельний варіант build_band_spectr (LUT замість log10 / pow)
+# ===============================================================
+# True: Core1 використовує build_band_spectr_fx() (gate -> AGC -> EQ -> gamma в int),
+# результат збігається з build_band_spectr() з точністю ±1 рівень
+DSP_FIXED = False
+
+# dB у форматі Q8 (1 dB = 256)
+# log2 мантиси float32 за 7 старшими бітами: LOG2_LUT[m] = log2(1 + (m + 0.5)/128) * 256
+LOG2_LUT = bytearray(128)
+for _m in range(128):
+    LOG2_LUT[_m] = int(math.log2(1.0 + (_m + 0.5) / 128) * 256 + 0.5)
+# 10*log10(2 / FS_RMS2) у Q8: dBFS = 10*log10(2) * log2(e) + DB_OFF_Q8
+DB_OFF_Q8 = int(2560.0 * math.log10(2.0 / FS_RMS2) - 0.5)
+
+# gamma LUT: x = adj_eff / scale у Q8 (0..255) -> рівень 1..16
+GAMMA_LUT = bytearray(256)
+GAMMA_LUT_Q8 = array.array('H', [0] * 256)   # те саме у форматі 8.8 (256 .. 4096)
+band_db_q8 = array.array('i', [0] * NUM_BAND)  # dBFS смуг, Q8
+_fx_adj = array.array('i', [0] * NUM_BAND)     # adj після gate, Q8
+_fx_nt = array.array('i', [0] * NUM_BAND)      # NOISE_THRESHOLD, Q8
+_fx_gain = array.array('i', [0] * NUM_BAND)    # BAND_GAIN_DB, Q8
+# стан AGC: [scale, headroom, decay/с, scale_min, per_band, залишок decay], Q8
+_fx_state = array.array('i', [int(_scale_db * 256), 0, 0, 0, 0, 0])
+_fx_scale = array.array('i', [0] * NUM_BAND)   # AGC-масштаби смуг (AGC_PER_BAND), Q8
+# параметри, з якими зібрані таблиці
+_fx_gamma = None
+_fx_min_db = None
+_fx_nb = 0
+
+
+def fx_tables_update(force=False):
+    '''
+    Перебудова таблиць fixed-point шляху. Виконується лише при зміні
+    GAMMA, SCALE_MIN_DB або кількості смуг (або force=True після зміни
+    NOISE_THRESHOLD / BAND_GAIN_DB / HEADROOM_DB / SCALE_DECAY_DB_S / AGC_PER_BAND).
+    '''
+    global _fx_gamma, _fx_min_db, _fx_nb, band_db_q8, _fx_adj, _fx_nt, _fx_gain, _fx_scale
+    if (not force and GAMMA == _fx_gamma and SCALE_MIN_DB == _fx_min_db
+            and NUM_BAND == _fx_nb):
+        return
 
+    if NUM_BAND != _fx_nb:
+        band_db_q8 = array.array('i', [0] * NUM_BAND)
+        _fx_adj = array.array('i', [0] * NUM_BAND)
+        _fx_nt = array.array('i', [0] * NUM_BAND)
+        _fx_gain = array.array('i', [0] * NUM_BAND)
+        _fx_scale = array.array('i', [_fx_state[0]] * NUM_BAND)
+
+    for i in range(NUM_BAND):
+        _fx_nt[i] = int(NOISE_THRESHOLD[i] * 256)
+        _fx_gain[i] = int(BAND_GAIN_DB[i] * 256)
+
+    for i in range(256):
+        lvl = 1 + int((i / 255) ** GAMMA * 15.0 + 0.5)
+        GAMMA_LUT[i] = 16 if lvl > 16 else lvl
+        GAMMA_LUT_Q8[i] = 256 + int((i / 255) ** GAMMA * 3840.0 + 0.5)
+
+    _fx_state[1] = int(HEADROOM_DB * 256 + 0.5)
+    _fx_state[2] = int(SCALE_DECAY_DB_S * 256 + 0.5)
+    _fx_state[3] = int(SCALE_MIN_DB * 256 + 0.5)
+    _fx_state[4] = 1 if AGC_PER_BAND else 0
+    if _fx_state[0] < _fx_state[3]:
+        _fx_state[0] = _fx_state[3]
+    for i in range(NUM_BAND):
+        if _fx_scale[i] < _fx_state[3]:
+            _fx_scale[i] = _fx_state[3]
+
+    _fx_gamma = GAMMA
+    _fx_min_db = SCALE_MIN_DB
+    _fx_nb = NUM_BAND
+
+
+def _use_profile(name):
+    '''
+    Перемикання профілю без алокацій: лише глобальні посилання на передвиділені таблиці.
+    Викликати, коли Core1 не тримає жодного слота, а захват ADC зупинено.
+    '''
+    global PROFILE, SAMPLE_FREQ, FFT_SIZE, HOP, IND_BANDS, K_START, BAND_EDGES, SPEC_LEN
+    global NOISE_THRESHOLD, CAL_KEY, fft_view, _fx_gamma
+    global DFT_BINS, DFT_WTS, USE_DFT, DFT_NORM, FX_L2_OFF
+    p = _profiles[name]
+    SAMPLE_FREQ, FFT_SIZE, IND_BANDS, K_START = p.fs, p.n, p.ind, p.k0
+    BAND_EDGES, SPEC_LEN, NOISE_THRESHOLD, CAL_KEY = p.edges, p.spec_len, p.thresholds, p.cal_key
+    fft_view = p.fft_view
+    DFT_BINS, DFT_WTS, USE_DFT = p.dft_bins, p.dft_wts, p.use_dft
+    HOP = FFT_SIZE // HOP_DIV
+    # |X|^2 / (N * sum(w^2)), sum(w^2) = 3N/8 для вікна Ханна - як нормалізація fastfft
+    DFT_NORM = 8.0 / (3 * FFT_SIZE * FFT_SIZE)
+    # те саме для INT_PIPELINE у log2, Q8: енергія = sum(|X|^2) * 8 / (3 N^2)
+    FX_L2_OFF = int(256 * math.log2(8 / 3) + 0.5) - 512 * int(math.log2(FFT_SIZE) + 0.5)
+    PROFILE = name
+    _fx_gamma = None  # Core1 перебудує Q8-таблиці порогів на наступному кадрі
+
+
+_use_profile(PROFILE)
+_PROFILE_NAMES = tuple(PROFILES)
+
+
+def _on_profile_pin(pin):
+    # IRQ: лише прапорець (перемикання - у Core0 між кадрами)
+    global profile_req, _profile_t
+    t = time.ticks_ms()
+    if time.ticks_diff(t, _profile_t) >= BUTTON_DEBOUNCE_MS:
+        _profile_t = t
+        profile_req = True
+
+
+def _on_engine_pin(pin):
+    # IRQ: лише прапорець (перемикання - у Core1, щоб не змінювати стан рендеру посеред кадра)
+    global engine_req, _engine_t
+    t = time.ticks_ms()
+    if time.ticks_diff(t, _engine_t) >= BUTTON_DEBOUNCE_MS:
+        _engine_t = t
+        engine_req = True
+
+
+def core1_dsp_led_worker(frames=0):
+    # frames: 0 - без кінця; n - вийти після n кадрів (хост-прогін обох ядер, host/sim_cores.py)
+    global engine_req
     # локальні буфери Core1
     spec_work = bytearray(M)
-    max_work  = bytearray(M)
 
-    # peak-hold стан (лише Core1)
-    delay_max_level = 2
-    num_frame = 0
-    max_state = bytearray(M)
+    # згладжування стовпців і peak-hold (стан лише Core1)
+    env = Envelope(M, BAR_ATTACK_MS, BAR_RELEASE_MS, PEAK_HOLD_MS, PEAK_FALL_LPS)
+    # онсети і темп (стан лише Core1): onset.tempo() - темп ×10 уд./хв
+    onset = OnsetDetector(NUM_BAND, BEAT_BPM[0], BEAT_BPM[1], BEAT_SENS,
+                          flash_ms=BEAT_FLASH_MS, noise_db=NOISE_THRESHOLD) if BEAT else None
+    onset_nt = NOISE_THRESHOLD
+    t_prev = time.ticks_us()
+
+    rd = 0  # наступний слот для читання (той самий порядок, що й у Core0)
 
     while True:
-        # --- забрати спектр (memoryview) ---
+        # --- забрати спектр зі слота rd ---
         lock.acquire()
-        if spectr_busy:
-            spectr = spectr_front  # локальне посилання на memoryview
+        if slot_full[rd]:
             lock.release()
+            spectr = spec_slots[rd]
+
+            # --- енергії смуг: єдине місце, де Core1 читає спектр ---
+            t0 = time.ticks_us()
+            dt = time.ticks_diff(t0, t_prev)  # реальний період кадра
+            t_prev = t0
+            if INT_PIPELINE:
+                take_band_db(db_slots[rd])
+            else:
+                band_energies(spectr, BAND_EDGES, band_e, NUM_BAND)
 
-            # --- DSP: смуги + AGC ---
-            build_band_spectr(spectr, spec_work)
-            # або тест:
-            # build_band_spectr_test(spectr, spec_work)
+            # --- раннє звільнення: далі Core1 працює лише з band_e / band_db_q8 ---
+            lock.acquire()
+            slot_full[rd] = 0
+            lock.release()
+            rd = (rd + 1) % NUM_SLOTS
+            t01 = time.ticks_us()
+            tm.record(TM_HOLD, time.ticks_diff(t01, t0))
 
-            # --- peak-hold (як було на Core0) ---
-            num_frame = (num_frame + 1) % delay_max_level
-            if num_frame == 0:
-                for j in range(M):
-                    if max_state[j] > 0:
-                        max_state[j] -= 1
+            # --- DSP: AGC + мапінг у рівні ---
+            if CALIBRATE:
+                calibrate_bands(spec_work)
+            elif INT_PIPELINE:
+                map_band_db_fx(spec_work, dt)
+            elif DSP_FIXED:
+                map_band_spectr_fx(spec_work, dt)
+            else:
+                map_band_spectr(spec_work, dt)
+            t1 = time.ticks_us()
+            tm.record(TM_BANDS, time.ticks_diff(t1, t01))
 
-            for j in range(M):
-                v = spec_work[j]
-                if v > max_state[j]:
-                    max_state[j] = v
+            # --- онсети: спектральний потік по band_db_q8, спалах піків ---
+            beat = 0
+            if BEAT:
+                if onset_nt is not NOISE_THRESHOLD:  # інший профіль або нове калібрування
+                    onset_nt = NOISE_THRESHOLD
+                    onset.set_floor(onset_nt)
+                if not (CALIBRATE or INT_PIPELINE or DSP_FIXED):
+                    _bands_db_q8(band_e, band_db_q8, NUM_BAND)  # float-шлях dB Q8 не рахує
+                beat = onset.update(band_db_q8, dt)
+                if BEAT_FLASH_MS:
+                    nm.flash_peaks(onset.flash())
+                t11 = time.ticks_us()
+                tm.record(TM_BEAT, time.ticks_diff(t11, t1))
+                t1 = t11
 
-            max_work[:] = max_state
+            # --- огинаюча: attack/release стовпців + peak-hold ---
+            env.update(band_lvl_q8, dt)
+            t2 = time.ticks_us()
+            tm.record(TM_PEAKS, time.ticks_diff(t2, t1))
 
             # --- render + np.write() ---
-            nm.apply_spectrum_buf(spec_work, max_work, button_peaks_en.value())
+            if engine_req:
+                engine_req = False
+                nm.next_engine()
+            changed = nm.fill_spectrum_buf(env.lvl, env.peak, button_peaks_en.value(), env.lvl_q8)
+            t3 = time.ticks_us()
+            if changed:
+                nm.np.write()
+            t4 = time.ticks_us()
+            tm.record(TM_FILL, time.ticks_diff(t3, t2))
+            tm.record(TM_WRITE, time.ticks_diff(t4, t3))
 
-            # --- дозволяємо Core0 робити наступний rfft ---
-            lock.acquire()
-            spectr_busy = False
-            lock.release()
+            # --- кадр на хост: кодування в кільце + шматок у UART, якщо він вільний ---
+            if LINK:
+                link.send(env.lvl, env.peak, beat)
+                link.poll()
+                t5 = time.ticks_us()
+                tm.record(TM_LINK, time.ticks_diff(t5, t4))
+                t4 = t5
+            tm.frame(t4)
+            frames -= 1
+            if frames == 0:
+                return
 
         else:
             lock.release()
             time.sleep_us(50)
 
 
+@micropython.viper
+def _copy32(dst, src, n: int):
+    # копія n 32-бітних слів (float32) src -> dst без алокацій
+    d = ptr32(dst)
+    s = ptr32(src)
+    for k in range(n):
+        d[k] = s[k]
+
+
+@micropython.viper
+def _ring_push(ring, src, pos: int, hop: int) -> int:
+    # дописує hop семплів src у кільце ring з позиції pos,
+    # вертає нову позицію запису (= позиція найстарішого семпла)
+    r = ptr16(ring)
+    s = ptr16(src)
+    n = int(len(ring))
+    for k in range(hop):
+        r[pos] = s[k]
+        pos += 1
+        if pos >= n:
+            pos = 0
+    return pos
+
+
+@micropython.viper
+def _ring_unroll(dst, ring, pos: int, n: int):
+    # dst[0..n-1] = n семплів кільця, починаючи з найстарішого (pos), із загортанням на len(ring)
+    d = ptr16(dst)
+    r = ptr16(ring)
+    m = int(len(ring))
+    for k in range(n):
+        d[k] = r[pos]
+        pos += 1
+        if pos >= m:
+            pos = 0
+
+
+@micropython.viper
+def _decimate(dst, src, start: int, n: int) -> int:
+    # CIC3 + проріджування у BASS_DECIM разів: dst[j] = (BASS_FIR * src)[start + (j+1)*D - 1] / D^3
+    # (FIR-форма без інтеграторів: нічого не переповнюється); семпли до src[0] - з bass_tail,
+    # хвоста попереднього виклику
+    d = ptr16(dst)
+    s = ptr16(src)
+    h = ptr16(BASS_FIR)
+    tl = ptr16(bass_tail)
+    taps = int(len(BASS_FIR))
+    nt = taps - 1
+    dec = int(BASS_DECIM)
+    sh = 0
+    k = dec
+    while k > 1:
+        k >>= 1
+        sh += 3
+    for j in range(n):
+        e = start + (j + 1) * dec - 1  # останній семпл виходу j
+        acc = 0
+        t = 0
+        while t < taps:
+            i = e - t
+            if i >= 0:
+                v = s[i]
+            else:
+                v = tl[nt + i]
+            acc += h[t] * ((v ^ 0x8000) - 0x8000)
+            t += 1
+        d[j] = acc >> sh
+    # хвіст для наступного кадра: останні taps - 1 семплів
+    e = start + n * dec
+    for i in range(nt):
+        tl[i] = s[e - nt + i]
+    return n
+
+
+@micropython.viper
+def _front_end(dst, src, st, n: int) -> int:
+    # n сирих семплів src (u16, 12 біт) з позиції st[5] -> dst (int16) за тими самими індексами
+    # (кільце: загортання на len(src)) за один прохід, стан st - front_st: IIR зміщення, трекер піку
+    # (|y| зі спадом), середній квадрат, y * підсилення з обмеженням. Вертає кількість кліпнутих семплів
+    d = ptr16(dst)
+    s = ptr16(src)
+    f = ptr32(st)
+    m = int(len(src))
+    i = f[5]
+    dcs = int(FRONT_DC_SHIFT)
+    pks = int(FRONT_PEAK_SHIFT)
+    rs = int(FRONT_RMS_SHIFT)
+    dc = f[0]
+    pk = f[1]
+    ms = f[2]
+    g = f[3]
+    clips = 0
+    for k in range(n):
+        x = s[i] << 4
+        dc += ((x << 8) - dc) >> dcs
+        y = x - (dc >> 8)
+        a = y << 8
+        if a < 0:
+            a = 0 - a
+        pk -= pk >> pks  # Q8: спад не зупиняється на малих значеннях
+        if a > pk:
+            pk = a
+        # |y| < 2^16 (зміщення ще не встигло за стрибком), тож квадрат - від y / 2: < 2^30 без переповнення
+        h = y >> 1
+        ms += (h * h - ms) >> rs
+        v = (y * g) >> 8
+        if v > 32767:
+            v = 32767
+            clips += 1
+        elif v < -32768:
+            v = -32768
+            clips += 1
+        d[i] = v
+        i += 1
+        if i >= m:
+            i = 0
+    f[0] = dc
+    f[1] = pk
+    f[2] = ms
+    f[4] = f[4] + clips
+    f[5] = i
+    return clips
+
+
+def front_capture(dst, src, pos, n):
+    # n сирих семплів src з позиції pos -> dst ('burst': вікно, 'stream': кільце ring_buf); підсилення
+    # наступного кадра - за піком: швидко вниз (без кліпінгу), повільно вгору (≈ 1/16 різниці за кадр)
+    front_st[5] = pos
+    _front_end(dst, src, front_st, n)
+    pk = front_st[1] >> 8
+    if pk < 16:
+        pk = 16
+    want = FRONT_TARGET * 256 // pk
+    if want > FRONT_GAIN_MAX * 256:
+        want = FRONT_GAIN_MAX * 256
+    g = front_st[3]
+    if want < g:
+        g = want
+    else:
+        g += (want - g) >> 4
+    front_st[3] = g
+    return dst
+
+
+def front_stats():
+    # (зміщення в кодах ADC, пік і RMS до підсилення - у шкалі int16, підсилення, кліпінгів усього)
+    return (front_st[0] / 4096, front_st[1] / 256, 2 * math.sqrt(front_st[2]), front_st[3] / 256, front_st[4])
+
+
+def bass_capture(buf, start):
+    # нові семпли кадра buf[start:FFT_SIZE] -> CIC3 + проріджування -> кільце bass_ring
+    global bass_pos
+    n = _decimate(bass_dec, buf, start, (FFT_SIZE - start) // BASS_DECIM)
+    bass_pos = _ring_push(bass_ring, bass_dec, bass_pos, n)
+
+
+def bass_spectrum(dst):
+    # rfft() останніх BASS_FFT проріджених семплів -> перші BASS_LEN бінів у dst
+    # (перезаписує внутрішній буфер fastfft: лише після копії основного спектра)
+    _ring_unroll(bass_in, bass_ring, bass_pos, BASS_FFT)
+    _copy32(dst, fastfft.rfft(bass_in, True), BASS_LEN)
+
+
+@micropython.viper
+def _dft_window(dst, src, n: int):
+    # dst[i] = src[i] * вікно Ханна (Q15, з таблиці DFT_COS)
+    d = ptr16(dst)
+    s = ptr16(src)
+    c = ptr16(DFT_COS)
+    stride = int(len(DFT_COS)) // n
+    idx = 0
+    for i in range(n):
+        w = (32767 - ((c[idx] ^ 0x8000) - 0x8000)) >> 1
+        d[i] = (((s[i] ^ 0x8000) - 0x8000) * w + 0x4000) >> 15
+        idx += stride
+
+
+@micropython.viper
+def _dft_bins(acc, xw, bins, n: int):
+    # acc[2j], acc[2j+1] = Re, Im DFT n віконних семплів xw на біні bins[j]
+    # (добутки Q15 округлюються і зсуваються по одному: |acc| <= n * 32767, без переповнення int32)
+    a = ptr32(acc)
+    x = ptr16(xw)
+    bk = ptr16(bins)
+    c = ptr16(DFT_COS)
+    size = int(len(DFT_COS))
+    mask = size - 1
+    quarter = size >> 2
+    stride = size // n
+    for j in range(int(len(bins))):
+        step = bk[j] * stride
+        idx = 0
+        re = 0
+        im = 0
+        for i in range(n):
+            v = (x[i] ^ 0x8000) - 0x8000
+            re += (v * ((c[idx] ^ 0x8000) - 0x8000) + 0x4000) >> 15
+            im -= (v * ((c[(idx - quarter) & mask] ^ 0x8000) - 0x8000) + 0x4000) >> 15
+            idx = (idx + step) & mask
+        a[2 * j] = re
+        a[2 * j + 1] = im
+
+
+def dft_analyze(buf):
+    # банк DFT поточного профілю по FFT_SIZE семплах buf -> dft_acc (слот не потрібен)
+    _dft_window(dft_xw, buf, FFT_SIZE)
+    _dft_bins(dft_acc, dft_xw, DFT_BINS, FFT_SIZE)
+
+
+@micropython.native
+def dft_spectrum(dst):
+    # dft_acc -> потужність бінів DFT_BINS у dst (нормалізація як у fastfft, решта бінів не змінюється)
+    acc = dft_acc
+    wts = DFT_WTS
+    norm = DFT_NORM
+    j = 0
+    for k in DFT_BINS:
+        re = float(acc[2 * j])
+        im = float(acc[2 * j + 1])
+        dst[k] = (re * re + im * im) * norm * wts[j]
+        j += 1
+
+
+def _clear_slots():
+    # біни поза DFT_BINS мають бути нулями (після FFT-профілю там лишаються старі значення)
+    for sl in spec_slots if dft_spec is None else (dft_spec,):
+        for k in range(len(sl)):
+            sl[k] = 0.0
+
+
+def select_analysis():
+    '''
+    ANALYSIS = 'auto': для кожного профілю один раз вимірює rfft() і банк DFT на буфері
+    захвату профілю, вмикає DFT там, де він швидший. Вертає {профіль: (t_fft, t_dft, 'dft'/'fft')}, мкс
+    '''
+    res = {}
+    cur = PROFILE
+    for name, p in _profiles.items():
+        _use_profile(name)
+        t0 = time.ticks_us()
+        fastfft.rfft(fft_view, True)
+        t1 = time.ticks_us()
+        dft_analyze(fft_view)
+        dft_spectrum(spec_slots[0] if dft_spec is None else dft_spec)
+        t2 = time.ticks_us()
+        t_fft = time.ticks_diff(t1, t0)
+        t_dft = time.ticks_diff(t2, t1)
+        p.use_dft = t_dft < t_fft
+        res[name] = (t_fft, t_dft, 'dft' if p.use_dft else 'fft')
+    _use_profile(cur)
+    _clear_slots()
+    return res
+
+
+
+@micropython.viper
+def _fx_load(re, im, src, m: int):
+    # 2m семплів src * вікно Ханна Q15 -> z[n] = x[2n] + j*x[2n+1] у біт-реверсному порядку
+    r = ptr32(re)
+    q = ptr32(im)
+    s = ptr16(src)
+    c = ptr16(DFT_COS)
+    stride = int(len(DFT_COS)) // (2 * m)
+    bits = 0
+    k = m
+    while k > 1:
+        k >>= 1
+        bits += 1
+    for n in range(m):
+        v = n
+        rv = 0
+        for b in range(bits):
+            rv = (rv << 1) | (v & 1)
+            v >>= 1
+        i0 = 2 * n
+        w = (32767 - ((c[i0 * stride] ^ 0x8000) - 0x8000)) >> 1
+        r[rv] = (((s[i0] ^ 0x8000) - 0x8000) * w + 0x4000) >> 15
+        w = (32767 - ((c[(i0 + 1) * stride] ^ 0x8000) - 0x8000)) >> 1
+        q[rv] = (((s[i0 + 1] ^ 0x8000) - 0x8000) * w + 0x4000) >> 15
+
+
+@micropython.viper
+def _fx_fft(re, im, m: int) -> int:
+    # комплексний FFT radix-2 (DIT) на m точках int32, твідли Q15 з DFT_COS;
+    # блокова плаваюча кома: перед етапом дані зсуваються (з округленням), доки |z| < 2^20;
+    # твідл множиться частинами W = Wh * 2^8 + Wl (|B * Wh| < 2^27, |B * Wl| < 2^28), тож
+    # на етап 20 значущих бітів замість 15. Після останнього - доки |z| < 2^15 (для _fx_bands()).
+    # Вертає сумарний зсув S: Z = Z_int * 2^S
+    r = ptr32(re)
+    q = ptr32(im)
+    c = ptr16(DFT_COS)
+    size = int(len(DFT_COS))
+    mask = size - 1
+    quarter = size >> 2
+    mx = 0  # OR модулів: >= max|z|, < 2 * max|z|
+    for n in range(m):
+        a = r[n]
+        if a < 0:
+            a = 0 - a
+        mx |= a
+        a = q[n]
+        if a < 0:
+            a = 0 - a
+        mx |= a
+    total = 0
+    half = 1
+    while half < m:
+        sh = 0
+        while (mx >> sh) >= 1048576:
+            sh += 1
+        total += sh
+        rnd = (1 << sh) >> 1
+        step = size // (2 * half)
+        span = 2 * half
+        mx = 0
+        for j in range(half):
+            idx = j * step
+            wr = (c[idx] ^ 0x8000) - 0x8000
+            wi = 0 - ((c[(idx - quarter) & mask] ^ 0x8000) - 0x8000)  # W = cos - j*sin
+            wrh = wr >> 8
+            wrl = wr & 255
+            wih = wi >> 8
+            wil = wi & 255
+            k = j
+            while k < m:
+                p = k + half
+                ar = (r[k] + rnd) >> sh
+                ai = (q[k] + rnd) >> sh
+                br = (r[p] + rnd) >> sh
+                bi = (q[p] + rnd) >> sh
+                tr = (br * wrh - bi * wih + ((br * wrl - bi * wil + 128) >> 8) + 64) >> 7
+                ti = (br * wih + bi * wrh + ((br * wil + bi * wrl + 128) >> 8) + 64) >> 7
+                a = ar + tr
+                r[k] = a
+                if a < 0:
+                    a = 0 - a
+                mx |= a
+                a = ai + ti
+                q[k] = a
+                if a < 0:
+                    a = 0 - a
+                mx |= a
+                a = ar - tr
+                r[p] = a
+                if a < 0:
+                    a = 0 - a
+                mx |= a
+                a = ai - ti
+                q[p] = a
+                if a < 0:
+                    a = 0 - a
+                mx |= a
+                k += span
+        half = span
+    sh = 0
+    while (mx >> sh) >= 32768:
+        sh += 1
+    if sh:
+        rnd = 1 << (sh - 1)
+        for n in range(m):
+            r[n] = (r[n] + rnd) >> sh
+            q[n] = (q[n] + rnd) >> sh
+    return total + sh
+
+
+@micropython.viper
+def _fx_bands(dst, re, im, shift: int):
+    # Z (FFT_SIZE/2 точок) -> біни real FFT X[k] = E + W^k * O -> енергії смуг BAND_EDGES
+    # у int64 (hi * 2^30 + lo) -> dBFS, Q8 (як _bands_db_q8(): log2 = позиція старшого біта + LUT);
+    # компоненти Z < 2^15 після _fx_fft(), тому компоненти 2E, 2O < 2^16, а X < 2^16.3
+    d = ptr32(dst)
+    r = ptr32(re)
+    q = ptr32(im)
+    edges = ptr16(BAND_EDGES)
+    lut = ptr8(LOG2_LUT)
+    c = ptr16(DFT_COS)
+    nb = int(NUM_BAND)
+    m = int(FFT_SIZE) >> 1
+    size = int(len(DFT_COS))
+    mask = size - 1
+    quarter = size >> 2
+    stride = size // (2 * m)
+    l2off = int(FX_L2_OFF) + (shift << 9)  # |X|^2 = |X_int|^2 * 2^(2S)
+    off = int(DB_OFF_Q8)
+    for b in range(nb):
+        hi = 0
+        lo = 0
+        for k in range(edges[2 * b], edges[2 * b + 1]):
+            k1 = k & (m - 1)
+            k2 = (m - k) & (m - 1)
+            ar = r[k1]
+            ai = q[k1]
+            br = r[k2]
+            bi = 0 - q[k2]          # B = conj(Z[m - k])
+            er = ar + br            # 2E = A + B
+            ei = ai + bi
+            o_r = ai - bi           # 2O = -j * (A - B)
+            o_i = br - ar
+            idx = k * stride
+            wc = (c[idx] ^ 0x8000) - 0x8000
+            ws = (c[(idx - quarter) & mask] ^ 0x8000) - 0x8000
+            # X = (2E + W^k * 2O) / 2 з одним округленням наприкінці; |W * 2O| < 2^16 * 2^15 -
+            # кожен добуток округлюється окремо, щоб сума не виходила за int32
+            xr = (er + ((wc * o_r + 0x4000) >> 15) + ((ws * o_i + 0x4000) >> 15) + 1) >> 1
+            xi = (ei + ((wc * o_i + 0x4000) >> 15) - ((ws * o_r + 0x4000) >> 15) + 1) >> 1
+            # |x| < 2^16.3, квадрат - по частинах x = h * 2^8 + l: h^2 * 2^16 (старші біти - одразу
+            # в hi) + 2hl * 2^8 + l^2 (< 2^26), після кожного доданку lo < 2^30
+            if xr < 0:
+                xr = 0 - xr
+            h = xr >> 8
+            l = xr & 255
+            sq = h * h
+            hi += sq >> 14
+            lo += (sq & 0x3FFF) << 16
+            if lo >= 0x40000000:
+                hi += 1
+                lo -= 0x40000000
+            lo += ((h * l) << 9) + l * l
+            if lo >= 0x40000000:
+                hi += 1
+                lo -= 0x40000000
+            if xi < 0:
+                xi = 0 - xi
+            h = xi >> 8
+            l = xi & 255
+            sq = h * h
+            hi += sq >> 14
+            lo += (sq & 0x3FFF) << 16
+            if lo >= 0x40000000:
+                hi += 1
+                lo -= 0x40000000
+            lo += ((h * l) << 9) + l * l
+            if lo >= 0x40000000:
+                hi += 1
+                lo -= 0x40000000
+        ex = 0
+        v = lo
+        if hi:
+            v = (hi << 8) | (lo >> 22)
+            ex = 22
+        if v == 0:
+            d[b] = -120 * 256
+            continue
+        msb = 0
+        t = v
+        while t > 1:
+            t >>= 1
+            msb += 1
+        if msb >= 7:
+            mant = (v >> (msb - 7)) & 0x7F
+        else:
+            mant = (v << (7 - msb)) & 0x7F
+        l2 = ((msb + ex) << 8) + lut[mant] + l2off   # log2(енергії), Q8
+        d[b] = ((l2 * 12330) >> 12) + off
+
+
+def fx_analyze(buf):
+    # INT_PIPELINE: вікно + FFT поточного профілю у fx_re / fx_im, вертає зсув S для _fx_bands()
+    m = FFT_SIZE >> 1
+    _fx_load(fx_re, fx_im, buf, m)
+    return _fx_fft(fx_re, fx_im, m)
+
+
+@micropython.native
+def band_energies(spec, edges, out_e, nb):
+    # один прохід по спектру: out_e[b] = сума spec[k] для k у [lo, hi[ смуги b
+    for b in range(nb):
+        e = 0.0
+        for k in range(edges[2 * b], edges[2 * b + 1]):
+            e += spec[k]
+        out_e[b] = e
+
+
+def energy_dbfs(e):
+    # енергія смуги -> dBFS
+    if e <= 0:
+        return -120
+    return 10.0 * math.log10((2.0 * e) / FS_RMS2)
+
+
 def band_dbfs(spec, i, j):
     # вертає значення dBFS для смуги частот (для діапазону бінів [i, j[ )
     # e = сума енергій бінів у смузі (очікується, що spec[k] >= 0)
@@ -128,54 +1109,25 @@ def band_dbfs(spec, i, j):
     for k in range(i, j):
         e += spec[k]
     
-    if e <= 0:
-        return -120
-   
-    return 10.0 * math.log10((2.0 * e) / FS_RMS2)
+    return energy_dbfs(e)
 
 
-if filename in os.listdir():
-    os.rename(filename, filename[:-4] + '_old.txt')
-num_dbfs = 0
-dbfs_all = [0] * 16
-def build_band_spectr_test(spec, out_buf):
-    # тестова версія функції
-    # використовується для вимірювання шумового порогу
-    global num_dbfs, dbfs_all
-    ind = 1
-    dbfs_l = []
-    for i, s in enumerate(IND_BANDS):
-        dbfs = band_dbfs(spec, ind, ind+s)
-        dbfs_l.append(dbfs)
-        # нижче - просто для проби щоб побачити, що працює, шумовий поріг 70
-        val = (round(dbfs) + 70) // 3 
-        if val > 16:
-            val = 16
-        elif val <= 0:
-            val = 1
-        out_buf[i] = val
-        ind += s
-    
-    #вимірювання шумового порогу    
-    num_dbfs = (num_dbfs + 1) % 1000
-    dbfs_all = [a + b for a, b in zip(dbfs_l, dbfs_all)]
-    if not num_dbfs:
-        dbfs_all = [-(round(x / 1000)+2) for x in dbfs_all]
-        print(dbfs_all)
-        with open(filename, 'a') as f:
-            print(dbfs_all, file=f)
-        dbfs_all = [0] * 16
-           
-
-def build_band_spectr(spec, out_buf):
+def build_band_spectr(spec, out_buf, dt_us=DT_NOMINAL_US):
+    # енергії смуг за таблицею BAND_EDGES (один прохід по спектру) + AGC і мапінг
+    band_energies(spec, BAND_EDGES, band_e, NUM_BAND)
+    map_band_spectr(out_buf, dt_us)
+
+
+def map_band_spectr(out_buf, dt_us=DT_NOMINAL_US):
+    # band_e -> рівні 0..16; спектр уже не потрібен
+    # dt_us - час від попереднього кадра (спад AGC задано в dB/с)
     global _scale_db
 
-    ind = 1
     peak_adj = 0.0
 
     # 1) adj без gain (тільки шумовий поріг)
-    for i, w in enumerate(IND_BANDS):
-        db = band_dbfs(spec, ind, ind + w)
+    for i in range(NUM_BAND):
+        db = energy_dbfs(band_e[i])
 
         adj = db + float(NOISE_THRESHOLD[i])
         if adj < 0.0:
@@ -185,14 +1137,12 @@ def build_band_spectr(spec, out_buf):
         if adj > peak_adj:
             peak_adj = adj
 
-        ind += w
-
     # 2) Масштабування (як було)
     target = peak_adj + HEADROOM_DB
     if target > _scale_db:
         _scale_db = target
     else:
-        _scale_db -= SCALE_DECAY_DB
+        _scale_db -= SCALE_DECAY_DB_S * dt_us / 1_000_000
         if _scale_db < target:
             _scale_db = target
         if _scale_db < SCALE_MIN_DB:
@@ -205,6 +1155,7 @@ def build_band_spectr(spec, out_buf):
         adj = _tmp_adj[i]
         if adj <= 0.0:
             out_buf[i] = 0
+            band_lvl_q8[i] = 0
             continue
 
         adj_eff = adj + float(BAND_GAIN_DB[i])   # <-- підсилення смуги
@@ -220,56 +1171,385 @@ def build_band_spectr(spec, out_buf):
         if lvl > 16:
             lvl = 16
         out_buf[i] = lvl
+        band_lvl_q8[i] = 256 + int(y * 3840.0 + 0.5)   # те саме 8.8, без відкидання дробу
+
+@micropython.viper
+def _bands_db_q8(src, dst, nb: int):
+    # енергії смуг (float32) -> dBFS у Q8 без log10: log2 = експонента + LUT мантиси
+    e = ptr32(src)
+    d = ptr32(dst)
+    lut = ptr8(LOG2_LUT)
+    off = int(DB_OFF_Q8)
+    for i in range(nb):
+        bits = e[i]
+        ex = (bits >> 23) & 0xFF
+        if bits <= 0 or ex == 0:
+            # 0, від'ємні та денормалізовані -> -120 dB (як energy_dbfs)
+            d[i] = -120 * 256
+            continue
+        l2 = ((ex - 127) << 8) + lut[(bits >> 16) & 0x7F]  # log2(e), Q8
+        d[i] = ((l2 * 12330) >> 12) + off                   # * 10*log10(2)
+
+
+@micropython.viper
+def _map_bands_fx(db_q8, out_buf, nb: int, dt_us: int):
+    # gate -> AGC -> EQ -> gamma LUT, усе в int (dB у Q8)
+    db = ptr32(db_q8)
+    adj_q = ptr32(_fx_adj)
+    nt = ptr32(_fx_nt)
+    gain = ptr32(_fx_gain)
+    st = ptr32(_fx_state)
+    sc = ptr32(_fx_scale)
+    lut = ptr8(GAMMA_LUT)
+    lut_q = ptr16(GAMMA_LUT_Q8)
+    lq = ptr16(band_lvl_q8)
+    out = ptr8(out_buf)
+
+    # 1) шумовий поріг (gate)
+    peak = 0
+    for i in range(nb):
+        adj = db[i] + nt[i]
+        if adj < 0:
+            adj = 0
+        adj_q[i] = adj
+        if adj > peak:
+            peak = adj
+
+    # 2) AGC: спад st[2] dB/с -> Q8 за цей кадр (залишок переноситься на наступний)
+    acc = st[5] + st[2] * dt_us
+    decay = acc // 1_000_000
+    st[5] = acc - decay * 1_000_000
+    headroom = st[1]
+    smin = st[3]
+    per_band = st[4]
+
+    scale = st[0]
+    if not per_band:
+        target = peak + headroom
+        if target > scale:
+            scale = target
+        else:
+            scale -= decay
+            if scale < target:
+                scale = target
+            if scale < smin:
+                scale = smin
+        if scale < 1:
+            scale = 1
+        st[0] = scale
+
+    # 3) gain смуги + gamma: x = adj_eff / scale -> 0..255 -> LUT
+    for i in range(nb):
+        adj = adj_q[i]
+        if per_band:
+            # той самий AGC, але по піку власної смуги
+            scale = sc[i]
+            target = adj + headroom
+            if target > scale:
+                scale = target
+            else:
+                scale -= decay
+                if scale < target:
+                    scale = target
+                if scale < smin:
+                    scale = smin
+            if scale < 1:
+                scale = 1
+            sc[i] = scale
+        if adj <= 0:
+            out[i] = 0
+            lq[i] = 0
+            continue
+        a = adj + gain[i]
+        if a < 0:
+            a = 0
+        x = (a * 255 + (scale >> 1)) // scale
+        if x > 255:
+            x = 255
+        out[i] = lut[x]
+        lq[i] = lut_q[x]
+
+
+def build_band_spectr_fx(spec, out_buf, dt_us=DT_NOMINAL_US):
+    # те саме, що build_band_spectr(), але після агрегації смуг - лише int і LUT
+    band_energies(spec, BAND_EDGES, band_e, NUM_BAND)
+    map_band_spectr_fx(out_buf, dt_us)
+
+
+def take_band_db(db_q8):
+    # INT_PIPELINE: dBFS смуг (Q8) від Core0 -> band_db_q8 (таблиці - до копії: вони можуть
+    # перевиділити band_db_q8)
+    fx_tables_update()
+    _copy32(band_db_q8, db_q8, NUM_BAND)
+
+
+def map_band_db_fx(out_buf, dt_us=DT_NOMINAL_US):
+    # INT_PIPELINE: band_db_q8 -> рівні 0..16 (AGC, EQ, gamma - як map_band_spectr_fx())
+    fx_tables_update()
+    _map_bands_fx(band_db_q8, out_buf, NUM_BAND, dt_us)
+
+
+def map_band_spectr_fx(out_buf, dt_us=DT_NOMINAL_US):
+    # fixed-point варіант map_band_spectr() (band_e -> рівні 0..16)
+    fx_tables_update()
+    _bands_db_q8(band_e, band_db_q8, NUM_BAND)
+    _map_bands_fx(band_db_q8, out_buf, NUM_BAND, dt_us)
+
+
+def calibrate_bands(out_buf):
+    # режим калібрування (по band_e): статистика рівнів смуг + проста індикація (шумовий поріг ~70 dB)
+    global CALIBRATE, NOISE_THRESHOLD
+    fx_tables_update()
+    if not INT_PIPELINE:  # INT_PIPELINE: band_db_q8 уже заповнив take_band_db()
+        _bands_db_q8(band_e, band_db_q8, NUM_BAND)
+    for i in range(NUM_BAND):
+        val = ((band_db_q8[i] >> 8) + 70) // 3
+        if val > 16:
+            val = 16
+        elif val <= 0:
+            val = 1
+        out_buf[i] = val
+        band_lvl_q8[i] = val << 8
+
+    if calibrator.add(band_db_q8):
+        NOISE_THRESHOLD = calibrator.result()
+        calibrator.save(CAL_KEY, NOISE_THRESHOLD, cal_path(PROFILE))
+        _profiles[PROFILE].thresholds = NOISE_THRESHOLD
+        print('NOISE_THRESHOLD =', NOISE_THRESHOLD)
+        fx_tables_update(force=True)
+        CALIBRATE = False
+
+
+def save_spectrum(spec, path='spectrum.bin'):
+    # запис спектра (біни 0..SPEC_LEN-1, float32) для повторних вимірювань
+    slot = array.array('f', [0.0] * SPEC_LEN)
+    _copy32(slot, spec, SPEC_LEN)
+    with open(path, 'wb') as f:
+        f.write(slot)
+
+
+def load_spectrum(path='spectrum.bin'):
+    slot = array.array('f', [0.0] * SPEC_LEN)
+    with open(path, 'rb') as f:
+        f.readinto(slot)
+    return slot
+
+
+def bench_band_spectr(spec, frames=100):
+    '''
+    Порівняння агрегації смуг на записаному спектрі (див. save_spectrum()):
+      ref_us  - попередній варіант: band_dbfs() по кожній смузі BAND_EDGES (цикл по бінах у Python)
+      new_us  - band_energies() за таблицею BAND_EDGES + energy_dbfs()
+      full_us - повний build_band_spectr() (смуги + AGC + мапінг)
+      fx_us   - повний build_band_spectr_fx() (fixed-point + LUT)
+    Вертає середній час на кадр, мкс: (ref_us, new_us, full_us, fx_us)
+    '''
+    out = bytearray(NUM_BAND)
+
+    t0 = time.ticks_us()
+    for _ in range(frames):
+        for i in range(NUM_BAND):
+            _tmp_adj[i] = band_dbfs(spec, BAND_EDGES[2 * i], BAND_EDGES[2 * i + 1])
+    t1 = time.ticks_us()
+    for _ in range(frames):
+        band_energies(spec, BAND_EDGES, band_e, NUM_BAND)
+        for i in range(NUM_BAND):
+            _tmp_adj[i] = energy_dbfs(band_e[i])
+    t2 = time.ticks_us()
+    for _ in range(frames):
+        build_band_spectr(spec, out)
+    t3 = time.ticks_us()
+    for _ in range(frames):
+        build_band_spectr_fx(spec, out)
+    t4 = time.ticks_us()
+
+    return (time.ticks_diff(t1, t0) // frames,
+            time.ticks_diff(t2, t1) // frames,
+            time.ticks_diff(t3, t2) // frames,
+            time.ticks_diff(t4, t3) // frames)
 
 # ---------------- Core0 main loop ----------------
-def core0_main_loop():
-    global spectr_front, spectr_busy
+def _wait_slot(k):
+    # чекаємо, поки Core1 звільнить слот k (заблоковано лише на час band_energies())
+    while True:
+        lock.acquire()
+        full = slot_full[k]
+        lock.release()
+        if not full:
+            return
+        time.sleep_us(50)
+
+
+def core0_main_loop(frames=0):
+    # frames: 0 - без кінця; n - вийти після n кадрів (як core1_dsp_led_worker())
+    global capture_overruns, profile_req, adc
+
+    wr = 0  # наступний слот для запису
+    stream = CAPTURE_MODE == 'stream'
+    last = 0  # 'stream': номер семпла (від adc.start()), яким закінчилось попереднє вікно
+
+    if adc is None and (stream or FRONT_END):
+        adc = adc_ring.AdcRing(ADC0, ADC_RING)
+    if stream:
+        # захват безперервний: DMA пише в кільце паралельно з FFT, очікуванням слота і Core1
+        adc.start(SAMPLE_FREQ)
 
     while True:
+        # 0) Перемикання профілю: лише між кадрами, коли Core1 звільнив усі слоти
+        if profile_req:
+            profile_req = False
+            if stream:
+                adc.stop()
+            for k in range(NUM_SLOTS):
+                _wait_slot(k)
+            _use_profile(_PROFILE_NAMES[(_PROFILE_NAMES.index(PROFILE) + 1) % len(_PROFILE_NAMES)])
+            if USE_DFT:
+                _clear_slots()
+            print('profile:', PROFILE, SAMPLE_FREQ, FFT_SIZE, 'dft' if USE_DFT else 'fft')
+            if stream:
+                last = 0
+                adc.start(SAMPLE_FREQ)
+
         t0 = time.ticks_us()
         
         # 1) Захват ADC
-        adc_dma.start(ADC0, SAMPLE_FREQ, FFT_SIZE)
-        while adc_dma.busy():
-            time.sleep_us(5)
+        if stream:
+            if last > adc_ring.COUNT - ADC_RING:
+                # лічильник передач DMA майже вичерпано (години роботи): захват з початку кільця
+                adc.start(SAMPLE_FREQ)
+                last = 0
+            tot = adc.total()
+            while tot - last < HOP:
+                time.sleep_us(5)
+                tot = adc.total()
+            # нових семплів - кратно HOP (і BASS_DECIM); понад FFT_SIZE - старші вже не потраплять у вікно
+            hop = (tot - last) // HOP * HOP
+            last += hop
+            new = hop
+            if new > FFT_SIZE:
+                capture_overruns += 1
+                new = FFT_SIZE
+            front_capture(ring_buf, adc.buf, (last - new) & (ADC_RING - 1), new)
+            _ring_unroll(fft_view, ring_buf, (last - FFT_SIZE) & (ADC_RING - 1), FFT_SIZE)
+            buf = fft_view
+        elif FRONT_END:
+            # сирі семпли - у кільці AdcRing з позиції 0 (ADC_RING >= 2 * FFT_SIZE: без загортання),
+            # вхідний каскад пише одразу у fft_view
+            new = FFT_SIZE
+            adc.start(SAMPLE_FREQ)
+            while adc.total() < FFT_SIZE:
+                time.sleep_us(5)
+            adc.stop()
+            buf = front_capture(fft_view, adc.buf, 0, FFT_SIZE)
+        else:
+            new = FFT_SIZE
+            adc_dma.start(ADC0, SAMPLE_FREQ, FFT_SIZE)
+            while adc_dma.busy():
+                time.sleep_us(5)
 
-        # отримуємо буфер (тут важливо НЕ робити close() до завершення FFT)
-        buf, peak = adc_dma.buffer_i16('auto', 10_000)
+            # отримуємо буфер (тут важливо НЕ робити close() до завершення FFT)
+            buf, peak = adc_dma.buffer_i16('auto', 10_000)
+        t1 = time.ticks_us()
 
-        # 2) Перед викликом rfft() чекаємо, поки Core1 завершив читання попереднього спектра
-        while True:
-            lock.acquire()
-            busy = spectr_busy
-            lock.release()
-            if not busy: # Core1 вже завершив обробку
-                break
-            time.sleep_us(50)
+        # 1a) Низи: нові семпли кадра -> кільце проріджених семплів
+        if BASS_LEN:
+            bass_capture(buf, FFT_SIZE - new)
+        tb = time.ticks_us()
 
-        # 3) FFT (повертає memoryview на внутрішній буфер fastfft)
-        spectr = fastfft.rfft(buf, True)
+        # 2) ZERO_COPY: rfft() перезапише буфер, з якого Core1 ще може брати енергії смуг
+        if ZERO_COPY:
+            _wait_slot(wr)
+        t2 = time.ticks_us()
+
+        # 3) FFT (повертає memoryview на внутрішній буфер fastfft), банк DFT (у dft_acc)
+        #    або цілочисельний FFT (у fx_re / fx_im)
+        if INT_PIPELINE:
+            shift = fx_analyze(buf)
+        elif USE_DFT:
+            dft_analyze(buf)
+        else:
+            spectr = fastfft.rfft(buf, True)
 
         # 4) Тепер можна закрити adc_dma (бо FFT вже прочитав buf)
-        adc_dma.close()
+        if not stream and not FRONT_END:
+            adc_dma.close()
+        t3 = time.ticks_us()
+
+        # 5) Чекаємо, поки Core1 звільнить слот wr (у нормі він уже вільний)
+        if not ZERO_COPY:
+            _wait_slot(wr)
+        t4 = time.ticks_us()
 
-        # 5) Публікація спектра для Core1
+        # 6) Копія бінів у слот: після цього внутрішній буфер fastfft
+        #    можна перезаписувати наступним rfft()
+        #    (DFT: потужності бінів банку - у слот або, з ZERO_COPY, у dft_spec;
+        #     INT_PIPELINE: одразу dBFS смуг, Q8)
+        if INT_PIPELINE:
+            _fx_bands(db_slots[wr], fx_re, fx_im, shift)
+        elif USE_DFT:
+            if ZERO_COPY:
+                spec_slots[wr] = dft_spec
+            dft_spectrum(spec_slots[wr])
+        elif ZERO_COPY:
+            spec_slots[wr] = spectr
+        else:
+            _copy32(spec_slots[wr], spectr, SPEC_LEN)
+        t5 = time.ticks_us()
+
+        # 6a) bass-спектр у той самий слот (після копії: rfft() перезапише spectr)
+        if BASS_LEN:
+            bass_spectrum(bass_slots[wr])
+        t6 = time.ticks_us()
+
+        # 7) Публікація слота для Core1
         lock.acquire()
-        spectr_front = spectr
-        spectr_busy = True
+        slot_full[wr] = 1
         lock.release()
-        
-        t1 = time.ticks_us()
-        # print(time.ticks_diff(t1, t0))
+        wr = (wr + 1) % NUM_SLOTS
+        t7 = time.ticks_us()
+
+        tm.record(TM_CAPTURE, time.ticks_diff(t1, t0))
+        tm.record(TM_RFFT, time.ticks_diff(t3, t2))
+        tm.record(TM_WAIT, time.ticks_diff(t2, tb) + time.ticks_diff(t4, t3))
+        tm.record(TM_COPY, time.ticks_diff(t5, t4) + time.ticks_diff(t7, t6))
+        tm.record(TM_BASS, time.ticks_diff(tb, t1) + time.ticks_diff(t6, t5))
+        tm.poll()
+        frames -= 1
+        if frames == 0:
+            return
 
 # --------------------------------------
 # START
 # --------------------------------------
 if __name__ == '__main__':
     n = 16
-    m = 16
-    nm = NeoMatrixFast(row=n, col=m, neo_pin=20)
+    m = M
+    # delta=True: перемальовуються лише змінені стовпці, np.write() пропускається для незмінних кадрів
+    # PioDmaOutput: np.write() не блокує Core1, передача кадра іде паралельно з рендером наступного
+    nm = NeoMatrixFast(row=n, col=m, neo_pin=20, delta=True,
+                       output=PioDmaOutput(20, n * m, bpp=len(LED_ORDER)),
+                       order=LED_ORDER, brightness=BRIGHTNESS, gamma=LED_GAMMA)
+    if POWER_BUDGET_MA:
+        nm.set_power_limit(POWER_BUDGET_MA, LED_MA_PER_STEP, LED_IDLE_MA)
+    if LINK:
+        link = FrameLink(machine.UART(LINK_UART, baudrate=LINK_BAUD, tx=machine.Pin(LINK_TX_PIN),
+                                      txbuf=LINK_TXBUF), M, txbuf=LINK_TXBUF)
+    if ANALYSIS == 'auto' and not INT_PIPELINE:
+        print('analysis:', select_analysis())
+    save_band_plans()
     nm.clear()
     # тумблер переключення режимів відображення піків (1/0 - вкл/викл)
     button_peaks_en = machine.Pin(16, machine.Pin.IN, machine.Pin.PULL_UP)
+    # кнопка друку телеметрії
+    tm.arm_pin(machine.Pin(TELEMETRY_PIN, machine.Pin.IN, machine.Pin.PULL_UP))
+    # кнопка перемикання рушія рендеру
+    nm.set_engine(ENGINE)
+    nm.set_subpixel(SUBPIXEL)
+    # кнопка перемикання профілю захвату
+    profile_pin = machine.Pin(PROFILE_PIN, machine.Pin.IN, machine.Pin.PULL_UP)
+    profile_pin.irq(trigger=machine.Pin.IRQ_FALLING, handler=_on_profile_pin)
+    engine_pin = machine.Pin(ENGINE_PIN, machine.Pin.IN, machine.Pin.PULL_UP)
+    engine_pin.irq(trigger=machine.Pin.IRQ_FALLING, handler=_on_engine_pin)
 
     _thread.start_new_thread(core1_dsp_led_worker, ())
     core0_main_loop()
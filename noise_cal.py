@@ -0,0 +1,136 @@
+# Author: Oleksandr Teteria
+# v1.0.0
+# 17.10.2026
+# Implemented and tested on Pi Pico with RP2040
+# Released under the MIT license
+
+'''
+Калібрування шумового порогу (NOISE_THRESHOLD) по смугах.
+
+NoiseCalibrator накопичує статистику рівнів смуг у тиші (dBFS у Q8, як
+band_db_q8 з neo_spectr) у передвиділених масивах без алокацій на кадр:
+  - сума рівнів (середнє);
+  - гістограма з кроком 1 dB (перцентиль, дисперсія).
+Після frames кадрів result() дає пороги, save() пише компактний бінарний
+файл, який neo_spectr завантажує при старті (load()) замість вшитого
+NOISE_THRESHOLD.
+
+Поріг за замовчуванням - як у попередньому текстовому методі
+(NOISE_THRESHOLD.txt): -(round(середнє dBFS) + margin_db), margin_db = 2.
+'''
+
+import array
+import math
+import struct
+import micropython
+
+CAL_FILE = 'noise_cal.bin'
+_MAGIC = b'NCL1'
+# magic, Fs, N, сума меж смуг (ключ плану), bands, frames
+_HDR = '<4sIHHBH'
+
+HIST_BINS = 128  # 0 .. -127 dBFS з кроком 1 dB
+
+
+class NoiseCalibrator:
+    def __init__(self, bands, frames=1000):
+        self.bands = bands
+        self.frames = frames
+        self.sum = array.array('i', [0] * bands)                 # сума dB, Q8
+        self.hist = array.array('H', [0] * (bands * HIST_BINS))  # hist[b*128 + k]: рівень ≈ -k dB
+        self.n = 0
+
+    def reset(self):
+        for b in range(self.bands):
+            self.sum[b] = 0
+        for k in range(self.bands * HIST_BINS):
+            self.hist[k] = 0
+        self.n = 0
+
+    @micropython.viper
+    def _add(self, db_q8):
+        d = ptr32(db_q8)
+        sm = ptr32(self.sum)
+        h = ptr16(self.hist)
+        nb = int(self.bands)
+        for b in range(nb):
+            v = d[b]
+            sm[b] = sm[b] + v
+            k = (128 - v) >> 8  # -dB, округлено до цілого
+            if k < 0:
+                k = 0
+            elif k > 127:
+                k = 127
+            i = b * 128 + k
+            h[i] = h[i] + 1
+
+    def add(self, db_q8):
+        # db_q8: array('i') рівнів смуг у dBFS, Q8; вертає True, коли набрано frames кадрів
+        self._add(db_q8)
+        self.n += 1
+        return self.n >= self.frames
+
+    def stats(self, b, percentile=95):
+        # (середнє dB, СКВ dB, перцентиль dB) для смуги b
+        n = self.n
+        if not n:
+            return -120.0, 0.0, -120
+        mean = self.sum[b] / (256 * n)
+        base = b * HIST_BINS
+        var = 0.0
+        for k in range(HIST_BINS):
+            c = self.hist[base + k]
+            if c:
+                var += c * (-k - mean) ** 2
+        # рівень, нижче якого percentile% кадрів (від гучних до тихих: k = 0 .. 127)
+        need = n * (100 - percentile) / 100
+        acc = 0
+        p = -(HIST_BINS - 1)
+        for k in range(HIST_BINS):
+            acc += self.hist[base + k]
+            if acc > need:
+                p = -k
+                break
+        return mean, math.sqrt(var / n), p
+
+    def result(self, margin_db=2, percentile=None):
+        '''
+        Пороги по смугах (tuple int, формат NOISE_THRESHOLD):
+          percentile=None - -(round(середнє) + margin_db), як текстовий метод
+          percentile=95   - -(перцентиль + margin_db), стійкіше до рідких сплесків шуму
+        '''
+        res = []
+        for b in range(self.bands):
+            mean, std, p = self.stats(b, percentile or 95)
+            lvl = p if percentile else round(mean)
+            res.append(-(lvl + margin_db))
+        return tuple(res)
+
+    def save(self, key, thresholds, path=CAL_FILE):
+        # key = (Fs, N, сума меж смуг): ключ плану смуг, для якого зроблено калібрування
+        Fs, N, ek = key
+        with open(path, 'wb') as f:
+            f.write(struct.pack(_HDR, _MAGIC, Fs, N, ek & 0xFFFF, self.bands, self.n))
+            f.write(struct.pack('<%db' % self.bands, *thresholds))
+            for b in range(self.bands):
+                mean, std, p = self.stats(b)
+                f.write(struct.pack('<hHb', int(mean * 256), int(std * 256), p))
+
+
+def load(bands, key, path=CAL_FILE):
+    '''
+    Пороги з файла калібрування або None (немає файла / інший план смуг).
+    '''
+    Fs, N, ek = key
+    try:
+        with open(path, 'rb') as f:
+            hdr = f.read(struct.calcsize(_HDR))
+            data = f.read(bands)
+    except OSError:
+        return None
+    if len(hdr) != struct.calcsize(_HDR) or len(data) != bands:
+        return None
+    magic, fs, n, e, nb, frames = struct.unpack(_HDR, hdr)
+    if magic != _MAGIC or (fs, n, e, nb) != (Fs, N, ek & 0xFFFF, bands):
+        return None
+    return struct.unpack('<%db' % bands, data)
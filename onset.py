@@ -0,0 +1,223 @@
+# Author: Oleksandr Teteria
+# v1.0.0
+# 17.10.2026
+# Implemented and tested on Pi Pico with RP2040
+# Released under the MIT license
+
+import array
+import micropython
+
+
+class OnsetDetector:
+    '''
+    Детектор онсетів (ударів) і темпу за потоком рівнів смуг.
+
+    Спектральний потік: сума приростів dBFS смуг відносно попереднього кадра
+    (лише додатні прирости; рівні нижче шумового порогу смуги обрізаються до порогу,
+    тож шум у тиші не дає потоку). Онсет - потік вище адаптивного порогу
+    mean + sens * dev (EMA середнього і середнього відхилення потоку) і не раніше,
+    ніж через refractory_ms після попереднього.
+
+    Темп: гістограма інтервалів між онсетом і 8 попередніми (біни по 10 мс у межах
+    bpm_min..bpm_max, ближчий інтервал важить більше), з експоненційним забуванням
+    на кожному онсеті; темп - центроїд навколо максимуму згладженої гістограми
+    (усереднює квантування часу онсетів періодом кадра).
+    Після тиші довшої за 4 найбільші інтервали гістограма скидається (темп 0).
+
+    Увесь стан - передвиділені масиви сталого розміру, час - лише як вік подій
+    (з обмеженням), тому немає переповнень за години роботи.
+    update() - один viper-прохід по смугах, без алокацій.
+    Вхід - dBFS смуг у Q8 (neo_spectr.band_db_q8).
+    Результат: update() вертає 1 на кадрі з онсетом; tempo() - темп ×10 уд./хв
+    (0 - невідомий), flash() - огинаюча спалаху 256..0 для рендеру, beats() - лічильник онсетів.
+
+      bpm_min, bpm_max - діапазон темпу
+      sens             - чутливість: множник відхилення потоку в порозі (більше - менше онсетів)
+      min_flux_db      - мінімальний потік онсету, dB (сума по смугах)
+      refractory_ms    - мінімальний інтервал між онсетами
+      flash_ms         - тривалість спаду спалаху після онсету
+      noise_db         - шумовий поріг (як neo_spectr.NOISE_THRESHOLD: поріг = -noise_db dBFS),
+                         число або послідовність по смугах
+    '''
+    NUM_IOI = 8             # скільки попередніх онсетів дають інтервали
+    BIN_MS = 10             # ширина біна гістограми інтервалів
+    MARGIN = 10             # біни за межами bpm_min..bpm_max (для центроїда біля країв діапазону)
+    AGE_MAX_US = 60_000_000 # вік онсету далі не росте
+
+    # індекси self.st
+    ST_MEAN, ST_DEV, ST_SINCE, ST_FLUX, ST_FLASH, ST_BPM10, ST_BEATS, ST_DT = range(8)
+
+    def __init__(self, bands, bpm_min=60, bpm_max=180, sens=1.5, min_flux_db=6.0,
+                 refractory_ms=150, flash_ms=150, noise_db=80):
+        self.bands = bands
+        self.prev = array.array('i', [0] * bands)     # рівні попереднього кадра, dBFS Q8
+        self.floor = array.array('i', [0] * bands)    # шумовий поріг смуг, dBFS Q8
+        self.ages = array.array('i', [self.AGE_MAX_US] * self.NUM_IOI)  # вік онсетів, мкс
+        lo = 60_000 // bpm_max // self.BIN_MS - self.MARGIN
+        hi = (60_000 // bpm_min + self.BIN_MS - 1) // self.BIN_MS + self.MARGIN
+        self.hist = array.array('i', [0] * (hi - lo + 1))  # вага інтервалів, Q8
+        self.st = array.array('i', [0] * 8)
+        self.st[self.ST_SINCE] = self.AGE_MAX_US
+        self.st[self.ST_DT] = 50_000    # середній період кадра, мкс (EMA)
+        # [sens Q8, min_flux Q8, refractory мкс, flash мкс, перший бін, тиша мкс]
+        self.prm = array.array('i', [0] * 6)
+        self.prm[0] = int(sens * 256)
+        self.prm[1] = int(min_flux_db * 256)
+        self.prm[2] = int(refractory_ms * 1000)
+        self.prm[3] = max(1, int(flash_ms * 1000))
+        self.prm[4] = lo
+        self.prm[5] = 4 * (hi - self.MARGIN) * self.BIN_MS * 1000
+        self.set_floor(noise_db)
+
+    def set_floor(self, noise_db):
+        # шумовий поріг смуг (поза циклом кадрів або при зміні профілю / калібруванні)
+        for i in range(self.bands):
+            v = noise_db if isinstance(noise_db, (int, float)) else noise_db[i]
+            self.floor[i] = -int(v * 256)
+            self.prev[i] = self.floor[i]
+
+    def tempo(self):
+        # темп ×10 уд./хв (1200 = 120 BPM), 0 - невідомий
+        return self.st[self.ST_BPM10]
+
+    def beats(self):
+        # кількість онсетів (за модулем 2^30)
+        return self.st[self.ST_BEATS]
+
+    def flash(self):
+        # огинаюча спалаху: 256 на кадрі онсету, лінійно до 0 за flash_ms
+        return self.st[self.ST_FLASH]
+
+    @micropython.viper
+    def update(self, db_in, dt_us: int) -> int:
+        # db_in: array('i') dBFS смуг (Q8), dt_us: час від попереднього кадра; 1 - онсет
+        src = ptr32(db_in)
+        prev = ptr32(self.prev)
+        fl = ptr32(self.floor)
+        st = ptr32(self.st)
+        prm = ptr32(self.prm)
+        ages = ptr32(self.ages)
+        nb = int(self.bands)
+
+        if dt_us > 1_000_000:   # довші кадри рахуються як 1 с
+            dt_us = 1_000_000
+        if dt_us < 0:
+            dt_us = 0
+
+        # --- спектральний потік ---
+        flux = 0
+        for i in range(nb):
+            d = int(src[i])
+            if d < fl[i]:
+                d = fl[i]
+            inc = d - prev[i]
+            if inc > 0:
+                flux += inc
+            prev[i] = d
+        st[3] = flux
+
+        # --- адаптивний поріг (до оновлення EMA цим кадром; стала EMA - 16 кадрів) ---
+        # в EMA іде потік, обрізаний порогом: періодичні удари не піднімають поріг
+        mean = st[0]
+        dev = st[1]
+        thr = mean + ((prm[0] * dev) >> 8) + prm[1]
+        f = flux
+        if f > thr:
+            f = thr
+        dif = f - mean
+        if dif < 0:
+            dif = 0 - dif
+        st[0] = mean + ((f - mean) >> 4)
+        st[1] = dev + ((dif - dev) >> 4)
+        st[7] = st[7] + ((dt_us - st[7]) >> 3)
+
+        # --- вік подій (з обмеженням: без переповнень) ---
+        for j in range(8):
+            a = ages[j] + dt_us
+            if a > 60_000_000:
+                a = 60_000_000
+            ages[j] = a
+        since = st[2] + dt_us
+        silence = prm[5]
+        if since >= silence and st[2] < silence:
+            # довга тиша: темп невідомий
+            self._clear()
+        if since > 60_000_000:
+            since = 60_000_000
+        st[2] = since
+
+        fls = st[4] - (dt_us << 8) // prm[3]
+        if fls < 0:
+            fls = 0
+        st[4] = fls
+
+        if flux <= thr or since < prm[2]:
+            return 0
+
+        # --- онсет ---
+        st[2] = 0
+        st[4] = 256
+        self._add_ioi()
+        j = 7
+        while j > 0:
+            ages[j] = ages[j - 1]
+            j -= 1
+        ages[0] = 0
+        st[5] = int(self._tempo())
+        st[6] = (st[6] + 1) & 0x3FFFFFFF
+        return 1
+
+    @micropython.viper
+    def _clear(self):
+        h = ptr32(self.hist)
+        for b in range(int(len(self.hist))):
+            h[b] = 0
+        ptr32(self.st)[5] = 0
+
+    @micropython.viper
+    def _add_ioi(self):
+        # забування (1/8 на онсет), далі інтервали до попередніх онсетів: ближчий - вага 256, далі /2
+        h = ptr32(self.hist)
+        ages = ptr32(self.ages)
+        nh = int(len(self.hist))
+        lo = ptr32(self.prm)[4]
+        for b in range(nh):
+            h[b] = h[b] - (h[b] >> 3)
+        for j in range(8):
+            b = (ages[j] // 1000 + 5) // 10 - lo
+            if b >= 0 and b < nh:
+                h[b] = h[b] + (256 >> j)
+
+    @micropython.viper
+    def _tempo(self) -> int:
+        # максимум гістограми, згладженої [1 2 1], далі центроїд -> темп ×10; час онсету
+        # квантований періодом кадра, тож центроїд - по ±(період кадра + 20 мс) навколо максимуму,
+        # з бінами MARGIN за краями діапазону
+        h = ptr32(self.hist)
+        nh = int(len(self.hist))
+        lo = ptr32(self.prm)[4]
+        best = 0
+        bi = 0
+        for b in range(10, nh - 10):    # максимум - лише в межах bpm_min..bpm_max (без MARGIN)
+            s = (h[b] << 1) + h[b - 1] + h[b + 1]
+            if s > best:
+                best = s
+                bi = b
+        if best < 768:
+            return 0    # замало узгоджених інтервалів
+        hw = ptr32(self.st)[7] // 10_000 + 2
+        w = 0
+        acc = 0
+        b = bi - hw
+        if b < 0:
+            b = 0
+        end = bi + hw + 1
+        if end > nh:
+            end = nh
+        while b < end:
+            w += h[b]
+            acc += h[b] * (b + lo)
+            b += 1
+        c = (acc << 4) // w     # центр, біни ×16
+        # 60 с / (c/16 * 10 мс), ×10
+        return 960_000 // c
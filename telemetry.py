@@ -0,0 +1,96 @@
+# Author: Oleksandr Teteria
+# v1.0.0
+# 17.10.2026
+# Implemented and tested on Pi Pico with RP2040
+# Released under the MIT license
+
+import time
+import array
+
+
+class Telemetry:
+    '''
+    Постійна телеметрія етапів кадра без print() у циклі.
+
+    Часи етапів (мкс) пишуться в передвиділене кільце array('i') на depth кадрів
+    для кожного етапу: record() - O(1), без алокацій. Кожен етап має писати
+    лише одне ядро (окремі індекси запису на етап, тому блокування не потрібне).
+    frame() фіксує момент завершення кадра (для FPS).
+
+    summary() / dump() рахують min/avg/p95/max по етапах і FPS - лише на запит
+    (алокують), наприклад по перемиканню піна (arm_pin()).
+    '''
+    def __init__(self, stages, depth=128):
+        self.stages = stages
+        self.nst = len(stages)
+        self.depth = depth
+        self.t = array.array('i', [0] * (depth * self.nst))
+        self.idx = array.array('H', [0] * self.nst)   # позиція запису по етапу
+        self.cnt = array.array('H', [0] * self.nst)   # заповнено значень (<= depth)
+
+        # моменти завершення кадрів (ticks_us)
+        self.ft = array.array('i', [0] * depth)
+        self.fidx = 0
+        self.fcnt = 0
+
+        self.dump_req = False
+
+    def record(self, stage, us):
+        i = self.idx[stage]
+        self.t[stage * self.depth + i] = us
+        i += 1
+        if i >= self.depth:
+            i = 0
+        self.idx[stage] = i
+        if self.cnt[stage] < self.depth:
+            self.cnt[stage] += 1
+
+    def frame(self, t_us):
+        i = self.fidx
+        self.ft[i] = t_us
+        i += 1
+        if i >= self.depth:
+            i = 0
+        self.fidx = i
+        if self.fcnt < self.depth:
+            self.fcnt += 1
+
+    def fps(self):
+        n = self.fcnt
+        if n < 2:
+            return 0.0
+        last = self.ft[(self.fidx - 1) % self.depth]
+        first = self.ft[(self.fidx - n) % self.depth]
+        dt = time.ticks_diff(last, first)
+        return (n - 1) * 1_000_000 / dt if dt > 0 else 0.0
+
+    def summary(self):
+        # [(етап, (min, avg, p95, max)), ...] по останніх depth значеннях, мкс
+        res = []
+        for s, name in enumerate(self.stages):
+            n = self.cnt[s]
+            if not n:
+                continue
+            base = s * self.depth
+            v = sorted(self.t[base:base + n])
+            res.append((name, (v[0], sum(v) // n, v[(n - 1) * 95 // 100], v[-1])))
+        return res
+
+    def dump(self):
+        print('stage       min     avg     p95     max  (us)')
+        for name, (mn, avg, p95, mx) in self.summary():
+            print('%-8s %6d  %6d  %6d  %6d' % (name, mn, avg, p95, mx))
+        print('FPS: %.1f' % self.fps())
+
+    def arm_pin(self, pin):
+        # запит dump() по спаду на піні (кнопка на GND); сам dump() - з основного циклу
+        pin.irq(trigger=pin.IRQ_FALLING, handler=self._on_pin)
+
+    def _on_pin(self, pin):
+        self.dump_req = True
+
+    def poll(self):
+        # викликати з основного циклу: друк по запиту з піна
+        if self.dump_req:
+            self.dump_req = False
+            self.dump()
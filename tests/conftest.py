@@ -0,0 +1,16 @@
+"""
+Хост-тести (CPython + pytest): модулі проєкту з кореня, модулі прошивки і заліза - з host/.
+
+  python3 -m pytest -q
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOST = os.path.join(ROOT, 'host')
+for _p in (ROOT, HOST):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+import micropython  # noqa: E402,F401  ptr8/16/32, time.ticks_* - до модулів проєкту
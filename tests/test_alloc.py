@@ -0,0 +1,54 @@
+"""
+Без алокацій у циклі кадра: Envelope.update(), Telemetry.record() / frame().
+
+gc.mem_alloc() хост-заміни (host/micropython.py) - утримана пам'ять tracemalloc: CPython звільняє
+тимчасові об'єкти (int, memoryview заміни ptr*) одразу, тож пік перевіряється окремо - він не має
+рости з кількістю викликів. На платі те саме показує стовпець алокацій bench_spectr.report().
+"""
+
+import array
+import gc
+import random
+import tracemalloc
+
+from envelope import Envelope
+from telemetry import Telemetry
+
+
+def _alloc(fn, n):
+    # (утримано байт, пік тимчасових байт) за n викликів fn(k)
+    fn(0)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        a0 = gc.mem_alloc()
+        tracemalloc.reset_peak()
+        for k in range(n):
+            fn(k)
+        return gc.mem_alloc() - a0, tracemalloc.get_traced_memory()[1] - a0
+    finally:
+        tracemalloc.stop()
+
+
+def _check(fn):
+    # порожній виклик - власні накладні tracemalloc і циклу
+    base, _ = _alloc(lambda k: None, 400)
+    held, peak = _alloc(fn, 20)
+    held2, peak2 = _alloc(fn, 2000)
+    # утримане не росте з кадрами (разові об'єкти вільних списків CPython - не більше кількох)
+    assert held2 - held <= 32 and held2 - base <= 256, (base, held, held2)
+    # пік - тимчасові об'єкти одного виклику (скаляри, memoryview у ptr*), він не росте з кадрами
+    assert peak2 - peak <= 64 and peak2 < 8192, (peak, peak2)
+
+
+def test_envelope_update_does_not_allocate():
+    env = Envelope(16, attack_ms=20, release_ms=120, hold_ms=300, fall_lps=10)
+    rnd = random.Random(9)
+    frames = [array.array('H', [rnd.randrange(0, 16 << 8) for _ in range(16)]) for _ in range(8)]
+    dts = array.array('i', [rnd.randrange(5_000, 400_000) for _ in range(8)])
+    _check(lambda k: env.update(frames[k & 7], dts[k & 7]))
+
+
+def test_telemetry_record_does_not_allocate():
+    tm = Telemetry(('cap', 'fft', 'copy', 'wait'), depth=32)
+    _check(lambda k: (tm.record(k & 3, 1000 + k), tm.frame(40_000 * k)))
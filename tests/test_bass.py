@@ -0,0 +1,67 @@
+import array
+import math
+
+import numpy as np
+import pytest
+
+import adc_dma
+import bench_spectr as bs
+import sim_cores
+
+BASS_BANDS = 7   # hi-res: смуги 0..6 (до BASS_FMAX) - з bass-спектра
+
+
+def _levels(f, decim, frames=16):
+    # безперервний синус f через core0_main_loop() ('stream'): dBFS смуг останнього слота
+    ns = sim_cores.load(CAPTURE_MODE='stream', BASS_DECIM=decim, PROFILE='hi-res')
+    adc_dma.reset(lambda t, fs: int(round(2048 + 1000 * math.sin(2 * math.pi * f * t / fs))))
+    adc_dma.realtime = 0.0
+    ns._wait_slot = lambda k: None   # без Core1: слоти не чекаються
+    try:
+        ns.core0_main_loop(frames)
+    finally:
+        ns.adc.close()
+    e = array.array('f', [0.0] * ns.NUM_BAND)
+    ns.band_energies(ns.spec_slots[(frames - 1) % ns.NUM_SLOTS], ns.BAND_EDGES, e, ns.NUM_BAND)
+    return [ns.energy_dbfs(x) for x in e]
+
+
+def _separation(decim):
+    # тон на 0.3 / 0.5 / 0.7 ширини кожної низької смуги: рівень смуги тону мінус найгучніша сусідня, dB
+    ns = sim_cores.load(PROFILE='hi-res')
+    hz = ns.SAMPLE_FREQ / ns.FFT_SIZE
+    sep = []
+    for b in range(BASS_BANDS):
+        lo, hi = ns.BAND_EDGES[2 * b] * hz, ns.BAND_EDGES[2 * b + 1] * hz
+        for q in (0.3, 0.5, 0.7):
+            db = _levels(lo + q * (hi - lo), decim)
+            sep.append((b, db[b] - max(db[j] for j in (b - 1, b + 1) if j >= 0)))
+    return sep
+
+
+def test_bass_sweep_separates_adjacent_bands():
+    off = _separation(0)
+    on = _separation(8)
+    # смуги в один-два біни основного FFT: тон біля межі гучніший у сусідній смузі
+    assert min(s for b, s in off) < 0
+    # bass-спектр (біни удвічі вужчі: 40000 / (256 * 8) = 19.5 Гц проти 40000 / 1024 = 39 Гц):
+    # тон найгучніший у своїй смузі; смуга 6 межує з основним FFT (смуга 7), її верхній край - як без BASS_DECIM
+    assert all(s > 0.5 for b, s in on if b < BASS_BANDS - 1), on
+    assert np.mean([s for b, s in on]) - np.mean([s for b, s in off]) >= 8, (on, off)
+
+
+def test_burst_rejects_bass():
+    with pytest.raises(ValueError):
+        sim_cores.load(CAPTURE_MODE='burst', BASS_DECIM=8)
+
+
+def test_benches_read_bass_bands(monkeypatch):
+    # межі низьких смуг вказують за SPEC_MAX: бенчмарки будують слот основний + bass-спектр
+    ns = sim_cores.load(CAPTURE_MODE='stream', BASS_DECIM=8, PROFILE='hi-res')
+    monkeypatch.setattr(bs, 'ns', ns)
+    p_fft, p_dft, err = bs.compare_analysis(frames=4, f=150)
+    assert max(err) < 1.0
+    with pytest.raises(ValueError):
+        bs.compare_analysis(frames=1, mode='int')
+    res = bs.bench_onset((120,), seconds=2)
+    assert res[120][2] > 0
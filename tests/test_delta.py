@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+import bench_spectr as bs
+from neo_matrix import NeoMatrixFast, BufferOutput
+
+
+def _pair(**kw):
+    # той самий рушій bars: delta-рендер і повний рендер кожного кадра
+    order = kw.get('order', 'GRB')
+    out = [NeoMatrixFast(row=16, col=16, neo_pin=20, delta=d, output=BufferOutput(256, len(order)), **kw)
+           for d in (True, False)]
+    for nm in out:
+        nm.clear()
+    return out
+
+
+def _replay(frames, **kw):
+    # кадри (lvl, peak, show_peaks): buf delta-рендеру після кожного кадра - байт у байт як повний
+    d, f = _pair(**kw)
+    prev = None
+    changed = 0
+    for k, (lvl, peak, show) in enumerate(frames):
+        d.fill_spectrum_buf(lvl, peak, show)
+        f.fill_spectrum_buf(lvl, peak, show)
+        assert d.buf == f.buf, k
+        if prev == (lvl, peak, show):
+            assert d.unchanged, k    # np.write() пропускається
+        changed += not d.unchanged
+        prev = (bytearray(lvl), bytearray(peak), show)
+    return changed
+
+
+def _random_frames(seed, count=300, m=16, n=16):
+    # випадкові кадри з повторами окремих стовпців і цілих кадрів, рівні поза 0..n і пік 0 / 1
+    rnd = random.Random(seed)
+    lvl = bytearray(m)
+    peak = bytearray(m)
+    frames = []
+    for k in range(count):
+        if rnd.random() >= 0.1:
+            for j in rnd.sample(range(m), rnd.randint(1, m)):
+                lvl[j] = rnd.choice((0, 1, n, n + 3, rnd.randint(0, n)))
+                peak[j] = rnd.choice((0, 1, lvl[j], min(255, lvl[j] + rnd.randint(0, 4)), rnd.randint(0, n)))
+        frames.append((bytearray(lvl), bytearray(peak), rnd.random() >= 0.1))
+    return frames
+
+
+@pytest.mark.parametrize('kw', [
+    {},
+    {'order': 'RGBW', 'brightness': 90, 'gamma': 2.2},
+    {'layout': {'rotate': 90, 'panel': (8, 16)}},
+    {'layout': {'order': 'cols', 'flip_y': True}},
+])
+def test_delta_matches_full_render_random(kw):
+    _replay(_random_frames(5), **kw)
+
+
+@pytest.mark.parametrize('signal', ['music', 'pink'])
+def test_delta_matches_full_render_traces(signal):
+    traces = bs.band_traces(signal, 120)
+    frames = [(lvl, peak, True) for lvl, peak in traces]
+    # утримання і спад піків: частина кадрів повторює попередній - delta пропускає їх повністю
+    frames += [frames[-1]] * 3
+    assert _replay(frames) < len(frames)
+
+
+def test_bench_delta_saves_fill():
+    nm = NeoMatrixFast(row=16, col=16, neo_pin=20, delta=True, output=BufferOutput(256))
+    nm.clear()
+    ref = NeoMatrixFast(row=16, col=16, neo_pin=20, output=BufferOutput(256))
+    full, delta, saved, same = bs.bench_delta(60, 'music', nm=nm)
+    assert full > 0 and saved > 0 and delta < full
+    # після виміру buf відповідає стану delta-рендеру (повний рендер у вимірі його не псує)
+    ref.fill_spectrum_buf(nm._prev_spec, nm._prev_max)
+    assert nm.buf == ref.buf and any(nm._prev_spec)
@@ -0,0 +1,20 @@
+import pytest
+
+import bench_spectr as bs
+import sim_cores
+
+TOL_DB = 0.5   # max |рівень смуги DFT - рівень смуги rfft()|, dB (смуги вище -90 dBFS і в межах 60 dB від найгучнішої)
+# кадрів на сигнал: тон 1 кГц не змінюється, свіп (x1.2 за кадр від 1 кГц) за 20 кадрів проходить до Fs/2 і знову з 40 Гц
+FRAMES = {'sine': 4, 'sweep': 20, 'pink': 8}
+
+
+@pytest.mark.parametrize('profile', ['hi-res', 'balanced', 'low-latency'])
+@pytest.mark.parametrize('signal', ['sine', 'sweep', 'pink'])
+def test_dft_bank_matches_fft(monkeypatch, profile, signal):
+    # банк DFT з усіма бінами смуг (DFT_BAND_BINS = 0) проти rfft() на тих самих кадрах
+    ns = sim_cores.load(PROFILE=profile, ANALYSIS='dft')
+    monkeypatch.setattr(bs, 'ns', ns)
+    _, _, err = bs.compare_analysis(signal, frames=FRAMES[signal])
+    assert len(err) == ns.NUM_BAND
+    for b, e in enumerate(err):
+        assert e <= TOL_DB, (profile, signal, b, err)
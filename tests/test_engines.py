@@ -0,0 +1,79 @@
+import array
+import random
+
+import bench_spectr as bs
+from neo_matrix import NeoMatrixFast, BufferOutput
+
+
+def _bench(frames=60, runs=3):
+    # найкраща p50 з кількох прогонів bench_engines() (хост ділить CPU з іншими процесами)
+    best = {}
+    for _ in range(runs):
+        nm = NeoMatrixFast(row=16, col=16, neo_pin=20, output=BufferOutput(256))
+        for name, (p50, p95, mx) in bs.bench_engines(frames, nm=nm).items():
+            best[name] = min(best.get(name, p50), p50)
+    return best
+
+
+def test_engines_within_viper2_budget():
+    # час інтерпретатора хоста, а не плати: порівнюються лише відношення до _apply_spec_viper2()
+    res = _bench()
+    ref = res.pop('viper2 (ref)')
+    assert set(NeoMatrixFast.ENGINES) <= set(res)
+    for name, p50 in res.items():
+        assert p50 <= 3.0 * ref, (name, p50, ref)
+    assert res['bars'] <= 1.5 * ref
+
+
+def _check_waterfall(nm, history):
+    # рядок i (0 - верх) показує кадр history[-1 - i]; старіші за історію рядки - рівень 0
+    n, m, bpp = nm.n, nm.m, nm.bpp
+    for i in range(n):
+        row = history[-1 - i] if i < len(history) else bytearray(m)
+        for j in range(m):
+            o = nm.off[j * n + i]
+            p = bpp * min(row[j], n)
+            assert nm.buf[o:o + bpp] == nm.cmap[p:p + bpp], (len(history), i, j, row[j])
+
+
+def test_waterfall_scroll_across_wraparound():
+    rnd = random.Random(17)
+    for layout, delta in (({}, False), ({}, True), ({'rotate': 90, 'panel': (8, 16)}, True)):
+        nm = NeoMatrixFast(row=16, col=16, neo_pin=20, delta=delta, output=BufferOutput(256),
+                           layout=layout)
+        nm.set_engine('waterfall')
+        nm.clear()
+        history = []
+        # кілька обертів кільця з n+1 рядків: head проходить через 0 тричі
+        for k in range(3 * (nm.n + 1) + 5):
+            if k % 9 == 4:
+                lvl = bytearray(history[-1])     # повтор кадра: зсув є, змінених пікселів менше
+            else:
+                lvl = bytearray(rnd.choice((0, rnd.randint(0, 20))) for _ in range(nm.m))
+            if k == 30:
+                # інший рушій і назад: повний рендер з тієї ж історії
+                nm.set_engine('bars')
+                nm.fill_spectrum_buf(lvl, lvl)
+                nm.set_engine('waterfall')
+            nm.fill_spectrum_buf(lvl, lvl)
+            history.append(lvl)
+            _check_waterfall(nm, history)
+        assert 0 <= nm._head <= nm.n
+
+
+def test_subpixel_cost_and_resolution():
+    # ціна sub-pixel стовпців - як у цілочисельного рендеру (хост: відношення до _apply_spec_viper2())
+    res = _bench()
+    assert res['subpixel'] <= 1.5 * res['viper2 (ref)'], res
+
+    # різних станів стовпця на всьому діапазоні рівнів 8.8 (ціле - лише n + 1 = 17)
+    for brightness, at_least in ((32, 256), (255, 2048)):
+        nm = NeoMatrixFast(row=16, col=1, neo_pin=20, output=BufferOutput(16), brightness=brightness)
+        nm.set_subpixel(True)
+        q8 = array.array('i', [0])
+        states = set()
+        for v in range((nm.n << 8) + 1):
+            q8[0] = v
+            nm._render_subpixel(q8, bytearray(1))
+            states.add(bytes(nm.buf))
+        assert len(states) >= at_least, (brightness, len(states))
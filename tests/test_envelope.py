@@ -0,0 +1,77 @@
+import array
+import random
+
+import pytest
+
+from envelope import Envelope
+
+BANDS = 4
+SLOT_US = 1_000_000 / 15    # сигнал змінюється лише на межах кадрів 15 FPS (спільні моменти всіх FPS)
+SECONDS = 4
+TOL_LVL_Q8 = 16             # стовпець: 1/16 рівня
+# пік: утримання починається в кадрі, де стовпець дійшов до цілі, тобто з точністю до кадра 15 FPS;
+# за цей кадр пік може спасти на fall_lps / 15 рівня
+
+
+def _signal(seed=3):
+    # рівні 8.8 по смугах на кожен проміжок 1/15 с: меандр, сходинки, випадкові стрибки, тиша після тону
+    rnd = random.Random(seed)
+    slots = int(SECONDS * 15)
+    sig = []
+    for s in range(slots):
+        sig.append((4096 if (s // 6) & 1 else 256,
+                    (s // 2 % 8) * 512,
+                    rnd.randrange(0, 4097),
+                    3000 if s < 20 else 0))
+    return sig
+
+
+def _run(fps, sig, **times):
+    # кадр у момент t бачить сигнал проміжку (t - dt, t]; вертає {t: (lvl_q8, peak_q8)}
+    env = Envelope(BANDS, **times)
+    src = array.array('H', [0] * BANDS)
+    res = {}
+    prev = 0
+    for k in range(1, SECONDS * fps + 1):
+        t = k * 1_000_000 // fps
+        src[:] = array.array('H', sig[int((t - 1) // SLOT_US)])
+        env.update(src, t - prev)
+        prev = t
+        res[t] = (list(env.lvl_q8), list(env.peak_q8))
+    return res
+
+
+@pytest.mark.parametrize('times', [
+    {'attack_ms': 20, 'release_ms': 120, 'hold_ms': 300, 'fall_lps': 8.0},
+    {'attack_ms': 45, 'release_ms': 400, 'hold_ms': 90, 'fall_lps': 24.0},
+])
+def test_same_visuals_at_15_30_60_fps(times):
+    sig = _signal()
+    runs = {fps: _run(fps, sig, **times) for fps in (15, 30, 60)}
+    shared = sorted(runs[15])
+    assert all(t in runs[30] and t in runs[60] for t in shared)
+    worst_lvl = worst_peak = 0
+    for t in shared:
+        lvl15, pk15 = runs[15][t]
+        for fps in (30, 60):
+            lvl, pk = runs[fps][t]
+            worst_lvl = max(worst_lvl, max(abs(a - b) for a, b in zip(lvl, lvl15)))
+            worst_peak = max(worst_peak, max(abs(a - b) for a, b in zip(pk, pk15)))
+    assert worst_lvl <= TOL_LVL_Q8, worst_lvl
+    assert worst_peak <= times['fall_lps'] * 256 / 15, worst_peak
+
+
+def test_peak_falls_at_set_rate():
+    # після утримання пік спадає fall_lps рівнів/с незалежно від кроку кадра (і кадрів коротших за 1 мс)
+    for fps in (15, 60, 144, 1500):
+        env = Envelope(1, hold_ms=0, fall_lps=8.0)
+        src = array.array('H', [16 << 8])
+        env.update(src, 1000)
+        src[0] = 0
+        prev = 0
+        for k in range(1, fps + 1):
+            t = k * 1_000_000 // fps
+            env.update(src, t - prev)
+            prev = t
+        # за 1 с: 16 - 8 рівнів
+        assert abs(env.peak_q8[0] - (8 << 8)) <= 1, (fps, env.peak_q8[0])
@@ -0,0 +1,109 @@
+import array
+
+import numpy as np
+
+import adc_dma
+import sim_cores
+
+N = 1024
+
+
+def _run(ns, raw_frames):
+    # кадри сирих семплів через front_capture(), як у 'burst': (вихід, кліпінгів, підсилення) кожного кадра
+    src = array.array('H', [0] * N)
+    out = array.array('h', [0] * N)
+    res = []
+    for raw in raw_frames:
+        src[:] = array.array('H', raw)
+        clips = ns.front_st[4]
+        ns.front_capture(out, src, 0, N)
+        res.append((np.array(out, dtype=np.float64), ns.front_st[4] - clips, ns.front_st[3] / 256))
+    return res
+
+
+def _sine(k0, frames, f, amp, offset, fs):
+    t = np.arange(k0 * N, (k0 + frames) * N)
+    x = np.round(offset + amp * np.sin(2 * np.pi * f * t / fs)).astype(int)
+    return [x[k * N:(k + 1) * N] for k in range(frames)]
+
+
+def test_offset_step_settles():
+    ns = sim_cores.load(FRONT_END=True, PROFILE='hi-res')
+    fs = ns.SAMPLE_FREQ
+    # 1250 Гц - ціле число періодів у кадрі: середнє виходу - лише залишок зміщення
+    res = _run(ns, _sine(0, 10, 1250, 500, 2048, fs) + _sine(10, 20, 1250, 500, 2600, fs))
+    means = [np.mean(out) for out, clips, g in res]
+    assert all(abs(m) <= 60 for m in means[2:10]), means
+    # стрибок зміщення 2048 -> 2600 кодів видно у виході, IIR відпрацьовує його за кілька кадрів
+    assert abs(means[10]) > 1000, means[10]
+    assert all(abs(m) <= 60 for m in means[15:]) and abs(means[-1]) <= 5, means
+    assert sum(clips for out, clips, g in res) == 0
+    dc, pk, rms, g, clips = ns.front_stats()
+    assert abs(dc - 2600) < 5 and abs(rms - 500 * 16 / 2 ** 0.5) < 0.05 * 500 * 16 / 2 ** 0.5, (dc, rms)
+
+
+def test_clipping_drops_gain():
+    ns = sim_cores.load(FRONT_END=True, PROFILE='hi-res')
+    ns.front_st[3] = 8 * 256
+    res = _run(ns, _sine(0, 6, 1000, 2047, 2048, ns.SAMPLE_FREQ))
+    out, clips, g = res[0]
+    # підсилення 8 на всю шкалу ADC: більшість семплів обмежено до меж int16, без загортання знака
+    assert clips > N // 2 and out.max() == 32767 and out.min() == -32768
+    assert g < 0.35
+    assert all(clips == 0 for out, clips, g in res[1:])
+    assert ns.front_st[4] == res[0][1]
+    # після падіння підсилення пік виходу - біля FRONT_TARGET
+    assert abs(np.max(np.abs(res[-1][0])) - ns.FRONT_TARGET) < 0.1 * ns.FRONT_TARGET
+
+
+def test_mean_square_does_not_overflow():
+    # повільне зміщення (2^-16 на семпл) і стрибок 0 -> 4095: |y| тримається біля 2^16 багато кадрів,
+    # y * y > 2^31 - середній квадрат рахується від y / 2
+    ns = sim_cores.load(FRONT_END=True, PROFILE='hi-res', FRONT_DC_SHIFT=16)
+    ns.front_st[0] = 0
+    _run(ns, [np.full(N, 4095)] * 8)
+    assert 0 <= ns.front_st[2] < 2 ** 30
+    dc, pk, rms, g, clips = ns.front_stats()
+    # зміщення за 8 кадрів пройшло ≈ 12% стрибка
+    assert 0.8 * 4095 * 16 < rms < 4096 * 16, rms
+
+
+class _Recorder:
+    # замість fastfft: копія кожного вікна rfft()
+    def __init__(self, n):
+        self.out = array.array('f', [0.0] * (n // 2 + 1))
+        self.windows = []
+
+    def rfft(self, buf, window=True):
+        self.windows.append(np.array(buf, dtype=np.float64))
+        return memoryview(self.out)
+
+
+def test_burst_reads_raw_samples_from_adc_ring():
+    ns = sim_cores.load(FRONT_END=True, PROFILE='hi-res')
+    fs, frames = ns.SAMPLE_FREQ, 12
+    # 2 -> 5 кГц без повторів фази: вікно з іншим зсувом не підходить
+    t = np.arange((frames + 1) * N)
+    raw = np.round(2048 + 1500 * np.sin(2 * np.pi * np.cumsum(2000 + 3000 * t / len(t)) / fs)).astype(int)
+    adc_dma.reset(lambda t, fs: int(raw[t]))
+    adc_dma.realtime = 0.0
+    rec = _Recorder(ns.FFT_MAX)
+    ns.fastfft = rec
+    ns._wait_slot = lambda k: None   # без Core1: слоти не чекаються
+    try:
+        ns.core0_main_loop(frames)
+    finally:
+        ns.adc.close()
+
+    def err(w, e):
+        x = raw[e - N:e]
+        a, b = np.linalg.lstsq(np.stack([x, np.ones(N)], 1), w, rcond=None)[0]
+        return np.max(np.abs(w - a * x - b))
+
+    assert len(rec.windows) == frames
+    for k, w in enumerate(rec.windows[1:], 1):
+        # кадр k - семпли k * N .. (k + 1) * N джерела (захвати без пауз на хості), одне підсилення і зміщення
+        e = (k + 1) * N
+        peak = np.max(np.abs(w))
+        assert err(w, e) <= 0.01 * peak, k
+        assert err(w, e - 1) > 0.1 * peak
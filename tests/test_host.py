@@ -0,0 +1,56 @@
+import array
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+import fastfft
+from conftest import ROOT, HOST
+
+
+def _run(args, cwd):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join((HOST, ROOT)))
+    return subprocess.run([sys.executable] + args, cwd=cwd, env=env,
+                          capture_output=True, text=True, timeout=300)
+
+
+def test_import_writes_no_files(tmp_path):
+    # профілі без IND_BANDS рахують план смуг; кеш band_plan_*.bin пише лише save_band_plans()
+    r = _run(['-c', 'import micropython, neo_spectr, bench_spectr; print(neo_spectr.PROFILE)'], tmp_path)
+    assert r.returncode == 0, r.stderr
+    assert os.listdir(tmp_path) == []
+
+
+def test_save_band_plans_once(tmp_path):
+    code = ('import micropython, neo_spectr as ns, os; ns.save_band_plans(); '
+            't = {f: os.stat(f).st_mtime_ns for f in os.listdir()}; ns.save_band_plans(); '
+            'print(sorted(t), t == {f: os.stat(f).st_mtime_ns for f in os.listdir()})')
+    r = _run(['-c', code], tmp_path)
+    assert r.returncode == 0, r.stderr
+    assert r.stdout.split() == ["['band_plan_balanced.bin',", "'band_plan_low-latency.bin']", 'True']
+
+
+def test_bench_entry_point(tmp_path):
+    r = _run([os.path.join(HOST, 'bench.py'), '2'], tmp_path)
+    assert r.returncode == 0, r.stderr
+    assert 'FPS' in r.stdout
+    # T_core1 з попереднім і поточним build_band_spectr() для кожного профілю
+    assert r.stdout.count('T_core1: ref') == 1 and all(p in r.stdout for p in ('low-latency', 'balanced', 'hi-res'))
+    assert os.listdir(tmp_path) == []
+
+
+def test_fastfft_normalisation():
+    # |X|^2 / (N * sum(w^2)), вікно Ханна (періодичне): повномасштабний синус на біні - 32767^2 / 4
+    n = 1024
+    rng = np.random.default_rng(1)
+    x = rng.integers(-20_000, 20_000, n)
+    w = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n) / n)
+    ref = np.abs(np.fft.rfft(x * w)) ** 2 / (n * np.sum(w * w))
+    got = np.array(fastfft.rfft(array.array('h', x.tolist()), True))
+    assert np.allclose(got, ref, rtol=1e-5, atol=1e-3)
+
+    s = array.array('h', [int(32767 * np.sin(2 * np.pi * 64 * k / n)) for k in range(n)])
+    spec = fastfft.rfft(s, True)
+    # (A^2 / 2 - середній квадрат, половина - у додатних частотах)
+    assert abs(spec[63] + spec[64] + spec[65] - 32767 ** 2 / 4) / (32767 ** 2 / 4) < 1e-3
@@ -0,0 +1,66 @@
+import array
+
+import numpy as np
+import pytest
+
+import sim_cores
+
+
+def _ref_db(ns, x):
+    # float64: те саме вікно Ханна (періодичне) і нормалізація, що й fastfft.rfft() + energy_dbfs();
+    # вертає (dBFS смуг, dBFS усього сигналу)
+    n = len(x)
+    w = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n) / n)
+    p = np.abs(np.fft.rfft(np.asarray(x, dtype=np.float64) * w)) ** 2 / (n * np.sum(w * w))
+    e = np.array([p[ns.BAND_EDGES[2 * b]:ns.BAND_EDGES[2 * b + 1]].sum() for b in range(ns.NUM_BAND)])
+    with np.errstate(divide='ignore'):
+        return 10 * np.log10(2 * e / ns.FS_RMS2), 10 * np.log10(2 * p.sum() / ns.FS_RMS2)
+
+
+def _int_db(ns, x):
+    buf = array.array('h', x)
+    db = array.array('i', [0] * ns.NUM_BAND)
+    ns._fx_bands(db, ns.fx_re, ns.fx_im, ns.fx_analyze(buf))
+    return np.array(db, dtype=np.float64) / 256
+
+
+def _signals(ns, rnd):
+    n, fs = ns.FFT_SIZE, ns.SAMPLE_FREQ
+    t = np.arange(n) / fs
+    yield 'full-scale sine', 32767 * np.sin(2 * np.pi * 997 * t)
+    # межі блокової плаваючої коми: повна шкала в усіх семплах
+    yield 'square', np.where((np.arange(n) // 8) % 2, 32767, -32768)
+    yield 'dc', np.full(n, -32768)
+    yield 'noise', rnd.integers(-32768, 32768, n)
+    for k in range(8):
+        # кілька тонів на різних рівнях + білий і "рожевий" шум: перепад між смугами до ~60 dB
+        tones = sum(10 ** (-rnd.uniform(0, 3)) * np.sin(2 * np.pi * rnd.uniform(40, fs / 2.2) * t
+                                                       + rnd.uniform(0, 6.3)) for _ in range(5))
+        white = rnd.normal(0, 10 ** -rnd.uniform(2.0, 3.5), n)
+        pink = np.cumsum(rnd.normal(0, 10 ** -rnd.uniform(2.5, 3.5), n))
+        pink -= np.linspace(pink[0], pink[-1], n)
+        x = tones + white + pink
+        yield 'mix %d' % k, 20000 * x / np.max(np.abs(x))
+
+
+@pytest.mark.parametrize('profile', ['hi-res', 'balanced', 'low-latency'])
+def test_int_pipeline_against_float64(profile):
+    # похибка блокової плаваючої коми - від рівня всього блоку (з позасмуговими DC і низами),
+    # тож межа 60 dB рахується від повного рівня сигналу, а не від найгучнішої смуги
+    ns = sim_cores.load(INT_PIPELINE=True, PROFILE=profile)
+    worst = [0.0, 0.0]
+    for name, x in (sx for seed in range(12) for sx in _signals(ns, np.random.default_rng(seed))):
+        x = np.clip(np.round(x), -32768, 32767).astype(int)
+        ref, total = _ref_db(ns, x)
+        got = _int_db(ns, list(x))
+        if name == 'full-scale sine':
+            # опорний рівень FS_RMS2: повномасштабний синус - 0 dBFS у смузі тону
+            b = int(np.argmax(ref))
+            assert abs(got[b]) <= 0.5 and abs(got[b] - ref[b]) <= 0.5, (got[b], ref[b])
+        for b in range(ns.NUM_BAND):
+            if ref[b] >= total - 60:
+                err = abs(got[b] - ref[b])
+                z = 0 if ref[b] >= total - 50 else 1
+                worst[z] = max(worst[z], err)
+                assert err <= 0.5, (name, b, total, ref[b], got[b])
+    assert worst[0] > 0 and worst[1] > 0   # смуги в межах 50 і 50..60 dB справді перевірені
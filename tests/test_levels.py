@@ -0,0 +1,70 @@
+import array
+
+import pytest
+
+import bench_spectr as bs
+import fastfft
+import sim_cores
+from neo_matrix import NeoMatrixFast, BufferOutput
+
+
+def _record(ns, path, frames=48):
+    # спектри синуса, розгортки і рожевого шуму з рівнем, що спадає на 50 dB і повертається
+    # (працюють поріг шуму, ріст і спад AGC), записані save_spectrum() і прочитані load_spectrum()
+    buf = array.array('h', [0] * ns.FFT_SIZE)
+    pink = bs.PinkNoise(seed=4)
+    phase = 0.0
+    specs = []
+    for k in range(frames):
+        amp = bs.AMP * 10 ** (-2.5 * abs(((k % 24) - 12) / 12))
+        if k < frames // 3:
+            phase = bs.make_sine(buf, 1000, phase, amp)
+        elif k < 2 * frames // 3:
+            phase = bs.make_sine(buf, 60 * 1.25 ** (k % 24), phase, amp)
+        else:
+            pink.scale = amp / (8 * 2048)
+            pink.fill(buf)
+        ns.save_spectrum(fastfft.rfft(buf, True), path)
+        specs.append(ns.load_spectrum(path))
+    return specs
+
+
+@pytest.mark.parametrize('cfg', [{}, {'GAMMA': 1.0, 'SCALE_MIN_DB': 12.0}, {'SCALE_DECAY_DB_S': 200.0}])
+def test_fixed_point_levels_match_float(tmp_path, cfg):
+    ns = sim_cores.load(**cfg)
+    nm = NeoMatrixFast(row=16, col=ns.NUM_BAND, neo_pin=20, output=BufferOutput(16 * ns.NUM_BAND))
+    ref = bytearray(ns.NUM_BAND)
+    out = bytearray(ns.NUM_BAND)
+    ceil = bytearray(ns.NUM_BAND)
+    q8 = array.array('i', [0] * ns.NUM_BAND)
+    lit = 0
+    for spec in _record(ns, str(tmp_path / 'spectrum.bin')):
+        ns.build_band_spectr(spec, ref, ns.DT_NOMINAL_US)
+        ns.build_band_spectr_fx(spec, out, ns.DT_NOMINAL_US)
+        # рівні 8.8 fixed-point шляху -> цілі, як для sub-pixel рендеру
+        q8[:] = array.array('i', ns.band_lvl_q8)
+        nm._ceil_levels(q8, ceil)
+        for b in range(ns.NUM_BAND):
+            assert abs(out[b] - ref[b]) <= 1, (b, list(ref), list(out))
+            assert abs(ceil[b] - ref[b]) <= 1, (b, list(ref), list(ceil))
+        lit += sum(1 for v in ref if v > 1)
+    assert lit > 100   # рівні справді рухались, а не стояли на порозі
+
+
+def test_subpixel_render_matches_levels():
+    # стовпець _render_subpixel(): floor(v) повних пікселів + частковий, разом - ceil(v) світлих
+    n, m = 16, 16
+    nm = NeoMatrixFast(row=n, col=m, neo_pin=20, output=BufferOutput(n * m))
+    q8 = array.array('i', [0] * m)
+    lvl = bytearray(m)
+    zero = bytearray(m)
+    for base in range(0, (n << 8) + 1, 37):
+        for j in range(m):
+            q8[j] = min(n << 8, base + 61 * j)
+        nm._ceil_levels(q8, lvl)
+        nm._render_subpixel(q8, zero)
+        for j in range(m):
+            col = [any(nm.buf[nm.off[j * n + i] + c] for c in range(3)) for i in range(n)]
+            lit = sum(col)
+            assert lit in (lvl[j], lvl[j] - 1), (q8[j], lit, lvl[j])
+            assert col == [False] * (n - lit) + [True] * lit
@@ -0,0 +1,59 @@
+import array
+import random
+
+import pytest
+
+import bench_spectr as bs
+import fastfft
+import noise_cal
+import sim_cores
+
+
+def _old_thresholds(db_sum, frames):
+    # попередній текстовий метод (NOISE_THRESHOLD.txt): сума float dBFS за кадри -> -(round(середнє) + 2)
+    return tuple(-(round(x / frames) + 2) for x in db_sum)
+
+
+@pytest.mark.parametrize('kind, amp', [('white', 40), ('white', 400), ('pink', 150)])
+def test_calibrator_matches_text_method(tmp_path, kind, amp):
+    ns = sim_cores.load()
+    frames = 200
+    cal = noise_cal.NoiseCalibrator(ns.NUM_BAND, frames)
+    buf = array.array('h', [0] * ns.FFT_SIZE)
+    rnd = random.Random(amp)
+    pink = bs.PinkNoise(amp=amp, seed=2)
+    db_sum = [0.0] * ns.NUM_BAND
+    done = False
+    for _ in range(frames):
+        if kind == 'pink':
+            pink.fill(buf)
+        else:
+            for k in range(len(buf)):
+                buf[k] = int(rnd.gauss(0, amp))
+        spec = fastfft.rfft(buf, True)
+        for b in range(ns.NUM_BAND):
+            db_sum[b] += ns.band_dbfs(spec, ns.BAND_EDGES[2 * b], ns.BAND_EDGES[2 * b + 1])
+        ns.band_energies(spec, ns.BAND_EDGES, ns.band_e, ns.NUM_BAND)
+        ns._bands_db_q8(ns.band_e, ns.band_db_q8, ns.NUM_BAND)
+        done = cal.add(ns.band_db_q8)
+    assert done
+
+    old = _old_thresholds(db_sum, frames)
+    new = cal.result()
+    # LUT log2 у Q8 проти math.log10: поріг може відрізнитися на 1 dB лише біля межі округлення
+    for b in range(ns.NUM_BAND):
+        assert abs(new[b] - old[b]) <= 1, (b, old, new)
+        mean = db_sum[b] / frames
+        if abs(mean - round(mean) - 0.5) > 0.05 and abs(mean - round(mean) + 0.5) > 0.05:
+            assert new[b] == old[b], (b, mean, old, new)
+
+    # перцентиль стійкіший до сплесків, але для стаціонарного шуму - поруч із середнім
+    p95 = cal.result(percentile=95)
+    for b in range(ns.NUM_BAND):
+        mean, std, p = cal.stats(b)
+        assert p95[b] <= new[b] + 1 and p95[b] >= new[b] - 3 * std - 2, (b, p95, new, std)
+
+    path = str(tmp_path / 'noise_cal.bin')
+    cal.save(ns.CAL_KEY, new, path)
+    assert noise_cal.load(ns.NUM_BAND, ns.CAL_KEY, path) == new
+    assert noise_cal.load(ns.NUM_BAND, (ns.CAL_KEY[0] + 1,) + tuple(ns.CAL_KEY[1:]), path) is None
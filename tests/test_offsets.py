@@ -0,0 +1,117 @@
+import itertools
+
+import pytest
+
+from neo_matrix import NeoMatrixFast, BufferOutput, make_offsets
+
+
+def _old_table(n, m):
+    # таблиця офсетів NeoMatrixFast до make_offsets(): "змійка" по рядках, перший світлодіод праворуч
+    off = [0] * (n * m)
+    for j in range(m):
+        for i in range(n):
+            pix = (m * i + j) if (i % 2) else (m - j - 1 + m * i)
+            off[j * n + i] = 3 * pix
+    return off
+
+
+@pytest.mark.parametrize('n, m', [(16, 16), (16, 32), (8, 24)])
+def test_default_equals_old_table(n, m):
+    assert list(make_offsets(n, m)) == _old_table(n, m)
+    nm = NeoMatrixFast(row=n, col=m, neo_pin=20, output=BufferOutput(n * m))
+    assert list(nm.off) == _old_table(n, m)
+
+
+def _panels(h, w):
+    # одна панель на всю матрицю і всі розбиття на рівні панелі зі сторонами 4 / 8
+    yield None
+    for ph in (4, 8):
+        for pw in (4, 8):
+            if h % ph == 0 and w % pw == 0 and (ph, pw) != (h, w):
+                yield (ph, pw)
+
+
+@pytest.mark.parametrize('n, m', [(8, 8), (8, 16), (16, 8)])
+@pytest.mark.parametrize('bpp', [3, 4])
+def test_bijective(n, m, bpp):
+    cases = 0
+    for order, serp, fx, fy, rot in itertools.product(('rows', 'cols'), (False, True), (False, True),
+                                                      (False, True), (0, 90, 180, 270)):
+        h, w = (m, n) if rot in (90, 270) else (n, m)
+        for panel in _panels(h, w):
+            off = make_offsets(n, m, order, serp, fx, fy, rot, panel, bpp)
+            # кожен логічний піксель - окремий світлодіод, усі n*m світлодіодів задіяні
+            assert sorted(off) == list(range(0, bpp * n * m, bpp)), (order, serp, fx, fy, rot, panel)
+            cases += 1
+    assert cases >= 2 * 2 * 2 * 2 * 4 * 2
+
+
+def test_rejects_bad_geometry():
+    with pytest.raises(ValueError):
+        make_offsets(16, 16, rotate=45)
+    with pytest.raises(ValueError):
+        make_offsets(16, 24, panel=(16, 16))
+
+
+def _at(off, n, pts, bpp=3):
+    # {(рядок, стовпець): номер світлодіода} для логічних пікселів pts
+    return {p: off[p[1] * n + p[0]] // bpp for p in pts}
+
+
+# кути й краї матриці 4 x 4 (рядок i зверху, стовпець j зліва) -> номер світлодіода в ланцюжку
+CORNERS = [(0, 0), (0, 3), (3, 0), (3, 3), (1, 0), (1, 3), (2, 3), (0, 1)]
+
+
+@pytest.mark.parametrize('kw, expect', [
+    # рядками зліва направо, без "змійки"
+    ({'serpentine': False, 'flip_x': False}, [0, 3, 12, 15, 4, 7, 11, 1]),
+    # "змійка" по рядках з лівого верхнього кута: непарні рядки - справа наліво
+    ({'flip_x': False}, [0, 3, 15, 12, 7, 4, 11, 1]),
+    # за замовчуванням: "змійка", перший світлодіод праворуч угорі
+    ({}, [3, 0, 12, 15, 4, 7, 8, 2]),
+    # перший світлодіод ліворуч унизу, рядки знизу вгору
+    ({'serpentine': False, 'flip_x': False, 'flip_y': True}, [12, 15, 0, 3, 8, 11, 7, 13]),
+    # стовпцями зверху вниз
+    ({'order': 'cols', 'serpentine': False, 'flip_x': False}, [0, 12, 3, 15, 1, 13, 14, 4]),
+    # "змійка" по стовпцях: непарні стовпці - знизу вгору
+    ({'order': 'cols', 'flip_x': False}, [0, 15, 3, 12, 1, 14, 13, 7]),
+    # "змійка" по стовпцях, перший світлодіод праворуч унизу: крайній правий стовпець - знизу вгору
+    ({'order': 'cols', 'flip_x': True, 'flip_y': True}, [12, 3, 15, 0, 13, 2, 1, 11]),
+])
+def test_single_panel_pixels(kw, expect):
+    assert _at(make_offsets(4, 4, **kw), 4, CORNERS) == dict(zip(CORNERS, expect))
+
+
+@pytest.mark.parametrize('rotate, expect', [
+    # логічна матриця 2 x 4; фізична (без розводки-змійки, рядками) - 2 x 4 або 4 x 2
+    (0, [0, 3, 4, 7]),
+    (90, [1, 7, 0, 6]),     # за годинниковою: лівий верхній кут -> правий верхній
+    (180, [7, 4, 3, 0]),
+    (270, [6, 0, 7, 1]),    # проти годинникової: лівий верхній кут -> лівий нижній
+])
+def test_rotate_pixels(rotate, expect):
+    off = make_offsets(2, 4, serpentine=False, flip_x=False, rotate=rotate)
+    pts = [(0, 0), (0, 3), (1, 0), (1, 3)]
+    assert _at(off, 2, pts) == dict(zip(pts, expect))
+
+
+def test_two_panels_32x16_pixels():
+    # дві панелі 16x16 поруч (за замовчуванням: "змійка" по рядках, перший світлодіод праворуч угорі)
+    off = make_offsets(16, 32, panel=(16, 16), bpp=4)
+    pts = [(0, 0), (0, 15), (0, 16), (0, 31), (1, 16), (15, 0), (15, 31), (15, 16)]
+    assert _at(off, 16, pts, bpp=4) == dict(zip(pts, [15, 0, 271, 256, 272, 240, 511, 496]))
+    # та сама пара панелей, повернута на 90°: логічна матриця 32 x 16
+    off = make_offsets(32, 16, rotate=90, panel=(16, 16))
+    pts = [(0, 0), (31, 0), (0, 15), (31, 15)]
+    assert _at(off, 32, pts) == dict(zip(pts, [256, 15, 511, 240]))
+
+
+def test_rendered_pixel_lands_on_led():
+    # стовпець 16 висотою 1 на 32x16: світиться лише нижній піксель другої панелі (світлодіод 496)
+    nm = NeoMatrixFast(row=16, col=32, neo_pin=20, output=BufferOutput(512),
+                       layout={'panel': (16, 16)})
+    lvl = bytearray(32)
+    lvl[16] = 1
+    nm.fill_spectrum_buf(lvl, bytearray(32))
+    lit = [p for p in range(512) if any(nm.buf[3 * p:3 * p + 3])]
+    assert lit == [496]
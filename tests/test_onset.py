@@ -0,0 +1,18 @@
+import pytest
+
+import bench_spectr as bs
+
+TEMPO_TOL = 1.5   # %, допуск оцінки темпу
+
+
+@pytest.mark.parametrize('bpms, frame_us, jitter_us', [
+    ((65, 90, 120, 150, 175), 60_000, 5_000),
+    ((120,), 40_000, 10_000),
+    ((100,), 25_000, 3_000),
+])
+def test_tempo_within_tolerance(bpms, frame_us, jitter_us):
+    # клік-треки bench_onset() (ClickTrack задає власне зерно random - прогін відтворюваний)
+    res = bs.bench_onset(bpms, seconds=15, frame_us=frame_us, jitter_us=jitter_us)
+    for bpm, (est, err, onsets, clicks, p50, mx, alloc) in res.items():
+        assert abs(err) <= TEMPO_TOL, (bpm, est)
+        assert abs(onsets - clicks) <= 1, (bpm, onsets, clicks)
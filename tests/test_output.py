@@ -0,0 +1,99 @@
+import os
+import random
+import subprocess
+import sys
+import time
+
+import rp2
+from conftest import ROOT, HOST
+from neo_matrix import NeoMatrixFast, NeoPixelOutput, PioDmaOutput, BufferOutput
+
+
+def _sent(out):
+    # байти останньої передачі: neopixel.write() / DMA / BufferOutput (host/)
+    if isinstance(out, NeoPixelOutput):
+        return out.np.last, out.np.frames
+    if isinstance(out, PioDmaOutput):
+        return out.dma.last, out.dma.frames
+    return bytes(out.last), out.frames
+
+
+def test_outputs_send_identical_bytes():
+    n, m = 16, 16
+    for order in ('GRB', 'GRBW'):
+        bpp = len(order)
+        outs = (NeoPixelOutput(20, n * m, bpp), PioDmaOutput(20, n * m, bpp=bpp), BufferOutput(n * m, bpp))
+        nms = [NeoMatrixFast(row=n, col=m, neo_pin=20, delta=True, output=o, order=order) for o in outs]
+        rnd = random.Random(6)
+        for k in range(60):
+            lvl = bytearray(rnd.randint(0, n) for _ in range(m))
+            peak = bytearray(max(v, rnd.randint(0, n)) for v in lvl)
+            if k % 7 == 3:
+                # незмінний кадр: delta пропускає write() на всіх виходах однаково
+                lvl, peak = prev
+            for nm in nms:
+                if k == 30:
+                    nm.set_engine('mirror')
+                nm.apply_spectrum_buf(lvl, peak)
+            sent = [_sent(o) for o in outs]
+            assert sent[0][0] is not None
+            assert sent[0] == sent[1] == sent[2], (order, k)
+            prev = lvl, peak
+        assert outs[2].frames < 60     # кадри без змін не передавались
+
+
+def test_neo_matrix_imports_without_rp2():
+    code = ('import sys; sys.modules["rp2"] = None; import micropython, neo_matrix; '
+            'nm = neo_matrix.NeoMatrixFast(16, 16, 20, output=neo_matrix.BufferOutput(256)); nm.clear(); '
+            'print(nm.np.frames)')
+    r = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                       env={'PYTHONPATH': os.pathsep.join((HOST, ROOT))})
+    assert r.returncode == 0, r.stderr
+    assert r.stdout.strip() == '1'
+
+
+def test_render_overlaps_transfer():
+    # цикл Core1: рендер кадра N+1 у buf, поки DMA передає кадр N з другого буфера
+    out = PioDmaOutput(20, 256)
+    nm = NeoMatrixFast(row=16, col=16, neo_pin=20, output=out)
+    rnd = random.Random(3)
+    frames = 12
+    fills = []
+    for k in range(frames):
+        lvl = bytearray(rnd.randint(0, 16) for _ in range(16))
+        busy = nm.busy()
+        t0 = time.ticks_us()
+        nm.fill_spectrum_buf(lvl, lvl)
+        fills.append((t0, time.ticks_us(), busy))
+        nm.np.write()
+        assert out.dma.last == bytes(nm.buf)
+    nm.wait()
+
+    log = out.dma.log
+    wire = 256 * 3 * rp2.byte_us
+    assert len(log) == frames and all(e - s == wire for s, e in log)
+    for k in range(1, frames):
+        s, e = log[k - 1]
+        f0, f1, busy = fills[k]
+        # рендер кадра k почався під час передачі кадра k - 1 і закінчився до передачі кадра k
+        assert busy and s <= f0 < e, k
+        assert f1 <= log[k][0], k
+        # наступна передача - лише після кінця попередньої і паузи latch
+        assert log[k][0] >= e + out.RESET_US, k
+    # кадр, що передається, не змінювався до кінця передачі
+    assert out.dma.torn == 0
+
+
+def test_transfer_detects_writes_to_sent_buffer():
+    # заміна DMA ловить запис у буфер, з якого ще йде передача (перевірка самої заміни)
+    out = PioDmaOutput(20, 256)
+    out.buf[0] = 1
+    out.write()
+    out.buf[0] = 2          # буфер рендеру: передачу не зачіпає
+    assert out.busy()
+    out.wait()
+    assert out.dma.torn == 0
+    out.write()
+    out._tx[0] = 3           # буфер передачі під час передачі
+    out.wait()
+    assert out.dma.torn == 1
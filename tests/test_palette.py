@@ -0,0 +1,119 @@
+import random
+
+import pytest
+
+from neo_matrix import NeoMatrixFast, BufferOutput
+
+N = M = 16
+
+# колишні вшиті кольори (RGB при яскравості 32), що видавались у GRB
+OLD_RED = (32, 0, 0)
+OLD_ORANGE = (24, 8, 0)
+OLD_YELLOW = (24, 16, 0)
+OLD_GREEN_YELLOW = (12, 20, 0)
+OLD_GREEN = (0, 32, 0)
+OLD_BLUE_LIGHT = (0, 16, 16)
+OLD_COLOR_MAX = (22, 0, 10)
+OLD_ZONES = (OLD_RED,) * 3 + (OLD_ORANGE,) * 3 + (OLD_YELLOW,) * 3 + \
+    (OLD_GREEN_YELLOW,) * 3 + (OLD_GREEN,) * 3 + (OLD_BLUE_LIGHT,)
+
+
+def _nm(order='GRB', **kw):
+    return NeoMatrixFast(row=N, col=M, neo_pin=20, output=BufferOutput(N * M, len(order)),
+                         order=order, **kw)
+
+
+def _px(nm, i, j):
+    # байти логічного пікселя (рядок i, стовпець j) у buf
+    o = nm.off[j * nm.n + i]
+    return tuple(nm.buf[o:o + nm.bpp])
+
+
+@pytest.mark.parametrize('brightness, gamma', [(32, 1.0), (255, 1.0), (128, 2.2), (0, 1.0), (200, 0.5)])
+def test_brightness_lut(brightness, gamma):
+    nm = _nm(brightness=brightness, gamma=gamma)
+    assert list(nm.lut) == [int(brightness * (v / 255) ** gamma + 0.5) for v in range(256)]
+    assert nm.lut[0] == 0 and nm.lut[255] == brightness
+    # set_brightness() у роботі: та сама таблиця, гамма зберігається, яскравість обрізається до 0..255
+    nm.set_brightness(64)
+    assert list(nm.lut) == [int(64 * (v / 255) ** gamma + 0.5) for v in range(256)]
+    nm.set_brightness(300)
+    assert nm.lut[255] == 255
+
+
+@pytest.mark.parametrize('order, expect', [
+    ('RGB', (200, 100, 50)),
+    ('GRB', (100, 200, 50)),
+    ('RGBW', (150, 50, 0, 50)),
+    ('GRBW', (50, 150, 0, 50)),
+])
+def test_palette_bytes_per_order(order, expect):
+    # brightness=255, gamma=1.0: LUT тотожний, видно лише порядок байтів і виділення W = min(R, G, B)
+    nm = _nm(order, brightness=255)
+    nm.set_palette(palette=[(0, 0, 0), (200, 100, 50)], row_idx=[1] * N, peak_idx=1)
+    assert bytes(nm.rowgrb) == bytes(expect) * N
+    assert tuple(nm.color_max) == expect
+    lvl = bytearray(M)
+    lvl[3] = 1
+    nm.fill_spectrum_buf(lvl, bytearray(M))
+    assert _px(nm, N - 1, 3) == expect
+    assert _px(nm, N - 2, 3) == (0,) * len(order)
+
+
+def test_rgbw_white_goes_through_lut():
+    nm = _nm('RGBW', brightness=128, gamma=2.2)
+    nm.set_palette(palette=[(0, 0, 0), (255, 255, 255), (255, 128, 64)],
+                   row_idx=[1] * (N - 1) + [2], peak_idx=1)
+    lut = nm.lut
+    assert tuple(nm.rowgrb[:4]) == (0, 0, 0, lut[255])
+    assert tuple(nm.rowgrb[-4:]) == (lut[191], lut[64], 0, lut[64])
+
+
+def test_default_palette_matches_old_colours():
+    # GRB, brightness=32, gamma=1.0 (за замовчуванням): ті самі байти, що й колишні вшиті кольори
+    nm = _nm()
+    assert bytes(nm.rowgrb) == b''.join(bytes((g, r, b)) for r, g, b in OLD_ZONES)
+    r, g, b = OLD_COLOR_MAX
+    assert tuple(nm.color_max) == (g, r, b)
+
+    # і весь кадр: стовпці кольорами зон рядків, пік - color_max
+    rnd = random.Random(5)
+    for _ in range(20):
+        lvl = bytearray(rnd.randint(0, N) for _ in range(M))
+        mx = bytearray(max(v, rnd.randint(0, N)) for v in lvl)
+        nm.fill_spectrum_buf(lvl, mx)
+        for j in range(M):
+            for i in range(N):
+                if mx[j] > 1 and i == N - mx[j]:
+                    r, g, b = OLD_COLOR_MAX
+                elif i >= N - lvl[j]:
+                    r, g, b = OLD_ZONES[i]
+                else:
+                    r, g, b = 0, 0, 0
+                assert _px(nm, i, j) == (g, r, b), (i, j)
+
+
+def test_row_and_peak_index_overrides():
+    nm = _nm('RGB', brightness=255)
+    pal = [(0, 0, 0), (10, 0, 0), (0, 20, 0), (0, 0, 30), (40, 40, 40)]
+    rows = [1, 2, 3] * 5 + [2]
+    nm.set_palette(palette=pal, row_idx=rows, peak_idx=4)
+    lvl = bytearray(M)
+    mx = bytearray(M)
+    lvl[0] = N        # повний стовпець
+    lvl[7] = 2
+    mx[7] = 9         # пік над стовпцем
+    nm.fill_spectrum_buf(lvl, mx)
+    for i in range(N):
+        assert _px(nm, i, 0) == pal[rows[i]], i
+    assert _px(nm, N - 1, 7) == pal[rows[N - 1]]
+    assert _px(nm, N - 2, 7) == pal[rows[N - 2]]
+    assert _px(nm, N - 9, 7) == pal[4]
+    assert _px(nm, N - 3, 7) == (0, 0, 0)
+    # лише пік нової палітри без зміни рядків
+    nm.set_palette(peak_idx=1)
+    nm.fill_spectrum_buf(lvl, mx)
+    assert _px(nm, N - 9, 7) == pal[1]
+    assert _px(nm, 0, 0) == pal[rows[0]]
+    with pytest.raises(ValueError):
+        nm.set_palette(row_idx=[1] * (N - 1))
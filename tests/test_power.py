@@ -0,0 +1,91 @@
+import array
+import itertools
+import random
+
+import pytest
+
+from neo_matrix import NeoMatrixFast, BufferOutput
+
+N = M = 16
+MA_PER_STEP = 20 / 255
+IDLE_MA = 1.0
+
+
+def _frame_ma(nm):
+    # струм кадра за тією ж моделлю, що set_power_limit(), але з фактичних байтів buf
+    return IDLE_MA * N * M + MA_PER_STEP * sum(nm.buf)
+
+
+def _spectra(rnd, frames):
+    # найгірші кадри (усі стовпці і піки на максимумі, стрибки між повним і порожнім) і випадкові
+    full = bytearray([N] * M)
+    for k in range(frames):
+        if k % 4 == 0:
+            yield full, full
+        elif k % 4 == 1:
+            yield bytearray(M), full
+        else:
+            lvl = bytearray(rnd.choice((rnd.randint(0, N), N)) for _ in range(M))
+            yield lvl, bytearray(max(v, rnd.randint(0, N)) for v in lvl)
+
+
+@pytest.mark.parametrize('order, budget', [('GRB', 2000), ('GRB', 600), ('GRBW', 2000), ('GRBW', 350)])
+def test_frame_current_never_exceeds_budget(order, budget):
+    bpp = len(order)
+    worst = 0.0
+    for engine, delta, subpixel, flash in itertools.product(NeoMatrixFast.ENGINES, (False, True),
+                                                           (False, True), (0, 256)):
+        nm = NeoMatrixFast(row=N, col=M, neo_pin=20, delta=delta, output=BufferOutput(N * M, bpp),
+                           order=order, brightness=255)
+        nm.set_power_limit(budget, MA_PER_STEP, IDLE_MA)
+        nm.set_engine(engine)
+        nm.set_subpixel(subpixel)
+        nm.flash_peaks(flash)
+        q8 = array.array('i', [0] * M)
+        rnd = random.Random(15)
+        for lvl, peak in _spectra(rnd, 24):
+            if subpixel:
+                for j in range(M):
+                    q8[j] = max(0, (lvl[j] << 8) - rnd.randrange(256))
+                nm.fill_spectrum_buf(lvl, peak, spec_q8=q8)
+            else:
+                nm.fill_spectrum_buf(lvl, peak)
+            ma = _frame_ma(nm)
+            assert ma <= budget, (engine, delta, subpixel, flash, ma)
+            worst = max(worst, ma)
+    # обмежувач справді працював: повна яскравість без нього далеко за бюджетом
+    assert worst > 0.8 * budget
+
+
+def test_without_limit_full_frame_is_over_budget():
+    nm = NeoMatrixFast(row=N, col=M, neo_pin=20, output=BufferOutput(N * M), brightness=255)
+    full = bytearray([N] * M)
+    nm.fill_spectrum_buf(full, full)
+    assert _frame_ma(nm) > 2000
+
+
+@pytest.mark.parametrize('engine', [e for e in NeoMatrixFast.ENGINES if e != 'bars'])
+def test_sparse_frame_under_budget_keeps_full_brightness(engine):
+    # не-bars рушії оцінюють струм із фактичних байтів кадра, а не "усі пікселі найяскравішим кольором"
+    budget = 1500
+    full = bytearray([N] * M)
+    sparse = bytearray(M)
+    sparse[M // 2] = 2
+    ref = NeoMatrixFast(row=N, col=M, neo_pin=20, output=BufferOutput(N * M), brightness=255)
+    ref.set_engine(engine)
+    nm = NeoMatrixFast(row=N, col=M, neo_pin=20, output=BufferOutput(N * M), brightness=255)
+    nm.set_power_limit(budget, MA_PER_STEP, IDLE_MA)
+    nm.set_engine(engine)
+    # гучні кадри понад бюджет приглушуються, розріджені після них - знову повної яскравості
+    # (N + 1 кадрів кожного виду: історія водоспаду заповнюється повністю)
+    dimmed = False
+    for lvl in [sparse] * (N + 1) + [full] * (N + 1) + [sparse] * (N + 1):
+        ref.fill_spectrum_buf(lvl, lvl)
+        nm.fill_spectrum_buf(lvl, lvl)
+        assert _frame_ma(nm) <= budget
+        dimmed = dimmed or nm.scale < 256
+        if lvl is sparse and _frame_ma(ref) <= budget:
+            assert nm.scale == 256
+            assert nm.buf == ref.buf
+    assert _frame_ma(ref) <= budget
+    assert nm.scale == 256 and dimmed
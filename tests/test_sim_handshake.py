@@ -0,0 +1,18 @@
+import os
+import sys
+
+from conftest import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, 'utils'))
+import sim_handshake  # noqa: E402
+
+
+def test_early_release_cuts_core0_wait():
+    # T_core1 > T_cap: з одним буфером Core0 чекає майже весь кадр Core1
+    res = {m: sim_handshake.simulate(m, 35.0, 1.0, 70.0, frames=30) for m in sim_handshake.MODES}
+    for mode, r in res.items():
+        assert r['frames'] == 30 and r['torn'] == r['dup'] == r['skip'] == 0, (mode, r)
+    assert res['busy']['wait_ms'] > 30.0, res
+    assert res['zero']['wait_ms'] < res['busy']['wait_ms'] / 4, res
+    assert res['early']['wait_ms'] < res['hold']['wait_ms'] + 1.0, res
+    assert res['zero']['fps'] > 1.25 * res['busy']['fps'], res
@@ -0,0 +1,33 @@
+import sim_cores
+
+# FFT_SIZE = 1024, Fs = 40 кГц: T_cap = 25.6 мс, T_fft ≈ 35 мс (README, «Числовий приклад»)
+T_FFT = 35.0
+FRAMES = 30
+
+
+def _run(t_core1, t_hold=1.0, broken=False, **cfg):
+    ns = sim_cores.load(**cfg)
+    if broken:
+        ns._wait_slot = lambda k: None     # Core0 не чекає звільнення слота
+    return sim_cores.run_cores(ns, FRAMES, t_fft=T_FFT, t_hold=t_hold, t_core1=t_core1)
+
+
+def _whole(r):
+    return r['frames'] == FRAMES and r['torn'] == r['dup'] == r['skip'] == 0
+
+
+def test_ring_of_slots_overlaps_cores():
+    # кільце слотів з копією проти одного буфера, який Core1 тримає увесь кадр (колишній spectr_busy)
+    for t_core1, gain in ((40.0, 1.08), (70.0, 1.25)):
+        ring = _run(t_core1)
+        single = _run(t_core1, t_hold=t_core1, ZERO_COPY=True)
+        assert _whole(ring), ring
+        assert _whole(single), single
+        # період: max(T_cap + T_fft, T_core1) проти T_fft + max(T_cap, T_core1)
+        assert ring['fps'] > gain * single['fps'], (t_core1, ring, single)
+        assert ring['fps'] > 0.85 * 1000 / max(25.6 + T_FFT, t_core1), ring
+
+
+def test_harness_detects_broken_handshake():
+    r = _run(70.0, broken=True)
+    assert r['torn'] + r['dup'] + r['skip'] > 0, r
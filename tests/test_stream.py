@@ -0,0 +1,87 @@
+import array
+import random
+
+import numpy as np
+
+import adc_dma
+import rp2
+import sim_cores
+
+LEN = 400_000
+
+
+def _chirp(fs):
+    # 2 -> 5 кГц без повторів фази: зсув вікна хоч на семпл дає похибку порядку амплітуди
+    # (низькі частоти тут не потрібні: IIR зміщення вхідного каскаду їх частково слідкує)
+    t = np.arange(LEN)
+    f = 2000 + 3000 * t / LEN
+    ph = 2 * np.pi * np.cumsum(f) / fs
+    return np.round(2048 + 1500 * np.sin(ph)).astype(int)
+
+
+class _Recorder:
+    # замість fastfft: копія кожного вікна rfft(); наступний кадр отримує від DMA steps[k] семплів
+    # на кожне читання лічильника (rp2.step при adc_dma.realtime = 0)
+    def __init__(self, n, steps):
+        self.out = array.array('f', [0.0] * (n // 2 + 1))
+        self.windows = []
+        self.steps = steps
+
+    def rfft(self, buf, window=True):
+        self.windows.append(np.array(buf, dtype=np.float64))
+        rp2.step = self.steps[len(self.windows)]
+        return memoryview(self.out)
+
+
+def _find_end(w, raw, lo, hi, hop):
+    # кінець вікна серед кандидатів (кратних hop): w ≈ a * raw[e - n:e] + b з найменшою похибкою
+    n = len(w)
+    best = None
+    for e in range(lo, hi, hop):
+        x = raw[e - n:e]
+        a, b = np.linalg.lstsq(np.stack([x, np.ones(n)], 1), w, rcond=None)[0]
+        err = np.max(np.abs(w - a * x - b))
+        if best is None or err < best[1]:
+            best = (e, err, a)
+    return best
+
+
+def test_stream_windows_are_contiguous():
+    ns = sim_cores.load(CAPTURE_MODE='stream', PROFILE='hi-res')
+    n, hop, fs = ns.FFT_SIZE, ns.HOP, ns.SAMPLE_FREQ
+    raw = _chirp(fs)
+    adc_dma.reset(lambda t, fs: int(raw[t]))
+    adc_dma.realtime = 0.0
+    rnd = random.Random(2)
+    frames = 120
+    # здебільшого рівно HOP за кадр, іноді дрібні порції, кілька HOP одразу і пропуск понад FFT_SIZE
+    pool = [hop] * 6 + [hop // 3, hop + hop // 3, 3 * hop + 37, 2 * n + 100]
+    steps = [hop] * 10 + [rnd.choice(pool) for _ in range(frames)]
+    rec = _Recorder(ns.FFT_MAX, steps)
+    ns.fastfft = rec
+    ns._wait_slot = lambda k: None   # без Core1: слоти не чекаються
+    try:
+        ns.core0_main_loop(frames)
+    finally:
+        rp2.step = 64
+        ns.adc.close()
+
+    # перші вікна ще містять нулі кільця: рівно HOP за кадр
+    ends = [hop * (k + 1) for k in range(n // hop)]
+    peak = max(np.max(np.abs(w)) for w in rec.windows[-10:])
+    for k in range(len(ends), frames):
+        w = rec.windows[k]
+        e, err, a = _find_end(w, raw, ends[-1] + hop, ends[-1] + 12 * hop, hop)
+        # вікно - суцільні семпли джерела з одним підсиленням і зміщенням (без стрибків на межах HOP)
+        assert err <= 0.01 * peak and a > 0, (k, e, err)
+        ends.append(e)
+
+    hops = np.diff(ends)
+    assert np.all(hops % hop == 0) and np.all(hops >= hop)
+    # семпли губляться лише у кадрах, які взяли понад FFT_SIZE нових семплів - і їх лічить capture_overruns
+    assert ns.capture_overruns == np.sum(hops > n) > 0
+    # інакше сусідні вікна перекриваються: спільна частина - ті самі семпли кільця, обчислені один раз
+    for k in range(1, frames):
+        d = hops[k - 1]
+        if d <= n:
+            assert np.array_equal(rec.windows[k][:n - d], rec.windows[k - 1][d:]), k
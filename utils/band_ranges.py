@@ -22,13 +22,14 @@ def band_ranges_hz(Fs, N, IND_BANDS, k_start=1):
     return df, k_edges, edges_hz, band_ranges
 
 
-# приклад:
-Fs = 40_000
-N = 1024
-IND_BANDS = (2, 1, 1, 1, 1, 1, 1, 5, 6, 11, 15, 24, 35, 53, 80, 160)
+# приклад (на пристрої: band_plan.print_plan(edges, Fs, N)):
+if __name__ == '__main__':
+    Fs = 40_000
+    N = 1024
+    IND_BANDS = (2, 1, 1, 1, 1, 1, 1, 5, 6, 11, 15, 24, 35, 53, 80, 160)
  
-df, k_edges, edges_hz, ranges = band_ranges_hz(Fs, N, IND_BANDS, k_start=1)
-print("df =", df, "Hz/bin")
-print("k_edges =", k_edges)
-for i, (lo, hi) in enumerate(ranges):
-    print(f"{i+1:2d}: {lo:8.2f} .. {hi:8.2f} Hz   (bins [{k_edges[i]}..{k_edges[i+1]}) )")
+    df, k_edges, edges_hz, ranges = band_ranges_hz(Fs, N, IND_BANDS, k_start=1)
+    print("df =", df, "Hz/bin")
+    print("k_edges =", k_edges)
+    for i, (lo, hi) in enumerate(ranges):
+        print(f"{i+1:2d}: {lo:8.2f} .. {hi:8.2f} Hz   (bins [{k_edges[i]}..{k_edges[i+1]}) )")
@@ -0,0 +1,201 @@
+import os
+import sys
+import random
+import select
+import termios
+import tty
+
+# протокол і кодер - з frame_link.py у корені проєкту (чистий Python, працює і на хості)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from frame_link import FrameLink, crc16, SYNC0, SYNC1, FL_KEY, FL_BEAT, HDR_LEN, RUN  # noqa: E402
+
+
+class FrameDecoder:
+    """
+    Хост-декодер пакетів frame_link.py (рівні + піки смуг з UART).
+
+    feed(data) - дописати прийняті байти, вертає список кадрів (seq, flags, lvl, peak).
+    Пакет з поганим CRC або неможливим заголовком - пошук наступного sync з наступного байта.
+    Пропуск seq (втрата на лінії) - delta-кадри ігноруються до наступного ключового.
+
+    Статистика: frames, crc_err, lost (кадрів за пропусками seq), skipped (байт поза пакетами).
+    """
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.prev = None      # останній декодований кадр (рівні, далі піки)
+        self.expect = None    # очікуваний seq
+        self.frames = 0
+        self.crc_err = 0
+        self.lost = 0
+        self.skipped = 0
+
+    def feed(self, data):
+        self.buf += data
+        out = []
+        buf = self.buf
+        while True:
+            # sync
+            k = 0
+            while k + 1 < len(buf) and not (buf[k] == SYNC0 and buf[k + 1] == SYNC1):
+                k += 1
+            if k:
+                self.skipped += k
+                del buf[:k]
+            if len(buf) < HDR_LEN:
+                break
+            n, size = buf[4], buf[5]
+            if size > n:
+                # не заголовок: sync у даних
+                self.skipped += 1
+                del buf[:1]
+                continue
+            total = HDR_LEN + size + 2
+            if len(buf) < total:
+                break
+            crc = (buf[total - 2] << 8) | buf[total - 1]
+            if crc16(buf[2:HDR_LEN + size]) != crc:
+                self.crc_err += 1
+                self.skipped += 1
+                del buf[:1]
+                continue
+            frame = self._decode(buf[2], buf[3], n, buf[HDR_LEN:HDR_LEN + size])
+            del buf[:total]
+            if frame is not None:
+                out.append(frame)
+        return out
+
+    def _decode(self, seq, flags, n, payload):
+        if self.expect is not None and seq != self.expect:
+            self.lost += (seq - self.expect) & 0xFF
+            self.prev = None
+        self.expect = (seq + 1) & 0xFF
+        key = flags & FL_KEY
+        if not key and (self.prev is None or len(self.prev) != n):
+            return None    # чекаємо ключовий кадр
+        vals = bytearray(n) if key else bytearray(self.prev)
+        i = 0
+        for b in payload:
+            if b & RUN:
+                i += (b & 0x7F) + 1
+            elif i < n:
+                vals[i] = b
+                i += 1
+            else:
+                i = n + 1
+                break
+        if i != n:
+            self.prev = None
+            return None
+        self.prev = vals
+        self.frames += 1
+        half = n // 2
+        return seq, flags, bytes(vals[:half]), bytes(vals[half:])
+
+
+def open_port(path, baud=115200):
+    # послідовний порт у raw-режимі (без pyserial)
+    fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+    tty.setraw(fd)
+    attr = termios.tcgetattr(fd)
+    speed = getattr(termios, 'B%d' % baud)
+    attr[4] = attr[5] = speed
+    termios.tcsetattr(fd, termios.TCSANOW, attr)
+    return fd
+
+
+def receive(path, baud=115200):
+    # друк кадрів з порту: seq, онсет, рівні смуг
+    fd = open_port(path, baud)
+    dec = FrameDecoder()
+    try:
+        while True:
+            for seq, flags, lvl, peak in dec.feed(os.read(fd, 256)):
+                print('%3d %s %s' % (seq, '*' if flags & FL_BEAT else ' ',
+                                     ' '.join('%2d' % v for v in lvl)))
+    except KeyboardInterrupt:
+        print('frames %d  crc errors %d  lost %d  skipped bytes %d'
+              % (dec.frames, dec.crc_err, dec.lost, dec.skipped))
+    finally:
+        os.close(fd)
+
+
+class _PtyUart:
+    # "UART" пристрою поверх pty: write() у master, опційно з пошкодженням байтів (ber - ймовірність на байт)
+    def __init__(self, fd, ber=0.0):
+        self.fd = fd
+        self.ber = ber
+        self.sent = 0
+
+    def txdone(self):
+        return True
+
+    def write(self, buf):
+        data = bytearray(buf)
+        for k in range(len(data)):
+            if self.ber and random.random() < self.ber:
+                data[k] ^= 1 << random.randrange(8)
+        self.sent += len(data)
+        return os.write(self.fd, data)
+
+
+def loopback(frames=3000, bands=16, ber=0.0, seed=1):
+    """
+    Петля FrameLink (кодер пристрою) -> pty -> FrameDecoder на синтетичних кадрах
+    (випадкові блукання рівнів 0..16, піки не нижче рівнів, онсети).
+    ber - ймовірність пошкодження байта на лінії.
+    Вертає (кадрів надіслано, декодовано, неправильних, байт на кадр, декодер).
+    """
+    random.seed(seed)
+    master, slave = os.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    uart = _PtyUart(master, ber)
+    link = FrameLink(uart, bands)
+    dec = FrameDecoder()
+    sent = {}
+    lvl = bytearray(bands)
+    peak = bytearray(bands)
+    got = 0
+    bad = 0
+
+    def drain(timeout):
+        nonlocal got, bad
+        while select.select([slave], [], [], timeout)[0]:
+            for seq, flags, l, p in dec.feed(os.read(slave, 4096)):
+                got += 1
+                if sent.get(seq) != (l, p, bool(flags & FL_BEAT)):
+                    bad += 1
+
+    try:
+        for _ in range(frames):
+            # кілька смуг змінюються за кадр, решта стоїть (як у реальному спектрі)
+            for _ in range(random.randrange(6)):
+                i = random.randrange(bands)
+                lvl[i] = max(0, min(16, lvl[i] + random.randint(-3, 3)))
+            for i in range(bands):
+                if lvl[i] >= peak[i]:
+                    peak[i] = lvl[i]
+                elif random.random() < 0.2:
+                    peak[i] -= 1
+            beat = random.random() < 0.05
+            if link.send(lvl, peak, beat):
+                sent[(link.seq - 1) & 0xFF] = (bytes(lvl), bytes(peak), beat)
+            while link.poll():
+                pass
+            drain(0)
+        drain(0.2)
+    finally:
+        os.close(master)
+        os.close(slave)
+    return link.frames, got, bad, uart.sent / max(1, link.frames), dec
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] != '--loopback':
+        receive(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 115200)
+    else:
+        for ber in (0.0, 1e-3):
+            n, got, bad, bpf, dec = loopback(ber=ber)
+            print('BER %g: sent %d  decoded %d  wrong %d  %.1f bytes/frame  '
+                  'crc errors %d  lost %d' % (ber, n, got, bad, bpf, dec.crc_err, dec.lost))
@@ -51,13 +51,14 @@ def make_ind_bands_octaves(Fs, N, fmin, fmax, bands=16, k_start=1,
     return df, k_edges, ind_bands, edges_hz_real, band_ranges_hz_real, edges_req
 
 
-# приклад:
-df, k_edges, IND_BANDS, edges_hz_real, band_ranges_real, edges_req = make_ind_bands_octaves(
-    40_000, 1024, 30, 14000, 15, k_start=3, ignore_nyquist=False
-)
-
-print("df =", df, "Hz/bin")
-print("IND_BANDS =", IND_BANDS, "sum =", sum(IND_BANDS))
-print("\nReal band ranges (Hz) from bins:")
-for i, (lo, hi) in enumerate(band_ranges_real):
-    print(f"{i:2d}: {lo:8.2f} .. {hi:8.2f}   (bins {k_edges[i]}..{k_edges[i+1]})")
+# приклад (те саме на пристрої: band_plan.make_plan(Fs, N, fmin, fmax, bands, 'octave', k_start)):
+if __name__ == '__main__':
+    df, k_edges, IND_BANDS, edges_hz_real, band_ranges_real, edges_req = make_ind_bands_octaves(
+        40_000, 1024, 30, 14000, 15, k_start=3, ignore_nyquist=False
+    )
+
+    print("df =", df, "Hz/bin")
+    print("IND_BANDS =", IND_BANDS, "sum =", sum(IND_BANDS))
+    print("\nReal band ranges (Hz) from bins:")
+    for i, (lo, hi) in enumerate(band_ranges_real):
+        print(f"{i:2d}: {lo:8.2f} .. {hi:8.2f}   (bins {k_edges[i]}..{k_edges[i+1]})")
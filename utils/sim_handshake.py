@@ -0,0 +1,53 @@
+import os
+import sys
+
+# справжні core0_main_loop() / core1_dsp_led_worker() з neo_spectr.py поверх замін з host/
+_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path[:0] = [os.path.join(_ROOT, 'host'), _ROOT]
+import micropython  # noqa: E402,F401  ptr8/16/32, time.ticks_*
+import sim_cores  # noqa: E402
+
+MODES = ('busy', 'zero', 'hold', 'early')
+
+
+def simulate(mode, t_fft, t_hold, t_core1, frames=40, scale=0.2):
+    """
+    Хост-прогін обміну спектром між Core0 і Core1: справжній код neo_spectr.py (два потоки,
+    lock + slot_full, _copy32, _wait_slot) через host/sim_cores.py. Часи етапів - у мс,
+    T_cap = FFT_SIZE / SAMPLE_FREQ профілю (25.6 мс для 'hi-res').
+
+    mode:
+      'busy'  - ZERO_COPY: 1 буфер (memoryview fastfft), Core1 тримає його увесь кадр
+                (смуги + AGC + рендер + np.write()) - колишній handshake spectr_busy
+      'zero'  - ZERO_COPY: той самий 1 буфер, Core1 звільняє його одразу після band_energies() (t_hold)
+      'hold'  - кільце з 2 слотів-копій, слот зайнятий увесь кадр Core1
+      'early' - кільце з 2 слотів-копій, раннє звільнення після band_energies()
+
+    t_core1 - повний час Core1 на кадр (включно з t_hold)
+    scale   - множник реального часу (0.2: 1 мс моделі = 0.2 мс)
+
+    Вихід: dict sim_cores.run_cores():
+      wait_ms - середнє очікування Core0 на кадр (етап 'wait' телеметрії), мс моделі
+      fps     - частота кадрів Core1, кадрів/с моделі
+      torn, dup, skip - кадри, які Core1 прочитав не цілими / повторно / після пропуску (мають бути 0)
+    """
+    ns = sim_cores.load(ZERO_COPY=mode in ('busy', 'zero'))
+    if mode in ('busy', 'hold'):
+        t_hold = t_core1
+    return sim_cores.run_cores(ns, frames, t_fft=t_fft, t_hold=t_hold, t_core1=t_core1, scale=scale)
+
+
+# приклад: FFT_SIZE=1024, Fs=40_000 (T_cap = 25.6 ms), T_fft ≈ 35 ms
+if __name__ == '__main__':
+    T_FFT = 35.0
+    T_HOLD = 1.0    # band_energies() по SPEC_LEN бінах
+
+    # T_core1: з PioDmaOutput (~20 ms) і з блокуючим NeoPixelOutput / важким рендером
+    for t_core1 in (20.0, 40.0, 70.0):
+        print("T_core1 = %.1f ms" % t_core1)
+        for mode in MODES:
+            r = simulate(mode, T_FFT, T_HOLD, t_core1)
+            assert r['torn'] == r['dup'] == r['skip'] == 0, (mode, r)
+            print("  %-5s  Core0 wait: %6.2f ms/кадр   FPS: %5.1f   кадрів: %d, усі цілі"
+                  % (mode, r['wait_ms'], r['fps'], r['frames']))
+        print()